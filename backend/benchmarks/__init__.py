@@ -0,0 +1,2 @@
+# lib.temporal modules can only be imported after lib.app, same as in bin and tests
+import lib.app  # noqa: F401
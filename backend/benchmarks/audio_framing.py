@@ -0,0 +1,68 @@
+"""
+Compares encoding and decoding of audio for storage through the pydantic schema with msgpack
+and through the framing that keeps audio data as is (S3 object metadata, local file header).
+
+Usage: python -m benchmarks.audio_framing [audio size in megabytes]
+"""
+
+import sys
+import time
+import tracemalloc
+import typing
+
+import lib.voice.clients.storage.framing as storage_framing
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+
+RUNS_COUNT = 5
+
+
+def measure(function: typing.Callable[[], typing.Any]) -> tuple[float, float]:
+    """
+    Returns median time in milliseconds and peak allocated memory in megabytes
+    """
+    timings: list[float] = []
+    for _ in range(RUNS_COUNT):
+        started_at = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    tracemalloc.start()
+    function()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return sorted(timings)[len(timings) // 2], peak_bytes / 1024 / 1024
+
+
+def run(size_megabytes: float) -> None:
+    audio = voice_models.Audio(
+        data=b"\x01" * int(size_megabytes * 1024 * 1024),
+        duration_seconds=60,
+        format=voice_models.AudioFormat.OGG,
+    )
+    schema_data = voice_schemas.Audio.from_dataclass(audio).to_bytes()
+    metadata = storage_framing.to_metadata(audio)
+    header_data = storage_framing.pack_header(audio) + audio.data
+
+    cases: dict[str, typing.Callable[[], typing.Any]] = {
+        "schema encode": lambda: voice_schemas.Audio.from_dataclass(audio).to_bytes(),
+        "schema decode": lambda: voice_schemas.Audio.from_bytes(schema_data).to_dataclass(),
+        "metadata encode": lambda: storage_framing.to_metadata(audio),
+        "metadata decode": lambda: storage_framing.from_metadata(metadata, audio.data),
+        "header encode": lambda: [storage_framing.pack_header(audio), audio.data],
+        "header decode": lambda: storage_framing.unpack(memoryview(header_data)),
+    }
+
+    print(f"Audio size: {size_megabytes} MiB")
+    for name, function in cases.items():
+        time_ms, peak_megabytes = measure(function)
+        print(f"{name:>16}: {time_ms:>8.2f}ms, peak allocated {peak_megabytes:>6.1f} MiB")
+
+
+def main() -> None:
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 50)
+
+
+if __name__ == "__main__":
+    main()
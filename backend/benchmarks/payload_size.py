@@ -0,0 +1,83 @@
+"""
+Estimates workflow history payload size of a single recognition job with the default JSON data converter
+and with the msgpack converter plus zlib codec.
+
+Usage: python -m benchmarks.payload_size [audio duration in seconds]
+"""
+
+import asyncio
+import sys
+import typing
+import uuid
+
+import temporalio.converter as temporalio_converter
+
+import lib.temporal.activities as temporal_activities
+import lib.temporal.converter as temporal_converter
+import lib.temporal.workflows as temporal_workflows
+import lib.voice.models as voice_models
+
+CHUNK_DURATION_SECONDS = 10
+BATCH_DURATION_SECONDS = 60
+# Roughly what speech recognition produces for 10 seconds of Russian speech
+CHUNK_TEXT = "Привет, это голосовое сообщение, которое нужно распознать и отправить обратно в чат. "
+
+
+def get_history_values(audio_duration_seconds: float) -> list[typing.Any]:
+    audio_id = uuid.uuid4()
+    chunks = [
+        temporal_activities.Splitter.Chunk(audio_id=uuid.uuid4(), duration_seconds=CHUNK_DURATION_SECONDS)
+        for _ in range(int(audio_duration_seconds // CHUNK_DURATION_SECONDS))
+    ]
+    batch_size = BATCH_DURATION_SECONDS // CHUNK_DURATION_SECONDS
+    batches = [chunks[index : index + batch_size] for index in range(0, len(chunks), batch_size)]
+    recognition_results = [
+        voice_models.RecognitionResult(text=CHUNK_TEXT, duration_seconds=chunk.duration_seconds) for chunk in chunks
+    ]
+    result = voice_models.RecognitionTaskResult(
+        recognition_results=recognition_results,
+        metadata='{"chat_id": 123456789, "message_id": 987654321}',
+    )
+
+    return [
+        temporal_workflows.Recognition.Params(
+            metadata=result.metadata,
+            audio_id=audio_id,
+            audio_duration_seconds=audio_duration_seconds,
+        ),
+        temporal_activities.Splitter.Params(audio_id=audio_id),
+        chunks,
+        *[temporal_activities.RecognitionBatch.Params([chunk.audio_id for chunk in batch]) for batch in batches],
+        *[recognition_results[index : index + batch_size] for index in range(0, len(chunks), batch_size)],
+        temporal_activities.Cleaner.Params([audio_id, *[chunk.audio_id for chunk in chunks]]),
+        temporal_workflows.Recognition.Output(result=result),
+    ]
+
+
+async def get_size_bytes(data_converter: temporalio_converter.DataConverter, values: list[typing.Any]) -> int:
+    payloads = await data_converter.encode(values)
+    return sum(payload.ByteSize() for payload in payloads)
+
+
+async def run(audio_duration_seconds: float) -> None:
+    values = get_history_values(audio_duration_seconds)
+    data_converters = {
+        "json": temporalio_converter.DataConverter.default,
+        "msgpack": temporal_converter.create_data_converter(compression_threshold_bytes=None),
+        "msgpack+zlib": temporal_converter.create_data_converter(compression_threshold_bytes=1024),
+    }
+
+    baseline_size_bytes = await get_size_bytes(data_converters["json"], values)
+    print(f"Audio duration: {audio_duration_seconds}s, payloads: {len(values)}")
+    for name, data_converter in data_converters.items():
+        size_bytes = await get_size_bytes(data_converter, values)
+        print(f"{name:>14}: {size_bytes:>10} bytes ({size_bytes / baseline_size_bytes:.0%})")
+
+
+def main() -> None:
+    audio_duration_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60 * 60
+    asyncio.run(run(audio_duration_seconds))
+
+
+if __name__ == "__main__":
+    main()
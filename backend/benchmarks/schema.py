@@ -0,0 +1,80 @@
+"""
+Compares schema creation from a dataclass through dataclasses.asdict (the former path) and from its attributes,
+along with to_dataclass and to_bytes/from_bytes of the same payloads.
+Audio payload is a single bytes field, recognition task result payload is a list of nested results.
+
+Usage: python -m benchmarks.schema [payload size in kilobytes ...]
+"""
+
+import dataclasses
+import sys
+import time
+import typing
+
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+
+RUNS_COUNT = 5
+SIZES_KILOBYTES = [1, 100, 10 * 1024, 100 * 1024]
+RECOGNITION_RESULT_TEXT_SIZE = 1024
+
+
+def measure(function: typing.Callable[[], typing.Any]) -> float:
+    """
+    Returns median time in milliseconds
+    """
+    timings: list[float] = []
+    for _ in range(RUNS_COUNT):
+        started_at = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    return sorted(timings)[len(timings) // 2]
+
+
+def get_cases(
+    schema: type[voice_schemas.Audio] | type[voice_schemas.RecognitionTaskResult],
+    data: typing.Any,
+) -> dict[str, typing.Callable[[], typing.Any]]:
+    data_schema = schema.from_dataclass(data)
+    raw_data = data_schema.to_bytes()
+
+    return {
+        "from asdict": lambda: schema(**dataclasses.asdict(data)),
+        "from dataclass": lambda: schema.from_dataclass(data),
+        "to dataclass": data_schema.to_dataclass,
+        "to bytes": data_schema.to_bytes,
+        "from bytes": lambda: schema.from_bytes(raw_data),
+    }
+
+
+def run(size_kilobytes: int) -> None:
+    audio = voice_models.Audio(
+        data=b"\x01" * size_kilobytes * 1024,
+        duration_seconds=60,
+        format=voice_models.AudioFormat.OGG,
+    )
+    result = voice_models.RecognitionTaskResult(
+        recognition_results=[
+            voice_models.RecognitionResult(text="t" * RECOGNITION_RESULT_TEXT_SIZE, duration_seconds=10)
+            for _ in range(max(1, size_kilobytes * 1024 // RECOGNITION_RESULT_TEXT_SIZE))
+        ],
+        metadata="{}",
+    )
+
+    print(f"Payload size: {size_kilobytes} KiB")
+    for name, cases in [
+        ("audio", get_cases(voice_schemas.Audio, audio)),
+        ("task result", get_cases(voice_schemas.RecognitionTaskResult, result)),
+    ]:
+        timings = ", ".join(f"{case} {measure(function):.3f}ms" for case, function in cases.items())
+        print(f"{name:>12}: {timings}")
+
+
+def main() -> None:
+    for size_kilobytes in [int(arg) for arg in sys.argv[1:]] or SIZES_KILOBYTES:
+        run(size_kilobytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compares the local disk and the S3 audio storage on the splitter workload:
+chunks are written, read back once by recognition and deleted in bulk by the cleaner.
+
+Usage: python -m benchmarks.storage [s3 endpoint url] [access key] [secret key] [bucket name]
+Without S3 settings only the local storage is measured.
+"""
+
+import asyncio
+import concurrent.futures as concurrent_futures
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import uuid
+
+import aiobotocore.session as aiobotocore_session
+
+import lib.utils.aiobotocore as aiobotocore_utils
+import lib.utils.files as files_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+CHUNKS_COUNT = 60
+# 10 seconds of 16-bit 16 kHz mono wav
+CHUNK_SIZE_BYTES = 10 * 16_000 * 2
+CONCURRENCY = 8
+
+
+async def measure(storage_client: voice_clients.StorageProtocol) -> dict[str, float]:
+    chunks = {
+        uuid.uuid4(): voice_models.Audio(
+            data=os.urandom(CHUNK_SIZE_BYTES),
+            duration_seconds=10,
+            format=voice_models.AudioFormat.WAV,
+        )
+        for _ in range(CHUNKS_COUNT)
+    }
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def create(id: uuid.UUID, audio: voice_models.Audio) -> None:
+        async with semaphore:
+            await storage_client.create(id, audio)
+
+    async def read(id: uuid.UUID) -> None:
+        async with semaphore:
+            await storage_client.read(id)
+
+    timings: dict[str, float] = {}
+
+    started_at = time.monotonic()
+    await asyncio.gather(*[create(id, audio) for id, audio in chunks.items()])
+    timings["create"] = time.monotonic() - started_at
+
+    started_at = time.monotonic()
+    await asyncio.gather(*[read(id) for id in chunks])
+    timings["read"] = time.monotonic() - started_at
+
+    started_at = time.monotonic()
+    await storage_client.delete_many(list(chunks))
+    timings["delete_many"] = time.monotonic() - started_at
+
+    return timings
+
+
+def report(name: str, timings: dict[str, float]) -> None:
+    size_megabytes = CHUNKS_COUNT * CHUNK_SIZE_BYTES / 1024 / 1024
+    print(
+        f"{name:>5}: "
+        + ", ".join(
+            f"{operation} {seconds * 1000:.1f}ms ({size_megabytes / seconds:.0f} MiB/s)"
+            if operation != "delete_many"
+            else f"{operation} {seconds * 1000:.1f}ms"
+            for operation, seconds in timings.items()
+        )
+    )
+
+
+async def run(s3_args: list[str]) -> None:
+    print(f"Chunks: {CHUNKS_COUNT} x {CHUNK_SIZE_BYTES} bytes, concurrency: {CONCURRENCY}")
+
+    with tempfile.TemporaryDirectory() as root_path:
+        file_client = files_utils.FileClient(
+            loop=asyncio.get_running_loop(),
+            thread_pool_executor=concurrent_futures.ThreadPoolExecutor(max_workers=CONCURRENCY),
+            root_path=pathlib.Path(root_path),
+        )
+        report("local", await measure(voice_clients.LocalStorage(file_client=file_client)))
+
+    if not s3_args:
+        return
+
+    endpoint_url, access_key, secret_key, bucket_name = s3_args
+    s3_client = aiobotocore_utils.S3Client(
+        session=aiobotocore_session.AioSession(),
+        endpoint_url=endpoint_url,
+        access_key=access_key,
+        secret_key=secret_key,
+    )
+    try:
+        report("s3", await measure(voice_clients.S3Storage(s3_client=s3_client, bucket_name=bucket_name)))
+    finally:
+        await s3_client.dispose()
+
+
+def main() -> None:
+    asyncio.run(run(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compares end-to-end latency and history event count of the recognition workflow
+with housekeeping steps (cleanup, callback) as regular and as local activities.
+Activities are stubbed, so only the orchestration overhead is measured.
+
+Usage: python -m benchmarks.workflow_history [temporal host:port]
+Without a host a local dev server is downloaded and started.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import temporalio.activity as temporalio_activity
+import temporalio.client as temporalio_client
+import temporalio.testing as temporalio_testing
+import temporalio.worker as temporalio_worker
+
+import lib.temporal.activities as temporal_activities
+import lib.temporal.converter as temporal_converter
+import lib.temporal.workflows as temporal_workflows
+import lib.voice.models as voice_models
+
+TASK_QUEUE = "benchmark"
+RUNS_COUNT = 20
+CHUNKS_COUNT = 6
+
+
+@temporalio_activity.defn(name=temporal_activities.Splitter.name)
+async def split(params: temporal_activities.Splitter.Params) -> list[temporal_activities.Splitter.Chunk]:
+    return [temporal_activities.Splitter.Chunk(audio_id=uuid.uuid4(), duration_seconds=10) for _ in range(CHUNKS_COUNT)]
+
+
+@temporalio_activity.defn(name=temporal_activities.RecognitionBatch.name)
+async def recognize(
+    params: temporal_activities.RecognitionBatch.Params,
+) -> list[voice_models.RecognitionResult] | temporal_activities.RecognitionBatch.Output:
+    results = [voice_models.RecognitionResult(text="text", duration_seconds=10) for _ in params.audio_ids]
+    if params.offload_threshold_bytes is None:
+        return results
+
+    return temporal_activities.RecognitionBatch.Output(results=results)
+
+
+@temporalio_activity.defn(name=temporal_activities.Cleaner.name)
+async def clean_up(params: temporal_activities.Cleaner.Params) -> None: ...
+
+
+@temporalio_activity.defn(name=temporal_activities.Callback.name)
+async def callback(params: temporal_activities.Callback.Params) -> None: ...
+
+
+async def run_once(client: temporalio_client.Client, local_activities_enabled: bool) -> tuple[float, int]:
+    audio_id = uuid.uuid4()
+    started_at = time.monotonic()
+    handle = await client.start_workflow(
+        temporal_workflows.Recognition.run,
+        temporal_workflows.Recognition.Params(
+            metadata="{}",
+            audio_id=audio_id,
+            audio_duration_seconds=CHUNKS_COUNT * 10,
+            local_activities_enabled=local_activities_enabled,
+        ),
+        id=str(audio_id),
+        task_queue=TASK_QUEUE,
+    )
+    await handle.result()
+    latency_seconds = time.monotonic() - started_at
+
+    history = await handle.fetch_history()
+    return latency_seconds, len(history.events)
+
+
+async def run_with_client(client: temporalio_client.Client) -> None:
+    async with temporalio_worker.Worker(
+        client,
+        task_queue=TASK_QUEUE,
+        workflows=[temporal_workflows.Recognition],
+        activities=[split, recognize, clean_up, callback],
+    ):
+        for local_activities_enabled in [False, True]:
+            results = [await run_once(client, local_activities_enabled) for _ in range(RUNS_COUNT)]
+            latencies_ms = [latency_seconds * 1000 for latency_seconds, _ in results]
+            events_counts = [events_count for _, events_count in results]
+            print(
+                f"local_activities_enabled={local_activities_enabled!s:>5}: "
+                f"latency p50={statistics.median(latencies_ms):.1f}ms max={max(latencies_ms):.1f}ms, "
+                f"history events={statistics.median(events_counts):.0f}"
+            )
+
+
+async def run(target_host: str | None) -> None:
+    data_converter = temporal_converter.create_data_converter()
+    if target_host is not None:
+        client = await temporalio_client.Client.connect(target_host, data_converter=data_converter)
+        await run_with_client(client)
+        return
+
+    async with await temporalio_testing.WorkflowEnvironment.start_local(data_converter=data_converter) as env:
+        await run_with_client(env.client)
+
+
+def main() -> None:
+    asyncio.run(run(sys.argv[1] if len(sys.argv) > 1 else None))
+
+
+if __name__ == "__main__":
+    main()
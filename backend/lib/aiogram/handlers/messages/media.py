@@ -1,11 +1,14 @@
 import dataclasses
+import datetime
 import logging
+import time
 import typing
 import uuid
 
 import aiogram
 import aiogram.filters as aiogram_filters
 import aiogram.types as aiogram_types
+import temporalio.common as temporalio_common
 
 import lib.utils.aiogram as aiogram_utils
 import lib.utils.pydantic as pydantic_utils
@@ -47,68 +50,70 @@ class BaseMediaMessageHandler:
 
         return AUDIO_MIME_TYPE_TO_FORMAT[mime_type]
 
-    async def _get_voice_audio(self, message_voice: aiogram_types.Voice) -> voice_models.Audio:
-        data = await self._download_file_data(message_voice.file_id)
-
-        return voice_models.Audio(
-            data=data,
+    def _get_voice_remote_audio(self, message_voice: aiogram_types.Voice) -> voice_models.RemoteAudio:
+        return voice_models.RemoteAudio(
+            file_id=message_voice.file_id,
             duration_seconds=message_voice.duration,
             format=voice_models.AudioFormat.OGG,
+            file_size_bytes=message_voice.file_size,
         )
 
-    async def _get_audio_audio(self, message_audio: aiogram_types.Audio) -> voice_models.Audio:
-        data = await self._download_file_data(message_audio.file_id)
-        format = self._meme_type_to_audio_format(message_audio.mime_type)
-
-        return voice_models.Audio(
-            data=data,
+    def _get_audio_remote_audio(self, message_audio: aiogram_types.Audio) -> voice_models.RemoteAudio:
+        return voice_models.RemoteAudio(
+            file_id=message_audio.file_id,
             duration_seconds=message_audio.duration,
-            format=format,
+            format=self._meme_type_to_audio_format(message_audio.mime_type),
+            file_size_bytes=message_audio.file_size,
         )
 
-    async def _get_document_audio(self, message_document: aiogram_types.Document) -> voice_models.Audio:
-        data = await self._download_file_data(message_document.file_id)
-        format = self._meme_type_to_audio_format(message_document.mime_type)
-
-        return voice_models.Audio(
-            data=data,
+    def _get_document_remote_audio(self, message_document: aiogram_types.Document) -> voice_models.RemoteAudio:
+        return voice_models.RemoteAudio(
+            file_id=message_document.file_id,
             duration_seconds=0,
-            format=format,
+            format=self._meme_type_to_audio_format(message_document.mime_type),
+            file_size_bytes=message_document.file_size,
         )
 
-    async def _get_video_audio(self, message_video: aiogram_types.Video) -> voice_models.Audio:
-        data = await self._download_file_data(message_video.file_id)
-        format = self._meme_type_to_audio_format(message_video.mime_type)
-
-        return voice_models.Audio(
-            data=data,
+    def _get_video_remote_audio(self, message_video: aiogram_types.Video) -> voice_models.RemoteAudio:
+        return voice_models.RemoteAudio(
+            file_id=message_video.file_id,
             duration_seconds=message_video.duration,
-            format=format,
+            format=self._meme_type_to_audio_format(message_video.mime_type),
+            file_size_bytes=message_video.file_size,
         )
 
-    async def _get_video_note_audio(self, message_video_note: aiogram_types.VideoNote) -> voice_models.Audio:
-        data = await self._download_file_data(message_video_note.file_id)
-
-        return voice_models.Audio(
-            data=data,
+    def _get_video_note_remote_audio(self, message_video_note: aiogram_types.VideoNote) -> voice_models.RemoteAudio:
+        return voice_models.RemoteAudio(
+            file_id=message_video_note.file_id,
             duration_seconds=message_video_note.duration,
             format=voice_models.AudioFormat.MP4,
+            file_size_bytes=message_video_note.file_size,
         )
 
-    async def _get_message_audio(self, message: aiogram_types.Message) -> voice_models.Audio:
+    def _get_message_remote_audio(self, message: aiogram_types.Message) -> voice_models.RemoteAudio:
         if message.voice is not None:
-            return await self._get_voice_audio(message.voice)
+            return self._get_voice_remote_audio(message.voice)
         elif message.audio is not None:
-            return await self._get_audio_audio(message.audio)
+            return self._get_audio_remote_audio(message.audio)
         elif message.document is not None:
-            return await self._get_document_audio(message.document)
+            return self._get_document_remote_audio(message.document)
         elif message.video_note is not None:
-            return await self._get_video_note_audio(message.video_note)
+            return self._get_video_note_remote_audio(message.video_note)
         elif message.video is not None:
-            return await self._get_video_audio(message.video)
+            return self._get_video_remote_audio(message.video)
 
         raise ValueError("Unsupported message content type")
 
+    async def _get_message_audio(self, message: aiogram_types.Message) -> voice_models.Audio:
+        remote_audio = self._get_message_remote_audio(message)
+        data = await self._download_file_data(remote_audio.file_id)
+
+        return voice_models.Audio(
+            data=data,
+            duration_seconds=remote_audio.duration_seconds,
+            format=remote_audio.format,
+        )
+
     @property
     def filters(self) -> typing.Sequence[aiogram_filters.Filter]:
         return [
@@ -179,6 +184,7 @@ class SynchronousMediaMessageHandler(BaseMediaMessageHandler):
 @dataclasses.dataclass(frozen=True)
 class TaskMediaMessageHandler(BaseMediaMessageHandler):
     recognition_task_service: voice_services.RecognitionTaskProtocol
+    remote_download_enabled: bool = False  # audio is downloaded by the task instead of the bot
 
     class MetadataSchema(pydantic_utils.BaseSchema):
         message_id: int
@@ -188,7 +194,6 @@ class TaskMediaMessageHandler(BaseMediaMessageHandler):
 
     async def process(self, message: aiogram_types.Message):
         logger.info("Processing message content type: %s", message.content_type)
-        audio = await self._get_message_audio(message)
 
         metadata = self.MetadataSchema(
             message_id=message.message_id,
@@ -197,6 +202,14 @@ class TaskMediaMessageHandler(BaseMediaMessageHandler):
             message_business_connection_id=message.business_connection_id,
         )
 
+        if self.remote_download_enabled:
+            await self.recognition_task_service.add_remote_task(
+                remote_audio=self._get_message_remote_audio(message),
+                task_metadata=metadata.to_json_str(),
+            )
+            return
+
+        audio = await self._get_message_audio(message)
         await self.recognition_task_service.add_task(
             audio=audio,
             task_metadata=metadata.to_json_str(),
@@ -205,8 +218,11 @@ class TaskMediaMessageHandler(BaseMediaMessageHandler):
     async def process_callback(
         self,
         audio_id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult | None = None,
+        result_id: uuid.UUID | None = None,
     ) -> None:
-        result = await self.recognition_task_service.get_result(audio_id=audio_id)
+        if result is None:
+            result = await self.recognition_task_service.get_result(audio_id=audio_id, result_id=result_id)
         metadata = self.MetadataSchema.from_json_str(result.metadata)
 
         async def send_message_callback(text: str) -> aiogram_types.Message:
@@ -231,7 +247,47 @@ class TaskMediaMessageHandler(BaseMediaMessageHandler):
         )
 
 
+@dataclasses.dataclass(frozen=True)
+class HybridMediaMessageHandler(BaseMediaMessageHandler):
+    """
+    Recognizes short audio in process, skipping storage and workflow round trips,
+    longer audio is passed to the task handler.
+    """
+
+    synchronous_handler: SynchronousMediaMessageHandler
+    task_handler: TaskMediaMessageHandler
+    inline_max_audio_duration_seconds: float
+    inline_max_file_size_bytes: int
+    metric_meter: temporalio_common.MetricMeter = temporalio_common.MetricMeter.noop
+
+    def _is_inline(self, remote_audio: voice_models.RemoteAudio) -> bool:
+        return (
+            remote_audio.duration_seconds <= self.inline_max_audio_duration_seconds
+            and remote_audio.file_size_bytes is not None
+            and remote_audio.file_size_bytes <= self.inline_max_file_size_bytes
+        )
+
+    async def process(self, message: aiogram_types.Message):
+        remote_audio = self._get_message_remote_audio(message)
+        path = "inline" if self._is_inline(remote_audio) else "task"
+        logger.info("Processing message %s on %s path", message.message_id, path)
+
+        started_at = time.monotonic()
+        if path == "inline":
+            await self.synchronous_handler.process(message)
+        else:
+            await self.task_handler.process(message)
+
+        # For the task path it's only the time to hand over the task, the rest is reported by the workflow
+        self.metric_meter.with_additional_attributes({"path": path}).create_histogram_timedelta(
+            "media_handler_latency",
+            "Time spent by the bot handling a media message",
+            "ms",
+        ).record(datetime.timedelta(seconds=time.monotonic() - started_at))
+
+
 __all__ = [
+    "HybridMediaMessageHandler",
     "SynchronousMediaMessageHandler",
     "TaskMediaMessageHandler",
 ]
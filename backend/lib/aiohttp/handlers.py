@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses
 import logging
 import typing
@@ -6,32 +7,176 @@ import uuid
 import aiohttp.web as aiohttp_web
 
 import lib.utils.aiohttp as aiohttp_utils
+import lib.utils.hmac as hmac_utils
 import lib.utils.pydantic as pydantic_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
 import lib.voice.services.protocols as voice_service_protocols
 
 logger = logging.getLogger(__name__)
 
 
 class CallbackProcessor(typing.Protocol):
-    async def __call__(self, audio_id: uuid.UUID) -> None: ...
+    async def __call__(
+        self,
+        audio_id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult | None,
+        result_id: uuid.UUID | None,
+    ) -> None: ...
+
+
+class MediaCallbackRequestSchema(pydantic_utils.BaseSchema):
+    audio_id: uuid.UUID
+    # Either the result itself or its id in the result storage, the bot queries the workflow otherwise
+    result: voice_schemas.RecognitionTaskResult | None = None
+    result_id: uuid.UUID | None = None
+
+
+@dataclasses.dataclass
+class MediaCallbackDeliveryQueue:
+    """
+    Persists accepted callbacks and processes them in background workers with retries.
+    A job is marked as delivered once processed, redelivered callbacks with the same audio_id are dropped.
+    Delivery is at least once, a job interrupted halfway is processed again from the start.
+    The workflow cleans up its result once the callback is accepted, so the result is persisted along with the job.
+    """
+
+    delivery_storage_client: voice_clients.DeliveryStorageProtocol
+    recognition_task_service: voice_service_protocols.RecognitionTaskProtocol
+    callback_processor: CallbackProcessor
+    workers_count: int = 4
+    max_attempts: int = 5
+    retry_delay_seconds: float = 1
+
+    _queue: asyncio.Queue[uuid.UUID] = dataclasses.field(default_factory=asyncio.Queue, init=False)
+    _queued_ids: set[uuid.UUID] = dataclasses.field(default_factory=set, init=False)
+
+    def _enqueue(self, id: uuid.UUID) -> None:
+        if id in self._queued_ids:
+            return
+
+        self._queued_ids.add(id)
+        self._queue.put_nowait(id)
+
+    async def put(self, request: MediaCallbackRequestSchema) -> None:
+        if request.audio_id in self._queued_ids:
+            logger.info("Delivery of %s is already queued", request.audio_id)
+            return
+        if await self.delivery_storage_client.is_delivered(request.audio_id):
+            logger.info("Delivery of %s has already been done", request.audio_id)
+            return
+
+        if request.result is None:
+            result = await self.recognition_task_service.get_result(request.audio_id, request.result_id)
+            request = MediaCallbackRequestSchema(
+                audio_id=request.audio_id,
+                result=voice_schemas.RecognitionTaskResult.from_dataclass(result),
+            )
+
+        await self.delivery_storage_client.create_pending(request.audio_id, request.to_bytes())
+        self._enqueue(request.audio_id)
+
+    async def restore(self) -> None:
+        """
+        Enqueues jobs left pending by the previous run.
+        """
+        for id in await self.delivery_storage_client.list_pending():
+            self._enqueue(id)
+
+    async def _deliver_once(self, id: uuid.UUID) -> None:
+        if not await self.delivery_storage_client.is_delivered(id):
+            try:
+                data = await self.delivery_storage_client.read_pending(id)
+            except self.delivery_storage_client.NotFoundError:
+                logger.warning("Pending delivery of %s is missing", id)
+                return
+
+            request = MediaCallbackRequestSchema.from_bytes(data)
+            await self.callback_processor(
+                audio_id=request.audio_id,
+                result=request.result.to_dataclass() if request.result is not None else None,
+                result_id=request.result_id,
+            )
+            await self.delivery_storage_client.mark_delivered(id)
+
+        await self.delivery_storage_client.delete_pending(id)
+
+    async def _deliver(self, id: uuid.UUID) -> None:
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    await self._deliver_once(id)
+                    return
+                except Exception:
+                    logger.exception("Failed to deliver %s, attempt %d of %d", id, attempt + 1, self.max_attempts)
+                    if attempt + 1 < self.max_attempts:
+                        await asyncio.sleep(self.retry_delay_seconds * 2**attempt)
+
+            logger.error("Delivery of %s has been given up, it stays pending until restart", id)
+        finally:
+            self._queued_ids.discard(id)
+
+    async def _work(self) -> None:
+        while True:
+            id = await self._queue.get()
+            try:
+                await self._deliver(id)
+            finally:
+                self._queue.task_done()
+
+    async def run(self) -> None:
+        await asyncio.gather(*[self._work() for _ in range(self.workers_count)])
 
 
 @dataclasses.dataclass(frozen=True)
 class MediaCallbackHandler:
     recognition_task_service: voice_service_protocols.RecognitionTaskProtocol
     callback_processor: CallbackProcessor
+    signing_secret: str | None = None  # unsigned requests are accepted when None
+    signature_tolerance_seconds: float = 5 * 60  # signed requests older than that are rejected as replayed
+    delivery_queue: MediaCallbackDeliveryQueue | None = None  # callbacks are processed in the request when None
 
     method: typing.ClassVar[str] = "POST"
     path: typing.ClassVar[str] = "/api/v1/callback/media"
+    content_type: typing.ClassVar[str] = "application/msgpack"
+    signature_header: typing.ClassVar[str] = "X-Signature"
+    signature_timestamp_header: typing.ClassVar[str] = "X-Signature-Timestamp"
 
-    class RequestSchema(pydantic_utils.BaseSchema):
-        audio_id: uuid.UUID
+    RequestSchema: typing.ClassVar[type[MediaCallbackRequestSchema]] = MediaCallbackRequestSchema
 
     async def process(self, request: aiohttp_web.Request) -> aiohttp_web.Response:
         raw_data = await request.read()
-        data = self.RequestSchema.from_json_bytes(raw_data)
+        if self.signing_secret is not None and not hmac_utils.verify_timestamped(
+            secret=self.signing_secret,
+            data=raw_data,
+            signature=request.headers.get(self.signature_header, ""),
+            timestamp=request.headers.get(self.signature_timestamp_header, ""),
+            tolerance_seconds=self.signature_tolerance_seconds,
+        ):
+            logger.warning("Media callback with invalid signature has been rejected")
+            return aiohttp_utils.Response.with_error(
+                status=401,
+                problem="invalid_signature",
+                message="Invalid request signature",
+            )
+
+        if request.content_type == self.content_type:
+            data = self.RequestSchema.from_bytes(raw_data)
+        else:
+            data = self.RequestSchema.from_json_bytes(raw_data)
+
+        if self.delivery_queue is not None:
+            await self.delivery_queue.put(data)
+            return aiohttp_utils.Response.with_data(
+                status=202,
+                data="Accepted",
+            )
+
         await self.callback_processor(
             audio_id=data.audio_id,
+            result=data.result.to_dataclass() if data.result is not None else None,
+            result_id=data.result_id,
         )
 
         return aiohttp_utils.Response.with_data(
@@ -41,5 +186,7 @@ class MediaCallbackHandler:
 
 
 __all__ = [
+    "MediaCallbackDeliveryQueue",
     "MediaCallbackHandler",
+    "MediaCallbackRequestSchema",
 ]
@@ -2,6 +2,7 @@ import asyncio
 import concurrent.futures as concurrent_futures
 import dataclasses
 import logging
+import pathlib
 import typing
 
 import aiobotocore.session as aiobotocore_session
@@ -11,14 +12,18 @@ import aiohttp
 import aiohttp.typedefs as aiohttp_typedefs
 import aiohttp.web as aiohttp_web
 import temporalio.client as temporalio_client
+import temporalio.common as temporalio_common
+import temporalio.runtime as temporalio_runtime
 
 import lib.aiogram.handlers as aiogram_handlers
 import lib.aiohttp.handlers as aiohttp_handlers
 import lib.app.errors as app_errors
 import lib.app.settings as app_settings
+import lib.temporal.converter as temporal_converter
 import lib.utils.aiobotocore as aiobotocore_utils
 import lib.utils.aiogram as aiogram_utils
 import lib.utils.aiohttp as aiohttp_utils
+import lib.utils.files as files_utils
 import lib.utils.lifecycle as lifecycle_utils
 import lib.utils.logging as logging_utils
 import lib.voice.clients as voice_clients
@@ -140,6 +145,19 @@ class Application:
                     endpoint_url=settings.media_handler.audio_storage.s3.endpoint_url,
                     access_key=settings.media_handler.audio_storage.s3.access_key,
                     secret_key=settings.media_handler.audio_storage.s3.secret_key,
+                    max_pool_connections=settings.media_handler.audio_storage.s3.max_pool_connections,
+                    connect_timeout_seconds=settings.media_handler.audio_storage.s3.connect_timeout_seconds,
+                    read_timeout_seconds=settings.media_handler.audio_storage.s3.read_timeout_seconds,
+                    retry_mode=settings.media_handler.audio_storage.s3.retry_mode,
+                    max_attempts=settings.media_handler.audio_storage.s3.max_attempts,
+                )
+                lifecycle_startup_callbacks.append(
+                    lifecycle_utils.Callback.from_warm_up(
+                        name="audio_storage_s3_client",
+                        awaitable=audio_storage_s3_client.warm_up(
+                            bucket_name=settings.media_handler.audio_storage.s3.bucket_name,
+                        ),
+                    ),
                 )
                 lifecycle_shutdown_callbacks.append(
                     lifecycle_utils.Callback.from_dispose(
@@ -156,14 +174,114 @@ class Application:
                 audio_storage_client = voice_clients.S3Storage(
                     s3_client=audio_storage_s3_client,
                     bucket_name=settings.media_handler.audio_storage.s3.bucket_name,
+                    stream_threshold_bytes=settings.media_handler.audio_storage.stream_threshold_bytes,
+                    part_size=settings.media_handler.audio_storage.part_size_bytes,
+                    max_concurrency=settings.media_handler.audio_storage.max_concurrency,
+                )
+                result_storage_client = voice_clients.S3ResultStorage(
+                    s3_client=audio_storage_s3_client,
+                    bucket_name=settings.media_handler.audio_storage.s3.bucket_name,
+                )
+                delivery_storage_client = voice_clients.S3DeliveryStorage(
+                    s3_client=audio_storage_s3_client,
+                    bucket_name=settings.media_handler.audio_storage.s3.bucket_name,
+                )
+                if (
+                    settings.media_handler.callback_delivery_enabled
+                    and settings.media_handler.callback_delivery_marker_expiration_days is not None
+                ):
+                    lifecycle_startup_callbacks.append(
+                        lifecycle_utils.Callback(
+                            awaitable=delivery_storage_client.put_expiration_rule(
+                                days=settings.media_handler.callback_delivery_marker_expiration_days,
+                            ),
+                            error_message="Failed to put delivery marker expiration rule",
+                            success_message="Delivery marker expiration rule has been put",
+                        )
+                    )
+                if settings.media_handler.audio_storage.expiration_days is not None:
+                    lifecycle_startup_callbacks.append(
+                        lifecycle_utils.Callback(
+                            awaitable=audio_storage_client.put_expiration_rule(
+                                days=settings.media_handler.audio_storage.expiration_days,
+                            ),
+                            error_message="Failed to put audio storage expiration rule",
+                            success_message="Audio storage expiration rule has been put",
+                        )
+                    )
+                    lifecycle_startup_callbacks.append(
+                        lifecycle_utils.Callback(
+                            awaitable=result_storage_client.put_expiration_rule(
+                                days=settings.media_handler.audio_storage.expiration_days,
+                            ),
+                            error_message="Failed to put result storage expiration rule",
+                            success_message="Result storage expiration rule has been put",
+                        )
+                    )
+            elif isinstance(settings.media_handler.audio_storage, app_settings.LocalAudioStorageSettings):
+                audio_storage_file_client = files_utils.FileClient(
+                    loop=loop,
+                    thread_pool_executor=thread_pool_executor,
+                    root_path=pathlib.Path(settings.media_handler.audio_storage.path),
+                )
+                aiohttp_subsystem_readiness_callbacks.append(
+                    aiohttp_utils.SubsystemReadinessCallback(
+                        name="audio_storage_local",
+                        is_ready=audio_storage_file_client.is_ready,
+                    )
                 )
+                audio_storage_client = voice_clients.LocalStorage(file_client=audio_storage_file_client)
+                result_storage_client = voice_clients.LocalResultStorage(file_client=audio_storage_file_client)
+                delivery_storage_client = voice_clients.LocalDeliveryStorage(file_client=audio_storage_file_client)
+                if settings.media_handler.audio_storage.expiration_days is not None:
+                    audio_storage_sweeper = files_utils.Sweeper(
+                        file_client=audio_storage_file_client,
+                        prefixes=[f"{audio_storage_client.key_prefix}/", f"{result_storage_client.key_prefix}/"],
+                        max_age_seconds=settings.media_handler.audio_storage.expiration_days * 24 * 60 * 60,
+                        interval_seconds=settings.media_handler.audio_storage.expiration_sweep_interval_seconds,
+                    )
+                    lifecycle_main_tasks.append(
+                        asyncio.create_task(
+                            coro=audio_storage_sweeper.run(),
+                            name="audio_storage_sweeper",
+                        )
+                    )
+                if (
+                    settings.media_handler.callback_delivery_enabled
+                    and settings.media_handler.callback_delivery_marker_expiration_days is not None
+                ):
+                    delivery_marker_sweeper = files_utils.Sweeper(
+                        file_client=audio_storage_file_client,
+                        prefixes=[delivery_storage_client.delivered_key_prefix],
+                        max_age_seconds=settings.media_handler.callback_delivery_marker_expiration_days * 24 * 60 * 60,
+                        interval_seconds=settings.media_handler.audio_storage.expiration_sweep_interval_seconds,
+                    )
+                    lifecycle_main_tasks.append(
+                        asyncio.create_task(
+                            coro=delivery_marker_sweeper.run(),
+                            name="delivery_marker_sweeper",
+                        )
+                    )
             else:
                 raise NotImplementedError(
                     f"Unsupported audio storage type: {settings.media_handler.audio_storage.type_name}"
                 )
+            temporal_runtime: temporalio_runtime.Runtime | None = None
+            if settings.media_handler.metrics_bind_address is not None:
+                temporal_runtime = temporalio_runtime.Runtime(
+                    telemetry=temporalio_runtime.TelemetryConfig(
+                        metrics=temporalio_runtime.PrometheusConfig(
+                            bind_address=settings.media_handler.metrics_bind_address,
+                        ),
+                    ),
+                )
             audio_storage_temporal_client = await temporalio_client.Client.connect(
                 target_host=settings.media_handler.temporalio.endpoint_url,
                 namespace=settings.media_handler.temporalio.namespace,
+                data_converter=temporal_converter.create_data_converter(
+                    compression_threshold_bytes=settings.media_handler.temporalio.payload_compression_threshold_bytes,
+                ),
+                runtime=temporal_runtime,
                 lazy=True,
             )
 
@@ -182,19 +300,96 @@ class Application:
             )
             aiogram_media_recognition_task_service = voice_services.TemporalRecognitionTask(
                 audio_storage_client=audio_storage_client,
+                result_storage_client=result_storage_client,
                 temporal_client=audio_storage_temporal_client,
                 temporal_task_queue=settings.media_handler.temporalio.task_queue,
                 split_timeout_seconds=settings.media_handler.split_timeout_seconds,
+                split_timeout_seconds_per_audio_second=settings.media_handler.split_timeout_seconds_per_audio_second,
+                split_heartbeat_timeout_seconds=settings.media_handler.split_heartbeat_timeout_seconds,
                 recognition_timeout_seconds=settings.media_handler.recognition_timeout_seconds,
+                recognition_timeout_seconds_per_audio_second=(
+                    settings.media_handler.recognition_timeout_seconds_per_audio_second
+                ),
                 clean_up_timeout_seconds=settings.media_handler.clean_up_timeout_seconds,
+                recognition_max_in_flight=settings.media_handler.recognition_max_in_flight,
+                recognition_batch_duration_seconds=settings.media_handler.recognition_batch_duration_seconds,
+                result_offload_threshold_bytes=settings.media_handler.result_offload_threshold_bytes,
+                session_enabled=settings.media_handler.session_enabled,
+                session_schedule_to_start_timeout_seconds=(
+                    settings.media_handler.session_schedule_to_start_timeout_seconds
+                ),
+                split_task_queue=settings.media_handler.split_task_queue,
+                recognition_task_queue=settings.media_handler.recognition_task_queue,
+                lanes=[
+                    voice_services.RecognitionLane(
+                        name=lane.name,
+                        max_audio_duration_seconds=lane.max_audio_duration_seconds,
+                        task_queue=lane.task_queue,
+                        split_task_queue=lane.split_task_queue,
+                        recognition_task_queue=lane.recognition_task_queue,
+                    )
+                    for lane in settings.media_handler.lanes
+                ],
+                callback_with_result_enabled=settings.media_handler.callback_with_result_enabled,
+                download_timeout_seconds=settings.media_handler.download_timeout_seconds,
+                local_activities_enabled=settings.media_handler.local_activities_enabled,
+                local_activity_max_attempts=settings.media_handler.local_activity_max_attempts,
+                content_addressed=settings.media_handler.content_addressed_storage_enabled,
+                split_indexed=settings.media_handler.split_index_enabled,
+                storage_expiration_enabled=settings.media_handler.audio_storage.expiration_days is not None,
             )
-            aiogram_media_message_handler = aiogram_handlers.TaskMediaMessageHandler(
+            aiogram_task_media_message_handler = aiogram_handlers.TaskMediaMessageHandler(
                 recognition_task_service=aiogram_media_recognition_task_service,
                 bot=aiogram_bot,
+                remote_download_enabled=settings.media_handler.remote_download_enabled,
             )
+            if isinstance(settings.media_handler, app_settings.HybridMediaHandlerSettings):
+                aiogram_media_message_handler = aiogram_handlers.HybridMediaMessageHandler(
+                    bot=aiogram_bot,
+                    synchronous_handler=aiogram_handlers.SynchronousMediaMessageHandler(
+                        recognition_service=recognition_service,
+                        bot=aiogram_bot,
+                    ),
+                    task_handler=aiogram_task_media_message_handler,
+                    inline_max_audio_duration_seconds=settings.media_handler.inline_max_audio_duration_seconds,
+                    inline_max_file_size_bytes=settings.media_handler.inline_max_file_size_bytes,
+                    metric_meter=(
+                        temporal_runtime.metric_meter
+                        if temporal_runtime is not None
+                        else temporalio_common.MetricMeter.noop
+                    ),
+                )
+            else:
+                aiogram_media_message_handler = aiogram_task_media_message_handler
+            aiohttp_media_callback_delivery_queue: aiohttp_handlers.MediaCallbackDeliveryQueue | None = None
+            if settings.media_handler.callback_delivery_enabled:
+                aiohttp_media_callback_delivery_queue = aiohttp_handlers.MediaCallbackDeliveryQueue(
+                    delivery_storage_client=delivery_storage_client,
+                    recognition_task_service=aiogram_media_recognition_task_service,
+                    callback_processor=aiogram_task_media_message_handler.process_callback,
+                    workers_count=settings.media_handler.callback_delivery_workers_count,
+                    max_attempts=settings.media_handler.callback_delivery_max_attempts,
+                    retry_delay_seconds=settings.media_handler.callback_delivery_retry_delay_seconds,
+                )
+                lifecycle_startup_callbacks.append(
+                    lifecycle_utils.Callback(
+                        awaitable=aiohttp_media_callback_delivery_queue.restore(),
+                        error_message="Failed to restore pending media callback deliveries",
+                        success_message="Pending media callback deliveries have been restored",
+                    )
+                )
+                lifecycle_main_tasks.append(
+                    asyncio.create_task(
+                        coro=aiohttp_media_callback_delivery_queue.run(),
+                        name="media_callback_delivery_queue",
+                    )
+                )
             aiohttp_media_callback_handler = aiohttp_handlers.MediaCallbackHandler(
                 recognition_task_service=aiogram_media_recognition_task_service,
-                callback_processor=aiogram_media_message_handler.process_callback,
+                callback_processor=aiogram_task_media_message_handler.process_callback,
+                signing_secret=settings.media_handler.callback_secret,
+                signature_tolerance_seconds=settings.media_handler.callback_signature_tolerance_seconds,
+                delivery_queue=aiohttp_media_callback_delivery_queue,
             )
             aiohttp_url_dispatcher.add_route(
                 aiohttp_media_callback_handler.method,
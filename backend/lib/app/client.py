@@ -1,24 +1,48 @@
 import dataclasses
+import time
 import uuid
 
 import aiohttp
 
 import lib.aiohttp.handlers as aiohttp_handlers
+import lib.utils.hmac as hmac_utils
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
 
 
 @dataclasses.dataclass(frozen=True)
 class AppClient:
     aiohttp_client: aiohttp.ClientSession
     base_url: str
-
-    async def media_callback(self, audio_id: uuid.UUID) -> None:
-        request = aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=audio_id)
-        data = request.to_json_bytes()
+    signing_secret: str | None = None
+
+    async def media_callback(
+        self,
+        audio_id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult | None = None,
+        result_id: uuid.UUID | None = None,
+    ) -> None:
+        request = aiohttp_handlers.MediaCallbackHandler.RequestSchema(
+            audio_id=audio_id,
+            result=voice_schemas.RecognitionTaskResult.from_dataclass(result) if result is not None else None,
+            result_id=result_id,
+        )
+        data = request.to_bytes()
+        headers = {"Content-Type": aiohttp_handlers.MediaCallbackHandler.content_type}
+        if self.signing_secret is not None:
+            timestamp = int(time.time())
+            headers[aiohttp_handlers.MediaCallbackHandler.signature_timestamp_header] = str(timestamp)
+            headers[aiohttp_handlers.MediaCallbackHandler.signature_header] = hmac_utils.sign_timestamped(
+                secret=self.signing_secret,
+                data=data,
+                timestamp=timestamp,
+            )
 
         async with self.aiohttp_client.request(
             method=aiohttp_handlers.MediaCallbackHandler.method,
             url=f"{self.base_url}{aiohttp_handlers.MediaCallbackHandler.path}",
             data=data,
+            headers=headers,
         ) as response:
             response.raise_for_status()
 
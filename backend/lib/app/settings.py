@@ -1,3 +1,4 @@
+import typing
 import warnings
 
 import pydantic
@@ -39,6 +40,7 @@ class TemporalioSettings(pydantic_utils.BaseSettingsModel):
     port: int = NotImplemented
     namespace: str = NotImplemented
     task_queue: str = NotImplemented
+    payload_compression_threshold_bytes: int | None = 1024  # compression is disabled when None
 
     @property
     def endpoint_url(self) -> str:
@@ -51,23 +53,42 @@ class S3Settings(pydantic_utils.BaseSettingsModel):
     bucket_name: str = NotImplemented
     access_key: str = NotImplemented
     secret_key: str = NotImplemented
+    max_pool_connections: int = 50  # bounds concurrent chunk uploads and downloads
+    connect_timeout_seconds: float = 5
+    read_timeout_seconds: float = 60
+    retry_mode: typing.Literal["legacy", "standard", "adaptive"] = "standard"
+    max_attempts: int = 3  # including the first attempt
 
     @property
     def endpoint_url(self) -> str:
         return f"http://{self.host}:{self.port}"
 
 
-class BaseAudioStorageSettings(pydantic_utils.TypedBaseSettingsModel): ...
+class BaseAudioStorageSettings(pydantic_utils.TypedBaseSettingsModel):
+    # Stored audio and results expire instead of being deleted by workflows, leaked by failed ones included
+    expiration_days: int | None = None
 
 
 class S3AudioStorageSettings(BaseAudioStorageSettings):
     type_name: str = "s3"
     s3: S3Settings = pydantic.Field(default_factory=S3Settings)
+    stream_threshold_bytes: int = 16 * 1024 * 1024  # 16 MiB, larger audio is uploaded as multipart
+    part_size_bytes: int = 8 * 1024 * 1024  # 8 MiB, S3 requires at least 5 MiB
+    max_concurrency: int = 4  # parts uploaded at once
 
 
 BaseAudioStorageSettings.register("s3", S3AudioStorageSettings)
 
 
+class LocalAudioStorageSettings(BaseAudioStorageSettings):
+    type_name: str = "local"
+    path: str = NotImplemented  # has to be shared by the bot and the worker, e.g. a mounted volume
+    expiration_sweep_interval_seconds: float = 60 * 60  # 1 hour
+
+
+BaseAudioStorageSettings.register("local", LocalAudioStorageSettings)
+
+
 class TelegramSettings(pydantic_utils.BaseSettingsModel):
     token: str = NotImplemented
     bot_name: str = "SpeechToTextBot"
@@ -88,6 +109,14 @@ class SynchronousMediaHandlerSettings(BaseMediaHandlerSettings):
     type_name: str = "synchronous"
 
 
+class RecognitionLaneSettings(pydantic_utils.BaseSettingsModel):
+    name: str = NotImplemented
+    max_audio_duration_seconds: float = NotImplemented
+    task_queue: str = NotImplemented
+    split_task_queue: str | None = None  # lane task queue by default
+    recognition_task_queue: str | None = None  # lane task queue by default
+
+
 class TemporalioMediaHandlerSettings(BaseMediaHandlerSettings):
     type_name: str = "temporalio"
 
@@ -95,12 +124,55 @@ class TemporalioMediaHandlerSettings(BaseMediaHandlerSettings):
     audio_storage: pydantic_utils.TypedAnnotation[BaseAudioStorageSettings] = NotImplemented
 
     split_timeout_seconds: int = 10 * 60  # 10 minutes
-    recognition_timeout_seconds: int = 10 * 60  # 10 minutes
+    split_timeout_seconds_per_audio_second: float = 0.5
+    split_heartbeat_timeout_seconds: int = 60  # 1 minute
+    recognition_timeout_seconds: int = 30  # 30 seconds
+    recognition_timeout_seconds_per_audio_second: float = 2
     clean_up_timeout_seconds: int = 60  # 1 minute
+    recognition_max_in_flight: int = 10
+    recognition_batch_duration_seconds: float = 60  # 1 minute
+    result_offload_threshold_bytes: int = 64 * 1024  # 64 KiB
+    session_enabled: bool = False
+    session_schedule_to_start_timeout_seconds: int = 10  # 10 seconds
+    split_task_queue: str | None = None  # workflow task queue by default
+    recognition_task_queue: str | None = None  # workflow task queue by default
+    lanes: list[RecognitionLaneSettings] = []  # audio longer than any lane goes to the task queues above
+    callback_with_result_enabled: bool = False
+    callback_secret: str | None = None  # unsigned callbacks are accepted when None
+    callback_signature_tolerance_seconds: float = 5 * 60  # older signed callbacks are rejected as replayed
+    callback_delivery_enabled: bool = True  # callbacks are processed in the request when disabled
+    callback_delivery_workers_count: int = 4
+    callback_delivery_max_attempts: int = 5
+    callback_delivery_retry_delay_seconds: float = 1
+    # Redelivered callbacks are dropped while the marker is kept, opt-in as the S3 rule needs lifecycle permissions
+    callback_delivery_marker_expiration_days: int | None = None
+    remote_download_enabled: bool = False  # worker downloads audio from telegram, requires worker telegram_token
+    download_timeout_seconds: int = 5 * 60  # 5 minutes
+    metrics_bind_address: str | None = None  # e.g. "0.0.0.0:9000", prometheus metrics are disabled by default
+    local_activities_enabled: bool = False  # cleanup and callback run on the workflow worker
+    local_activity_max_attempts: int = 10
+    # Audio is deduplicated by content, requires expiration of the stored audio instead of cleanup
+    content_addressed_storage_enabled: bool = False
+    split_index_enabled: bool = False  # chunks are read as ranges of a single decoded audio instead of own objects
+
+    @pydantic.model_validator(mode="after")
+    def _check_content_addressed_storage_expiration(self) -> typing.Self:
+        # Content addressed audio is shared between tasks and never cleaned up, so it would be kept forever
+        if self.content_addressed_storage_enabled and self.audio_storage.expiration_days is None:
+            raise ValueError("content_addressed_storage_enabled requires audio_storage.expiration_days")
+        return self
+
+
+class HybridMediaHandlerSettings(TemporalioMediaHandlerSettings):
+    type_name: str = "hybrid"
+
+    inline_max_audio_duration_seconds: float = 30  # 30 seconds
+    inline_max_file_size_bytes: int = 1024 * 1024  # 1 MiB
 
 
 BaseMediaHandlerSettings.register("synchronous", SynchronousMediaHandlerSettings)
 BaseMediaHandlerSettings.register("temporalio", TemporalioMediaHandlerSettings)
+BaseMediaHandlerSettings.register("hybrid", HybridMediaHandlerSettings)
 
 
 class Settings(pydantic_utils.BaseSettings):
@@ -118,6 +190,7 @@ class Settings(pydantic_utils.BaseSettings):
 __all__ = [
     "AppSettings",
     "BaseAudioStorageSettings",
+    "LocalAudioStorageSettings",
     "LoggingSettings",
     "S3AudioStorageSettings",
     "S3Settings",
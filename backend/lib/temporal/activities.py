@@ -1,34 +1,315 @@
+import asyncio
+import collections
+import contextlib
 import dataclasses
+import datetime
+import functools
+import time
 import typing
 import uuid
 
+import aiogram
 import temporalio.activity as temporalio_activity
+import temporalio.common as temporalio_common
+import temporalio.converter as temporalio_converter
+import temporalio.exceptions as temporalio_exceptions
 
 import lib.app.client as app_client
+import lib.utils.asyncio as asyncio_utils
 import lib.voice.clients as voice_clients
 import lib.voice.models as voice_models
 
 
+@contextlib.asynccontextmanager
+async def _heartbeat_in_background(get_details: typing.Callable[[], typing.Any]) -> typing.AsyncIterator[None]:
+    """
+    Keeps heartbeating with the latest details while a long blocking step (e.g. splitting in executor) runs.
+    """
+    heartbeat_timeout = temporalio_activity.info().heartbeat_timeout
+    if heartbeat_timeout is None:
+        yield
+        return
+
+    async def heartbeat() -> None:
+        while True:
+            temporalio_activity.heartbeat(get_details())
+            await asyncio.sleep(heartbeat_timeout.total_seconds() / 2)
+
+    task = asyncio.create_task(heartbeat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+@dataclasses.dataclass(frozen=True)
+class _CostLimiterMetrics:
+    in_use_gauge: temporalio_common.MetricGaugeFloat
+    waiting_gauge: temporalio_common.MetricGauge
+    wait_histogram: temporalio_common.MetricHistogramTimedelta
+    cost_histogram: temporalio_common.MetricHistogramFloat
+
+    @classmethod
+    def create(cls, metric_meter: temporalio_common.MetricMeter) -> "_CostLimiterMetrics":
+        return cls(
+            in_use_gauge=metric_meter.create_gauge_float(
+                "cost_limiter_in_use",
+                "Expected cost of activity work currently admitted",
+                "s",
+            ),
+            waiting_gauge=metric_meter.create_gauge("cost_limiter_waiting", "Activity work waiting for admission"),
+            wait_histogram=metric_meter.create_histogram_timedelta(
+                "cost_limiter_wait",
+                "Time activity work has waited for admission",
+                "ms",
+            ),
+            cost_histogram=metric_meter.create_histogram_float(
+                "cost_limiter_admitted_cost",
+                "Expected cost of admitted activity work",
+                "s",
+            ),
+        )
+
+
+@contextlib.asynccontextmanager
+async def _hold_cost(
+    cost_limiter: asyncio_utils.WeightedSemaphore | None,
+    cost: float,
+    metrics: _CostLimiterMetrics,
+) -> typing.AsyncIterator[None]:
+    """
+    Admits the work only when its expected cost (audio duration in seconds) fits into the worker budget,
+    reports limiter decisions to the metrics.
+    """
+    if cost_limiter is None:
+        yield
+        return
+
+    started_at = time.monotonic()
+    metrics.waiting_gauge.set(cost_limiter.waiting + 1)
+    await cost_limiter.acquire(cost)
+    try:
+        metrics.wait_histogram.record(datetime.timedelta(seconds=time.monotonic() - started_at))
+        metrics.cost_histogram.record(cost)
+        metrics.in_use_gauge.set(cost_limiter.in_use)
+        metrics.waiting_gauge.set(cost_limiter.waiting)
+        yield
+    finally:
+        cost_limiter.release(cost)
+        metrics.in_use_gauge.set(cost_limiter.in_use)
+
+
+@dataclasses.dataclass(frozen=True)
+class SessionTaskQueue:
+    """
+    Returns the task queue polled only by the worker that picked up this activity,
+    activities scheduled on it share the worker's process-local storage.
+    """
+
+    task_queue: str
+
+    name: typing.ClassVar[str] = "session_task_queue"
+
+    @temporalio_activity.defn(name=name)
+    async def run(self) -> str:
+        return self.task_queue
+
+
+@dataclasses.dataclass(frozen=True)
+class Downloader:
+    """
+    Downloads audio from Telegram straight into the storage the splitter reads from,
+    so the bot doesn't have to pass the file through itself.
+    """
+
+    bot: aiogram.Bot
+    storage_client: voice_clients.StorageProtocol
+    timeout_seconds: int = 5 * 60
+    chunk_size: int = 64 * 1024
+
+    name: typing.ClassVar[str] = "downloader"
+
+    @dataclasses.dataclass(frozen=True)
+    class Params:
+        audio_id: uuid.UUID
+        remote_audio: voice_models.RemoteAudio
+
+    @temporalio_activity.defn(name=name)
+    async def run(self, params: Params) -> None:
+        file = await self.bot.get_file(params.remote_audio.file_id)
+        assert file.file_path is not None
+
+        # Piped into the storage as it is downloaded, so the file is never held in memory as a whole
+        chunks = self.bot.session.stream_content(
+            url=self.bot.session.api.file_url(self.bot.token, file.file_path),
+            timeout=self.timeout_seconds,
+            chunk_size=self.chunk_size,
+            raise_for_status=True,
+        )
+        try:
+            await self.storage_client.create_stream(
+                params.audio_id,
+                chunks,
+                duration_seconds=params.remote_audio.duration_seconds,
+                format=params.remote_audio.format,
+            )
+        except self.storage_client.AlreadyExistsError:
+            # Previous attempt has stored the audio but failed to complete
+            pass
+        finally:
+            # Releases the connection if the storage has stopped reading halfway
+            await chunks.aclose()
+
+
 @dataclasses.dataclass(frozen=True)
 class Splitter:
     splitter_client: voice_clients.SplitterProtocol
     storage_client: voice_clients.StorageProtocol
+    cost_limiter: asyncio_utils.WeightedSemaphore | None = None
+    upload_max_concurrency: int = 4  # splitting waits for a free upload slot, which also bounds chunks held in memory
 
     name: typing.ClassVar[str] = "splitter"
 
+    @functools.cached_property
+    def _cost_limiter_metrics(self) -> _CostLimiterMetrics:
+        # Created once per activity instance, on first use within an activity where its metric meter is available
+        return _CostLimiterMetrics.create(temporalio_activity.metric_meter())
+
     @dataclasses.dataclass(frozen=True)
     class Params:
         audio_id: uuid.UUID
+        # Chunks are stored under their content ids, so they are deduplicated and have to expire instead
+        content_addressed: bool = False
+        # Decoded audio is stored once and chunks are returned as its slices
+        indexed: bool = False
+
+    @dataclasses.dataclass(frozen=True)
+    class Chunk:
+        audio_id: uuid.UUID
+        duration_seconds: float
+        # Set for indexed audio, audio_id is then the id of the whole decoded audio
+        slice: voice_models.AudioSlice | None = None
+
+    @dataclasses.dataclass(frozen=True)
+    class Progress:
+        offset: int
+        chunks: list["Splitter.Chunk"]
+
+    def _get_progress(self) -> Progress:
+        heartbeat_details = temporalio_activity.info().heartbeat_details
+        if not heartbeat_details:
+            return self.Progress(offset=0, chunks=[])
+
+        return temporalio_converter.value_to_type(self.Progress, heartbeat_details[0])
+
+    async def _create(self, audio: voice_models.Audio, content_addressed: bool) -> uuid.UUID:
+        if content_addressed:
+            return await voice_clients.create_content_addressed(self.storage_client, audio)
+
+        id = uuid.uuid4()
+        await self.storage_client.create(id, audio)
+        return id
+
+    async def _delete_uploaded(
+        self,
+        uploads: typing.Iterable[tuple[asyncio.Task[uuid.UUID], float]],
+        content_addressed: bool,
+    ) -> None:
+        """
+        Deletes chunks uploaded after the reported progress, a retry would upload them again.
+        """
+        tasks = [task for task, _ in uploads]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if content_addressed:
+            # Content addressed chunks may be used by other jobs, they are left to expire
+            return
+
+        ids = [task.result() for task in tasks if not task.cancelled() and task.exception() is None]
+        if not ids:
+            return
+
+        try:
+            await self.storage_client.delete_many(ids)
+        except Exception:
+            temporalio_activity.logger.warning("Failed to delete %d uploaded chunks", len(ids), exc_info=True)
+
+    def _get_indexed_audio_id(self) -> uuid.UUID:
+        # Stable across attempts, so a retried activity reuses the decoded audio instead of leaving one behind
+        info = temporalio_activity.info()
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"{info.workflow_run_id}/{info.activity_id}")
+
+    async def _run_indexed(self, params: Params) -> list[Chunk]:
+        """
+        A single upload of the decoded audio instead of an export and an upload per chunk.
+        """
+        async with _heartbeat_in_background(self._get_progress):
+            audio = await self.storage_client.read(params.audio_id)
+
+            async with _hold_cost(self.cost_limiter, audio.duration_seconds, self._cost_limiter_metrics):
+                indexed_audio, slices = await self.splitter_client.index(audio)
+                if params.content_addressed:
+                    id = await voice_clients.create_content_addressed(self.storage_client, indexed_audio)
+                else:
+                    id = self._get_indexed_audio_id()
+                    try:
+                        await self.storage_client.create(id, indexed_audio)
+                    except self.storage_client.AlreadyExistsError:
+                        pass  # uploaded by a previous attempt, decoding the same audio gives the same data
+
+        return [
+            self.Chunk(audio_id=id, duration_seconds=audio_slice.duration_seconds, slice=audio_slice)
+            for audio_slice in slices
+        ]
 
     @temporalio_activity.defn(name=name)
-    async def run(self, params: Params) -> list[uuid.UUID]:
-        audio = await self.storage_client.read(params.audio_id)
+    async def run(self, params: Params) -> list[Chunk]:
+        if params.indexed:
+            return await self._run_indexed(params)
+
+        progress = self._get_progress()
+        result = list(progress.chunks)
+        # Chunks are uploaded concurrently, but only the uploaded prefix goes to progress, so a retry resumes after it
+        uploads: collections.deque[tuple[asyncio.Task[uuid.UUID], float]] = collections.deque()
+        semaphore = asyncio.Semaphore(self.upload_max_concurrency)
+
+        def get_progress() -> Splitter.Progress:
+            return self.Progress(offset=len(result), chunks=[*result])
+
+        def collect_uploaded() -> None:
+            """
+            :raises Exception: of the first failed upload in chunk order
+            """
+            uploaded_count = len(result)
+            while uploads and uploads[0][0].done():
+                task, duration_seconds = uploads.popleft()
+                result.append(self.Chunk(audio_id=task.result(), duration_seconds=duration_seconds))
+            if len(result) > uploaded_count:
+                temporalio_activity.heartbeat(get_progress())
+
+        async def upload(item: voice_models.Audio) -> uuid.UUID:
+            try:
+                return await self._create(item, params.content_addressed)
+            finally:
+                semaphore.release()
 
-        result: list[uuid.UUID] = []
-        async for item in self.splitter_client.split(audio):
-            id = uuid.uuid4()
-            await self.storage_client.create(id, item)
-            result.append(id)
+        try:
+            async with _heartbeat_in_background(get_progress):
+                audio = await self.storage_client.read(params.audio_id)
+
+                async with _hold_cost(self.cost_limiter, audio.duration_seconds, self._cost_limiter_metrics):
+                    async for item in self.splitter_client.split(audio, offset=progress.offset):
+                        await semaphore.acquire()
+                        uploads.append((asyncio.create_task(upload(item)), item.duration_seconds))
+                        collect_uploaded()
+
+                    while uploads:
+                        await asyncio.wait([uploads[0][0]])
+                        collect_uploaded()
+        except BaseException:
+            await self._delete_uploaded(uploads, params.content_addressed)
+            raise
 
         return result
 
@@ -50,6 +331,81 @@ class Recognition:
         return await self.recognition_client.recognize(audio)
 
 
+def _get_results_size_bytes(results: typing.Iterable[voice_models.RecognitionResult]) -> int:
+    return sum(len(item.text.encode("utf-8")) for item in results)
+
+
+@dataclasses.dataclass(frozen=True)
+class RecognitionBatch:
+    recognition_client: voice_clients.RecognitionProtocol
+    storage_client: voice_clients.StorageProtocol
+    result_storage_client: voice_clients.ResultStorageProtocol
+    max_concurrency: int = 4
+    cost_limiter: asyncio_utils.WeightedSemaphore | None = None
+
+    name: typing.ClassVar[str] = "recognition_batch"
+
+    @functools.cached_property
+    def _cost_limiter_metrics(self) -> _CostLimiterMetrics:
+        # Created once per activity instance, on first use within an activity where its metric meter is available
+        return _CostLimiterMetrics.create(temporalio_activity.metric_meter())
+
+    @dataclasses.dataclass(frozen=True)
+    class Params:
+        audio_ids: list[uuid.UUID]
+        # Slice per audio id for indexed audio, see Splitter.Chunk
+        slices: list[voice_models.AudioSlice] | None = None
+        # Larger results are written to the result storage and only referenced by Output, so the workflow never
+        # holds them; plain results are returned when None (workflows started before)
+        offload_threshold_bytes: int | None = None
+
+    @dataclasses.dataclass(frozen=True)
+    class Output:
+        results: list[voice_models.RecognitionResult] | None = None
+        result_id: uuid.UUID | None = None
+
+    def _get_part_id(self) -> uuid.UUID:
+        # Stable across attempts, so a retried activity overwrites its part instead of leaving one behind
+        info = temporalio_activity.info()
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"{info.workflow_run_id}/{info.activity_id}")
+
+    async def _offload(self, results: list[voice_models.RecognitionResult], threshold_bytes: int) -> Output:
+        if _get_results_size_bytes(results) <= threshold_bytes:
+            return self.Output(results=results)
+
+        part_id = self._get_part_id()
+        await self.result_storage_client.create(
+            part_id,
+            voice_models.RecognitionTaskResult(recognition_results=results, metadata=""),
+        )
+        return self.Output(result_id=part_id)
+
+    @temporalio_activity.defn(name=name)
+    async def run(self, params: Params) -> list[voice_models.RecognitionResult] | Output:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def recognize(
+            id: uuid.UUID,
+            audio_slice: voice_models.AudioSlice | None,
+        ) -> voice_models.RecognitionResult:
+            # Reads are started right away for the whole batch, only recognition itself is bounded
+            if audio_slice is not None:
+                audio = await voice_clients.read_slice(self.storage_client, id, audio_slice)
+            else:
+                audio = await self.storage_client.read(id)
+            async with semaphore, _hold_cost(self.cost_limiter, audio.duration_seconds, self._cost_limiter_metrics):
+                return await self.recognition_client.recognize(audio)
+
+        slices = params.slices or [None] * len(params.audio_ids)
+        results = await asyncio.gather(
+            *[recognize(id, audio_slice) for id, audio_slice in zip(params.audio_ids, slices)],
+        )
+        if params.offload_threshold_bytes is None:
+            return results
+
+        return await self._offload(results, params.offload_threshold_bytes)
+
+
 @dataclasses.dataclass(frozen=True)
 class Cleaner:
     storage_client: voice_clients.StorageProtocol
@@ -58,11 +414,96 @@ class Cleaner:
 
     @dataclasses.dataclass(frozen=True)
     class Params:
-        audio_id: uuid.UUID
+        audio_ids: list[uuid.UUID] = dataclasses.field(default_factory=list)
+        # Single audio per activity scheduled by workflows started before bulk deletes
+        audio_id: uuid.UUID | None = None
+
+    @temporalio_activity.defn(name=name)
+    async def run(self, params: Params) -> None:
+        audio_ids = [*params.audio_ids, *([params.audio_id] if params.audio_id is not None else [])]
+
+        try:
+            await self.storage_client.delete_many(audio_ids)
+        except self.storage_client.DeleteManyError as exc:
+            for id, error in exc.errors.items():
+                temporalio_activity.logger.warning("Failed to delete audio %s: %s", id, error)
+
+            raise temporalio_exceptions.ApplicationError(
+                f"Failed to delete {len(exc.errors)} of {len(audio_ids)} audios",
+                {str(id): error for id, error in exc.errors.items()},
+                type="DeleteManyError",
+            ) from exc
+
+
+@dataclasses.dataclass(frozen=True)
+class ResultSaver:
+    result_storage_client: voice_clients.ResultStorageProtocol
+
+    name: typing.ClassVar[str] = "result_saver"
+
+    @dataclasses.dataclass(frozen=True)
+    class Params:
+        result_id: uuid.UUID
+        # Whole result passed by workflows started before results were assembled from parts
+        result: voice_models.RecognitionTaskResult | None = None
+        metadata: str = ""
+        parts: list[RecognitionBatch.Output] = dataclasses.field(default_factory=list)
+
+    async def _assemble(self, params: Params) -> voice_models.RecognitionTaskResult | None:
+        """
+        Joins results of the parts in order, None if a part is gone, i.e. a previous attempt has already saved them.
+        """
+
+        async def read(part: RecognitionBatch.Output) -> list[voice_models.RecognitionResult] | None:
+            if part.result_id is None:
+                return part.results or []
+
+            try:
+                part_result = await self.result_storage_client.read(part.result_id)
+            except self.result_storage_client.NotFoundError:
+                return None
+            return part_result.recognition_results
+
+        parts_results = await asyncio.gather(*(read(part) for part in params.parts))
+        results: list[voice_models.RecognitionResult] = []
+        for part_results in parts_results:
+            if part_results is None:
+                return None
+            results.extend(part_results)
+
+        return voice_models.RecognitionTaskResult(recognition_results=results, metadata=params.metadata)
+
+    @temporalio_activity.defn(name=name)
+    async def run(self, params: Params) -> None:
+        if params.result is not None:
+            await self.result_storage_client.create(params.result_id, params.result)
+            return
+
+        result = await self._assemble(params)
+        if result is None:
+            # Raises NotFoundError unless the previous attempt has saved the result before deleting the parts
+            await self.result_storage_client.read(params.result_id)
+            return
+
+        await self.result_storage_client.create(params.result_id, result)
+        part_ids = [part.result_id for part in params.parts if part.result_id is not None]
+        if part_ids:
+            await self.result_storage_client.delete_many(part_ids)
+
+
+@dataclasses.dataclass(frozen=True)
+class ResultCleaner:
+    result_storage_client: voice_clients.ResultStorageProtocol
+
+    name: typing.ClassVar[str] = "result_cleaner"
+
+    @dataclasses.dataclass(frozen=True)
+    class Params:
+        result_id: uuid.UUID
 
     @temporalio_activity.defn(name=name)
     async def run(self, params: Params) -> None:
-        await self.storage_client.delete(params.audio_id)
+        await self.result_storage_client.delete(params.result_id)
 
 
 @dataclasses.dataclass(frozen=True)
@@ -74,14 +515,26 @@ class Callback:
     @dataclasses.dataclass(frozen=True)
     class Params:
         audio_id: uuid.UUID
+        result: voice_models.RecognitionTaskResult | None = None
+        result_id: uuid.UUID | None = None
 
     @temporalio_activity.defn(name=name)
     async def run(self, params: Params) -> None:
-        await self.main_app_client.media_callback(params.audio_id)
+        await self.main_app_client.media_callback(
+            audio_id=params.audio_id,
+            result=params.result,
+            result_id=params.result_id,
+        )
 
 
 __all__ = [
+    "Callback",
     "Cleaner",
+    "Downloader",
     "Recognition",
+    "RecognitionBatch",
+    "ResultCleaner",
+    "ResultSaver",
+    "SessionTaskQueue",
     "Splitter",
 ]
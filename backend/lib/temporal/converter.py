@@ -0,0 +1,115 @@
+import dataclasses
+import enum
+import typing
+import zlib
+
+import msgpack
+import temporalio.api.common.v1 as temporalio_common
+import temporalio.converter as temporalio_converter
+
+_json_encoder = temporalio_converter.AdvancedJSONEncoder()
+
+
+def _default(value: typing.Any) -> typing.Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+
+    return _json_encoder.default(value)
+
+
+class MsgpackPayloadConverter(temporalio_converter.EncodingPayloadConverter):
+    """
+    Same value mapping as the default JSON converter (dataclasses, UUIDs), but packed with msgpack.
+    """
+
+    @property
+    def encoding(self) -> str:
+        return "binary/msgpack"
+
+    def to_payload(self, value: typing.Any) -> temporalio_common.Payload | None:
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            # Nested dataclasses are handled by asdict, leftovers (UUIDs, enums) by default
+            value = dataclasses.asdict(value)
+
+        return temporalio_common.Payload(
+            metadata={"encoding": self.encoding.encode()},
+            data=msgpack.packb(value, default=_default),
+        )
+
+    def from_payload(self, payload: temporalio_common.Payload, type_hint: type | None = None) -> typing.Any:
+        value = msgpack.unpackb(payload.data)
+        if type_hint is None:
+            return value
+
+        return temporalio_converter.value_to_type(type_hint, value)
+
+
+class PayloadConverter(temporalio_converter.CompositePayloadConverter):
+    """
+    Encodes values with msgpack, JSON converter is kept to decode payloads from histories written before.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(
+            temporalio_converter.BinaryNullPayloadConverter(),
+            temporalio_converter.BinaryPlainPayloadConverter(),
+            temporalio_converter.JSONProtoPayloadConverter(),
+            temporalio_converter.BinaryProtoPayloadConverter(),
+            MsgpackPayloadConverter(),
+            temporalio_converter.JSONPlainPayloadConverter(),
+        )
+
+
+class ZlibPayloadCodec(temporalio_converter.PayloadCodec):
+    """
+    Compresses whole payloads (metadata included) larger than threshold_bytes,
+    payloads without the zlib encoding are passed through on decode, so it can be enabled on a live namespace.
+    """
+
+    ENCODING: typing.ClassVar[bytes] = b"binary/zlib"
+
+    def __init__(self, threshold_bytes: int | None = 1024, level: int = 6) -> None:
+        self._threshold_bytes = threshold_bytes
+        self._level = level
+
+    def _encode(self, payload: temporalio_common.Payload) -> temporalio_common.Payload:
+        if self._threshold_bytes is None or payload.ByteSize() <= self._threshold_bytes:
+            return payload
+
+        data = zlib.compress(payload.SerializeToString(), self._level)
+        if len(data) >= payload.ByteSize():
+            return payload
+
+        return temporalio_common.Payload(metadata={"encoding": self.ENCODING}, data=data)
+
+    def _decode(self, payload: temporalio_common.Payload) -> temporalio_common.Payload:
+        if payload.metadata.get("encoding") != self.ENCODING:
+            return payload
+
+        decoded = temporalio_common.Payload()
+        decoded.ParseFromString(zlib.decompress(payload.data))
+        return decoded
+
+    async def encode(self, payloads: typing.Sequence[temporalio_common.Payload]) -> list[temporalio_common.Payload]:
+        return [self._encode(payload) for payload in payloads]
+
+    async def decode(self, payloads: typing.Sequence[temporalio_common.Payload]) -> list[temporalio_common.Payload]:
+        return [self._decode(payload) for payload in payloads]
+
+
+def create_data_converter(compression_threshold_bytes: int | None = 1024) -> temporalio_converter.DataConverter:
+    """
+    Both the client starting workflows and the worker have to use the same data converter.
+    """
+    return temporalio_converter.DataConverter(
+        payload_converter_class=PayloadConverter,
+        payload_codec=ZlibPayloadCodec(threshold_bytes=compression_threshold_bytes),
+    )
+
+
+__all__ = [
+    "MsgpackPayloadConverter",
+    "PayloadConverter",
+    "ZlibPayloadCodec",
+    "create_data_converter",
+]
@@ -1,26 +1,134 @@
 import asyncio
 import concurrent.futures as concurrent_futures
 import dataclasses
+import datetime
+import functools
 import logging
+import pathlib
 import typing
+import uuid
 
 import aiobotocore.session as aiobotocore_session
+import aiogram
 import aiohttp
 import temporalio.client as temporalio_client
+import temporalio.common as temporalio_common
+import temporalio.runtime as temporalio_runtime
 import temporalio.worker as temporalio_worker
 
 import lib.app.client as app_client
 import lib.app.errors as app_errors
 import lib.temporal.activities as temporal_activities
+import lib.temporal.converter as temporal_converter
 import lib.temporal.worker.settings as temporal_worker_settings
 import lib.temporal.workflows as temporal_workflows
 import lib.utils.aiobotocore as aiobotocore_utils
+import lib.utils.asyncio as asyncio_utils
+import lib.utils.files as files_utils
 import lib.utils.lifecycle as lifecycle_utils
 import lib.utils.logging as logging_utils
 import lib.voice.clients as voice_clients
 
 logger = logging.getLogger(__name__)
 
+LOCAL_ACTIVITY_NAMES = [
+    temporal_activities.Callback.name,
+    temporal_activities.Cleaner.name,
+    temporal_activities.ResultCleaner.name,
+]
+
+
+def create_worker_concurrency_kwargs(worker_settings: temporal_worker_settings.WorkerSettings) -> dict[str, typing.Any]:
+    if worker_settings.tuner is None:
+        return {"max_concurrent_activities": worker_settings.max_concurrent_activities}
+
+    ramp_throttle = (
+        datetime.timedelta(milliseconds=worker_settings.tuner.activity_ramp_throttle_ms)
+        if worker_settings.tuner.activity_ramp_throttle_ms is not None
+        else None
+    )
+    return {
+        "tuner": temporalio_worker.WorkerTuner.create_resource_based(
+            target_memory_usage=worker_settings.tuner.target_memory_usage,
+            target_cpu_usage=worker_settings.tuner.target_cpu_usage,
+            activity_config=temporalio_worker.ResourceBasedSlotConfig(
+                minimum_slots=worker_settings.tuner.activity_minimum_slots,
+                maximum_slots=worker_settings.tuner.activity_maximum_slots,
+                ramp_throttle=ramp_throttle,
+            ),
+        ),
+    }
+
+
+def create_activities(
+    storage_client: voice_clients.StorageProtocol,
+    result_storage_client: voice_clients.ResultStorageProtocol,
+    recognition_client: voice_clients.RecognitionProtocol,
+    splitter_client: voice_clients.SplitterProtocol,
+    main_app_client: app_client.AppClient,
+    telegram_bot: aiogram.Bot | None,
+    cost_limiter: asyncio_utils.WeightedSemaphore | None,
+    recognition_batch_max_concurrency: int,
+    split_upload_max_concurrency: int,
+) -> dict[str, typing.Callable[..., typing.Any]]:
+    activities: dict[str, typing.Callable[..., typing.Any]] = {
+        temporal_activities.Recognition.name: temporal_activities.Recognition(
+            recognition_client=recognition_client,
+            storage_client=storage_client,
+        ).run,
+        temporal_activities.RecognitionBatch.name: temporal_activities.RecognitionBatch(
+            recognition_client=recognition_client,
+            storage_client=storage_client,
+            result_storage_client=result_storage_client,
+            max_concurrency=recognition_batch_max_concurrency,
+            cost_limiter=cost_limiter,
+        ).run,
+        temporal_activities.Splitter.name: temporal_activities.Splitter(
+            splitter_client=splitter_client,
+            storage_client=storage_client,
+            cost_limiter=cost_limiter,
+            upload_max_concurrency=split_upload_max_concurrency,
+        ).run,
+        temporal_activities.Cleaner.name: temporal_activities.Cleaner(
+            storage_client=storage_client,
+        ).run,
+        temporal_activities.ResultSaver.name: temporal_activities.ResultSaver(
+            result_storage_client=result_storage_client,
+        ).run,
+        temporal_activities.ResultCleaner.name: temporal_activities.ResultCleaner(
+            result_storage_client=result_storage_client,
+        ).run,
+        temporal_activities.Callback.name: temporal_activities.Callback(
+            main_app_client=main_app_client,
+        ).run,
+    }
+    if telegram_bot is not None:
+        activities[temporal_activities.Downloader.name] = temporal_activities.Downloader(
+            bot=telegram_bot,
+            storage_client=storage_client,
+        ).run
+    return activities
+
+
+def get_activity_names(
+    worker_settings: temporal_worker_settings.WorkerSettings,
+    activities: dict[str, typing.Callable[..., typing.Any]],
+) -> list[str]:
+    """
+    :raises ValueError: if the worker settings name an unknown activity
+    """
+    activity_names = worker_settings.activities if worker_settings.activities is not None else [*activities]
+    if worker_settings.workflows_enabled:
+        # Local activities are executed by the worker running the workflow
+        activity_names = [
+            *activity_names,
+            *[name for name in LOCAL_ACTIVITY_NAMES if name not in activity_names],
+        ]
+    for activity_name in activity_names:
+        if activity_name not in activities:
+            raise ValueError(f"Unknown activity: {activity_name}")
+    return activity_names
+
 
 @dataclasses.dataclass(frozen=True)
 class Application:
@@ -56,35 +164,42 @@ class Application:
         lifecycle_shutdown_callbacks.append(
             lifecycle_utils.Callback.from_dispose(name="aiohttp_client", awaitable=aiohttp_client.close())
         )
+        temporal_runtime: temporalio_runtime.Runtime | None = None
+        if settings.metrics_bind_address is not None:
+            temporal_runtime = temporalio_runtime.Runtime(
+                telemetry=temporalio_runtime.TelemetryConfig(
+                    metrics=temporalio_runtime.PrometheusConfig(bind_address=settings.metrics_bind_address),
+                ),
+            )
         temporal_client = await temporalio_client.Client.connect(
             target_host=settings.temporalio.endpoint_url,
             namespace=settings.temporalio.namespace,
+            data_converter=temporal_converter.create_data_converter(
+                compression_threshold_bytes=settings.temporalio.payload_compression_threshold_bytes,
+            ),
+            runtime=temporal_runtime,
         )
         loop = asyncio.get_running_loop()
-        thread_pool_executor = concurrent_futures.ThreadPoolExecutor(max_workers=10)
 
         logger.info("Initializing clients")
 
-        conversion_client = voice_clients.PydubConversion(
-            loop=loop,
-            thread_pool_executor=thread_pool_executor,
-        )
-        splitter_client = voice_clients.PydubOnSilenceSplitter(
-            loop=loop,
-            thread_pool_executor=thread_pool_executor,
-            conversion_client=conversion_client,
-        )
-        recognition_client = voice_clients.SpeechRecognition(
-            loop=loop,
-            thread_pool_executor=thread_pool_executor,
-            conversion_client=conversion_client,
-        )
         if isinstance(settings.audio_storage, temporal_worker_settings.S3AudioStorageSettings):
             audio_storage_s3_client = aiobotocore_utils.S3Client(
                 session=aiobotocore_session.AioSession(),
                 endpoint_url=settings.audio_storage.s3.endpoint_url,
                 access_key=settings.audio_storage.s3.access_key,
                 secret_key=settings.audio_storage.s3.secret_key,
+                max_pool_connections=settings.audio_storage.s3.max_pool_connections,
+                connect_timeout_seconds=settings.audio_storage.s3.connect_timeout_seconds,
+                read_timeout_seconds=settings.audio_storage.s3.read_timeout_seconds,
+                retry_mode=settings.audio_storage.s3.retry_mode,
+                max_attempts=settings.audio_storage.s3.max_attempts,
+            )
+            lifecycle_startup_callbacks.append(
+                lifecycle_utils.Callback.from_warm_up(
+                    name="audio_storage_s3_client",
+                    awaitable=audio_storage_s3_client.warm_up(bucket_name=settings.audio_storage.s3.bucket_name),
+                ),
             )
             lifecycle_shutdown_callbacks.append(
                 lifecycle_utils.Callback.from_dispose(
@@ -95,48 +210,149 @@ class Application:
             audio_storage_client = voice_clients.S3Storage(
                 s3_client=audio_storage_s3_client,
                 bucket_name=settings.audio_storage.s3.bucket_name,
+                stream_threshold_bytes=settings.audio_storage.stream_threshold_bytes,
+                part_size=settings.audio_storage.part_size_bytes,
+                max_concurrency=settings.audio_storage.max_concurrency,
+            )
+            result_storage_client = voice_clients.S3ResultStorage(
+                s3_client=audio_storage_s3_client,
+                bucket_name=settings.audio_storage.s3.bucket_name,
             )
+        elif isinstance(settings.audio_storage, temporal_worker_settings.LocalAudioStorageSettings):
+            audio_storage_file_client = files_utils.FileClient(
+                loop=loop,
+                thread_pool_executor=concurrent_futures.ThreadPoolExecutor(
+                    max_workers=settings.thread_pool_executor_max_workers,
+                ),
+                root_path=pathlib.Path(settings.audio_storage.path),
+            )
+            audio_storage_client = voice_clients.LocalStorage(file_client=audio_storage_file_client)
+            result_storage_client = voice_clients.LocalResultStorage(file_client=audio_storage_file_client)
         else:
             raise NotImplementedError(f"Unsupported audio storage type: {settings.audio_storage.type_name}")
+        if settings.storage_cache_max_size_bytes is not None:
+            # Shared by all worker pools, so chunks written by the splitter are read back from memory by recognition
+            audio_storage_client = voice_clients.CachedStorage(
+                storage_client=audio_storage_client,
+                max_size_bytes=settings.storage_cache_max_size_bytes,
+                metric_meter=(
+                    temporal_runtime.metric_meter
+                    if temporal_runtime is not None
+                    else temporalio_common.MetricMeter.noop
+                ),
+            )
         main_app_client = app_client.AppClient(
             aiohttp_client=aiohttp_client,
             base_url=settings.main_app_url,
+            signing_secret=settings.main_app_callback_secret,
         )
+        telegram_bot: aiogram.Bot | None = None
+        if settings.telegram_token is not None:
+            telegram_bot = aiogram.Bot(token=settings.telegram_token)
+            lifecycle_shutdown_callbacks.append(
+                lifecycle_utils.Callback.from_dispose(
+                    name="telegram_bot",
+                    awaitable=telegram_bot.session.close(),
+                )
+            )
 
-        logger.info("Initializing temporal activities")
+        for worker_settings in settings.get_workers():
+            logger.info("Initializing temporal worker for task queue %s", worker_settings.task_queue)
 
-        recognition_activity = temporal_activities.Recognition(
-            recognition_client=recognition_client,
-            storage_client=audio_storage_client,
-        )
-        splitter_activity = temporal_activities.Splitter(
-            splitter_client=splitter_client,
-            storage_client=audio_storage_client,
-        )
-        cleaner_activity = temporal_activities.Cleaner(
-            storage_client=audio_storage_client,
-        )
-        callback_activity = temporal_activities.Callback(
-            main_app_client=main_app_client,
-        )
+            thread_pool_executor = concurrent_futures.ThreadPoolExecutor(
+                max_workers=worker_settings.thread_pool_executor_max_workers,
+            )
+            conversion_client = voice_clients.PydubConversion(
+                loop=loop,
+                thread_pool_executor=thread_pool_executor,
+            )
+            splitter_client = voice_clients.PydubOnSilenceSplitter(
+                loop=loop,
+                thread_pool_executor=thread_pool_executor,
+                conversion_client=conversion_client,
+            )
+            recognition_client = voice_clients.SpeechRecognition(
+                loop=loop,
+                thread_pool_executor=thread_pool_executor,
+                conversion_client=conversion_client,
+            )
+            # Shared by the pool and its session worker, since both use the same thread pool executor
+            cost_limiter = (
+                asyncio_utils.WeightedSemaphore(capacity=worker_settings.cost_capacity_seconds)
+                if worker_settings.cost_capacity_seconds is not None
+                else None
+            )
 
-        logger.info("Initializing temporal worker")
-
-        temporal_worker = temporalio_worker.Worker(
-            client=temporal_client,
-            task_queue=settings.temporalio.task_queue,
-            workflows=[temporal_workflows.Recognition],
-            activities=[
-                recognition_activity.run,
-                splitter_activity.run,
-                cleaner_activity.run,
-                callback_activity.run,
-            ],
-        )
-        lifecycle_main_tasks.append(loop.create_task(temporal_worker.run()))
-        lifecycle_shutdown_callbacks.append(
-            lifecycle_utils.Callback.from_dispose(name="temporal_worker", awaitable=temporal_worker.shutdown())
-        )
+            # Bound now, so activities of each pool get its own clients and cost limiter
+            create_pool_activities = functools.partial(
+                create_activities,
+                result_storage_client=result_storage_client,
+                recognition_client=recognition_client,
+                splitter_client=splitter_client,
+                main_app_client=main_app_client,
+                telegram_bot=telegram_bot,
+                cost_limiter=cost_limiter,
+                recognition_batch_max_concurrency=settings.recognition_batch_max_concurrency,
+                split_upload_max_concurrency=settings.split_upload_max_concurrency,
+            )
+            activities = create_pool_activities(storage_client=audio_storage_client)
+            activity_names = get_activity_names(worker_settings=worker_settings, activities=activities)
+            worker_activities = [activities[activity_name] for activity_name in activity_names]
+
+            if settings.session_enabled and temporal_activities.Splitter.name in activity_names:
+                logger.info("Initializing temporal session worker for task queue %s", worker_settings.task_queue)
+
+                session_task_queue = f"{worker_settings.task_queue}-session-{uuid.uuid4()}"
+                session_task_queue_activity = temporal_activities.SessionTaskQueue(
+                    task_queue=session_task_queue,
+                )
+                worker_activities.append(session_task_queue_activity.run)
+
+                session_activities = create_pool_activities(
+                    storage_client=voice_clients.MemoryStorage(
+                        fallback_storage_client=audio_storage_client,
+                        max_size_bytes=settings.session_storage_max_size_bytes,
+                        ttl_seconds=settings.session_storage_ttl_seconds,
+                    )
+                )
+                session_activity_names = [
+                    temporal_activities.Downloader.name,
+                    temporal_activities.Splitter.name,
+                    temporal_activities.RecognitionBatch.name,
+                    temporal_activities.Cleaner.name,
+                ]
+                temporal_session_worker = temporalio_worker.Worker(
+                    client=temporal_client,
+                    task_queue=session_task_queue,
+                    activities=[
+                        session_activities[activity_name]
+                        for activity_name in session_activity_names
+                        if activity_name in session_activities
+                    ],
+                    **create_worker_concurrency_kwargs(worker_settings),
+                )
+                lifecycle_main_tasks.append(loop.create_task(temporal_session_worker.run()))
+                lifecycle_shutdown_callbacks.append(
+                    lifecycle_utils.Callback.from_dispose(
+                        name=f"temporal_session_worker({session_task_queue})",
+                        awaitable=temporal_session_worker.shutdown(),
+                    )
+                )
+
+            temporal_worker = temporalio_worker.Worker(
+                client=temporal_client,
+                task_queue=worker_settings.task_queue,
+                workflows=[temporal_workflows.Recognition] if worker_settings.workflows_enabled else [],
+                activities=worker_activities,
+                **create_worker_concurrency_kwargs(worker_settings),
+            )
+            lifecycle_main_tasks.append(loop.create_task(temporal_worker.run()))
+            lifecycle_shutdown_callbacks.append(
+                lifecycle_utils.Callback.from_dispose(
+                    name=f"temporal_worker({worker_settings.task_queue})",
+                    awaitable=temporal_worker.shutdown(),
+                )
+            )
 
         logger.info("Initializing lifecycle manager")
 
@@ -186,4 +402,7 @@ class Application:
 
 __all__ = [
     "Application",
+    "create_activities",
+    "create_worker_concurrency_kwargs",
+    "get_activity_names",
 ]
@@ -4,12 +4,31 @@ import lib.utils.pydantic as pydantic_utils
 from lib.app.settings import (
     AppSettings,
     BaseAudioStorageSettings,
+    LocalAudioStorageSettings,
     LoggingSettings,
     S3AudioStorageSettings,
     TemporalioSettings,
 )
 
 
+class WorkerTunerSettings(pydantic_utils.BaseSettingsModel):
+    target_memory_usage: float = 0.8  # fraction of system memory
+    target_cpu_usage: float = 0.9  # fraction of system cpu
+    activity_minimum_slots: int | None = None
+    activity_maximum_slots: int | None = None
+    activity_ramp_throttle_ms: int | None = None
+
+
+class WorkerSettings(pydantic_utils.BaseSettingsModel):
+    task_queue: str = NotImplemented
+    workflows_enabled: bool = True
+    activities: list[str] | None = None  # all activities by default
+    max_concurrent_activities: int = 100  # ignored when tuner is set
+    thread_pool_executor_max_workers: int = 10
+    tuner: WorkerTunerSettings | None = None  # resource based activity slots
+    cost_capacity_seconds: float | None = None  # audio seconds processed at once, unbounded by default
+
+
 class Settings(pydantic_utils.BaseSettings):
     SETTINGS_PATH = "SETTINGS_WORKER_PATH"
 
@@ -20,13 +39,37 @@ class Settings(pydantic_utils.BaseSettings):
     audio_storage: pydantic_utils.TypedAnnotation[BaseAudioStorageSettings] = NotImplemented
 
     main_app_url: str = NotImplemented
+    main_app_callback_secret: str | None = None  # callbacks are not signed when None
+    telegram_token: str | None = None  # required for the downloader activity
+    metrics_bind_address: str | None = None  # e.g. "0.0.0.0:9000", prometheus metrics are disabled by default
     thread_pool_executor_max_workers: int = 10
+    recognition_batch_max_concurrency: int = 4
+    split_upload_max_concurrency: int = 4  # chunk uploads in flight per split, also bounds chunks held in memory
+    session_enabled: bool = False
+    session_storage_max_size_bytes: int | None = None  # chunks left by failed session jobs are evicted beyond it
+    session_storage_ttl_seconds: float | None = 3600  # should exceed the longest session job
+    storage_cache_max_size_bytes: int | None = None  # in-process LRU of recent audio, disabled when None
+    workers: list[WorkerSettings] = []
+
+    def get_workers(self) -> list[WorkerSettings]:
+        if self.workers:
+            return self.workers
+
+        return [
+            WorkerSettings(
+                task_queue=self.temporalio.task_queue,
+                thread_pool_executor_max_workers=self.thread_pool_executor_max_workers,
+            )
+        ]
 
 
 __all__ = [
     "AppSettings",
+    "LocalAudioStorageSettings",
     "LoggingSettings",
     "S3AudioStorageSettings",
     "Settings",
     "TemporalioSettings",
+    "WorkerSettings",
+    "WorkerTunerSettings",
 ]
@@ -5,6 +5,8 @@ import logging
 import typing
 import uuid
 
+import temporalio.common as temporalio_common
+import temporalio.exceptions as temporalio_exceptions
 import temporalio.workflow as temporalio_workflow
 
 with temporalio_workflow.unsafe.imports_passed_through():
@@ -19,76 +21,392 @@ T = typing.TypeVar("T")
 
 @temporalio_workflow.defn
 class Recognition:
+    @dataclasses.dataclass(frozen=True)
+    class Output:
+        """
+        Either holds the result inline or references it in the result storage when it's too large
+        to be kept in workflow state.
+        """
+
+        result: voice_models.RecognitionTaskResult | None = None
+        result_id: uuid.UUID | None = None
+
     def __init__(self) -> None:
-        self.result: voice_models.RecognitionTaskResult | None = None
+        self.output: Recognition.Output | None = None
+
+    @dataclasses.dataclass(frozen=True)
+    class Session:
+        task_queue: str | None = None
+        schedule_to_start_timeout: datetime.timedelta | None = None
+
+    async def _get_session(
+        self,
+        schedule_to_start_timeout: datetime.timedelta,
+        task_queue: str | None,
+    ) -> Session:
+        """
+        Session task queue is served next to the splitter, so it is requested from the split task queue.
+        """
+        task_queue = await temporalio_workflow.execute_activity(
+            temporal_activities.SessionTaskQueue.name,
+            task_queue=task_queue,
+            start_to_close_timeout=schedule_to_start_timeout,
+            result_type=str,
+        )
+        return self.Session(task_queue=task_queue, schedule_to_start_timeout=schedule_to_start_timeout)
+
+    async def _download(
+        self,
+        audio_id: uuid.UUID,
+        remote_audio: voice_models.RemoteAudio,
+        timeout: datetime.timedelta,
+        task_queue: str | None,
+        session: Session,
+    ) -> None:
+        await temporalio_workflow.execute_activity(
+            temporal_activities.Downloader.name,
+            temporal_activities.Downloader.Params(audio_id=audio_id, remote_audio=remote_audio),
+            task_queue=session.task_queue or task_queue,
+            schedule_to_start_timeout=session.schedule_to_start_timeout,
+            start_to_close_timeout=timeout,
+        )
 
     async def _split(
         self,
         audio_id: uuid.UUID,
+        content_addressed: bool,
+        indexed: bool,
         timeout: datetime.timedelta,
-    ) -> list[uuid.UUID]:
+        heartbeat_timeout: datetime.timedelta,
+        task_queue: str | None,
+        session: Session,
+    ) -> list[temporal_activities.Splitter.Chunk]:
         return await temporalio_workflow.execute_activity(
             temporal_activities.Splitter.name,
-            temporal_activities.Splitter.Params(audio_id),
-            start_to_close_timeout=datetime.timedelta(seconds=60),
+            temporal_activities.Splitter.Params(audio_id, content_addressed=content_addressed, indexed=indexed),
+            task_queue=session.task_queue or task_queue,
+            schedule_to_start_timeout=session.schedule_to_start_timeout,
+            start_to_close_timeout=timeout,
+            heartbeat_timeout=heartbeat_timeout,
+            result_type=list[temporal_activities.Splitter.Chunk],
+        )
+
+    async def _gather_windowed(
+        self,
+        factories: typing.Sequence[typing.Callable[[], typing.Awaitable[T]]],
+        window_size: int,
+    ) -> list[T]:
+        """
+        Runs awaitables produced by factories keeping at most window_size of them in flight.
+        Semaphore waiters are woken up in FIFO order, so the next factory is started in order as soon as
+        any in-flight awaitable finishes, which keeps the scheduling deterministic for replay.
+        """
+        semaphore = asyncio.Semaphore(max(window_size, 1))
+
+        async def run(factory: typing.Callable[[], typing.Awaitable[T]]) -> T:
+            async with semaphore:
+                return await factory()
+
+        return await asyncio.gather(*[run(factory) for factory in factories])
+
+    def _get_batches(
+        self,
+        chunks: list[temporal_activities.Splitter.Chunk],
+        max_duration_seconds: float,
+    ) -> list[list[temporal_activities.Splitter.Chunk]]:
+        """
+        Groups consecutive chunks while their total duration fits into max_duration_seconds,
+        a single chunk longer than the limit forms its own batch.
+        """
+        batches: list[list[temporal_activities.Splitter.Chunk]] = []
+        batch_duration_seconds = 0.0
+
+        for chunk in chunks:
+            if batches and batch_duration_seconds + chunk.duration_seconds <= max_duration_seconds:
+                batches[-1].append(chunk)
+                batch_duration_seconds += chunk.duration_seconds
+            else:
+                batches.append([chunk])
+                batch_duration_seconds = chunk.duration_seconds
+
+        return batches
+
+    async def _recognize_batch(
+        self,
+        batch: list[temporal_activities.Splitter.Chunk],
+        timeout: datetime.timedelta,
+        task_queue: str | None,
+        session: Session,
+        offload_threshold_bytes: int | None,
+    ) -> temporal_activities.RecognitionBatch.Output:
+        params = temporal_activities.RecognitionBatch.Params(
+            [chunk.audio_id for chunk in batch],
+            slices=[chunk.slice for chunk in batch if chunk.slice is not None] or None,
+            offload_threshold_bytes=offload_threshold_bytes,
+        )
+        if offload_threshold_bytes is None:
+            results = await temporalio_workflow.execute_activity(
+                temporal_activities.RecognitionBatch.name,
+                params,
+                task_queue=session.task_queue or task_queue,
+                schedule_to_start_timeout=session.schedule_to_start_timeout,
+                start_to_close_timeout=timeout,
+                result_type=list[voice_models.RecognitionResult],
+            )
+            return temporal_activities.RecognitionBatch.Output(results=results)
+
+        return await temporalio_workflow.execute_activity(
+            temporal_activities.RecognitionBatch.name,
+            params,
+            task_queue=session.task_queue or task_queue,
+            schedule_to_start_timeout=session.schedule_to_start_timeout,
+            start_to_close_timeout=timeout,
+            result_type=temporal_activities.RecognitionBatch.Output,
         )
 
     async def _recognize(
+        self,
+        chunks: list[temporal_activities.Splitter.Chunk],
+        get_timeout: typing.Callable[[float], datetime.timedelta],
+        batch_duration_seconds: float,
+        max_in_flight: int,
+        task_queue: str | None,
+        session: Session,
+        offload_threshold_bytes: int | None,
+    ) -> list[temporal_activities.RecognitionBatch.Output]:
+        """
+        A batch result is offloaded by the worker once it exceeds offload_threshold_bytes, a result that large
+        would be saved by the workflow anyway. None keeps all results in the workflow.
+        """
+        batches = self._get_batches(chunks, batch_duration_seconds)
+
+        def factory(
+            batch: list[temporal_activities.Splitter.Chunk],
+        ) -> typing.Callable[[], typing.Awaitable[temporal_activities.RecognitionBatch.Output]]:
+            return lambda: self._recognize_batch(
+                batch,
+                timeout=get_timeout(sum(chunk.duration_seconds for chunk in batch)),
+                task_queue=task_queue,
+                session=session,
+                offload_threshold_bytes=offload_threshold_bytes,
+            )
+
+        return await self._gather_windowed(
+            factories=[factory(batch) for batch in batches],
+            window_size=max_in_flight,
+        )
+
+    async def _execute_housekeeping(
+        self,
+        activity: str,
+        arg: typing.Any,
+        timeout: datetime.timedelta,
+        local_retry_policy: temporalio_common.RetryPolicy | None,
+        session: Session | None = None,
+    ) -> None:
+        """
+        Runs a cheap step as a local activity on the workflow worker when local_retry_policy is set,
+        skipping the task queue round trip. Steps pinned to a session task queue always run as regular activities.
+        """
+        session = session or self.Session()
+        if local_retry_policy is not None and session.task_queue is None:
+            await temporalio_workflow.execute_local_activity(
+                activity,
+                arg,
+                start_to_close_timeout=timeout,
+                retry_policy=local_retry_policy,
+            )
+            return
+
+        await temporalio_workflow.execute_activity(
+            activity,
+            arg,
+            task_queue=session.task_queue,
+            schedule_to_start_timeout=session.schedule_to_start_timeout,
+            start_to_close_timeout=timeout,
+        )
+
+    async def _clean_up(
         self,
         audio_ids: list[uuid.UUID],
         timeout: datetime.timedelta,
-    ) -> list[voice_models.RecognitionResult]:
-        return await asyncio.gather(
-            *[
-                temporalio_workflow.execute_activity(
-                    temporal_activities.Recognition.name,
-                    temporal_activities.Recognition.Params(id),
-                    start_to_close_timeout=datetime.timedelta(seconds=60),
-                )
-                for id in audio_ids
-            ]
+        session: Session,
+        local_retry_policy: temporalio_common.RetryPolicy | None = None,
+    ) -> None:
+        await self._execute_housekeeping(
+            temporal_activities.Cleaner.name,
+            temporal_activities.Cleaner.Params(audio_ids),
+            timeout=timeout,
+            local_retry_policy=local_retry_policy,
+            session=session,
         )
 
-    async def _clean_up(self, audio_ids: list[uuid.UUID], timeout: datetime.timedelta) -> None:
-        await asyncio.gather(
-            *[
-                temporalio_workflow.execute_activity(
-                    temporal_activities.Cleaner.name,
-                    temporal_activities.Cleaner.Params(id),
-                    start_to_close_timeout=timeout,
-                )
-                for id in audio_ids
-            ]
+    async def _clean_up_session(
+        self,
+        audio_ids: list[uuid.UUID],
+        timeout: datetime.timedelta,
+        session: Session,
+    ) -> None:
+        """
+        Best effort, audio is left to the session storage eviction if the session worker is gone.
+        """
+        try:
+            await self._clean_up(audio_ids=audio_ids, timeout=timeout, session=session)
+        except temporalio_exceptions.ActivityError:
+            temporalio_workflow.logger.warning("Failed to clean up audio on task queue %s", session.task_queue)
+
+    def _get_result_size_bytes(self, result: voice_models.RecognitionTaskResult) -> int:
+        return len(result.metadata.encode("utf-8")) + sum(
+            len(item.text.encode("utf-8")) for item in result.recognition_results
         )
 
-    async def _callback(self, audio_id: uuid.UUID, timeout: datetime.timedelta) -> None:
+    async def _save_result(
+        self,
+        result_id: uuid.UUID,
+        timeout: datetime.timedelta,
+        result: voice_models.RecognitionTaskResult | None = None,
+        metadata: str = "",
+        parts: list[temporal_activities.RecognitionBatch.Output] | None = None,
+    ) -> None:
+        """
+        The result is either passed whole or assembled by the worker from the batch parts.
+        """
         await temporalio_workflow.execute_activity(
-            temporal_activities.Callback.name,
-            temporal_activities.Callback.Params(audio_id),
+            temporal_activities.ResultSaver.name,
+            temporal_activities.ResultSaver.Params(
+                result_id=result_id,
+                result=result,
+                metadata=metadata,
+                parts=parts or [],
+            ),
             start_to_close_timeout=timeout,
         )
 
+    async def _clean_up_result(
+        self,
+        result_id: uuid.UUID,
+        timeout: datetime.timedelta,
+        local_retry_policy: temporalio_common.RetryPolicy | None = None,
+    ) -> None:
+        await self._execute_housekeeping(
+            temporal_activities.ResultCleaner.name,
+            temporal_activities.ResultCleaner.Params(result_id=result_id),
+            timeout=timeout,
+            local_retry_policy=local_retry_policy,
+        )
+
+    async def _callback(
+        self,
+        audio_id: uuid.UUID,
+        output: Output | None,
+        timeout: datetime.timedelta,
+        local_retry_policy: temporalio_common.RetryPolicy | None = None,
+    ) -> None:
+        """
+        Output is pushed along with the callback, so the bot doesn't need to query the workflow.
+        """
+        await self._execute_housekeeping(
+            temporal_activities.Callback.name,
+            temporal_activities.Callback.Params(
+                audio_id=audio_id,
+                result=output.result if output is not None else None,
+                result_id=output.result_id if output is not None else None,
+            ),
+            timeout=timeout,
+            local_retry_policy=local_retry_policy,
+        )
+
+    def _record_latency(self, lane: str) -> None:
+        """
+        Time from the workflow start until the user is notified, queueing on the lane task queues included.
+        """
+        temporalio_workflow.metric_meter().with_additional_attributes({"lane": lane}).create_histogram_timedelta(
+            "recognition_latency",
+            "Time from recognition workflow start until the result is delivered",
+            "ms",
+        ).record(temporalio_workflow.now() - temporalio_workflow.info().start_time)
+
     @temporalio_workflow.query
-    def get_result(self) -> voice_models.RecognitionTaskResult | None:
-        return self.result
+    def get_result(self) -> Output | None:
+        return self.output
 
     @dataclasses.dataclass(frozen=True)
     class Params:
         metadata: str
 
         audio_id: uuid.UUID
+        # Workflow id, reported in the callback; workflows started before it was introduced use audio_id
+        task_id: uuid.UUID | None = None
+        audio_duration_seconds: float = 0
+        # Audio is downloaded by the worker when set, otherwise it is already in the storage
+        remote_audio: voice_models.RemoteAudio | None = None
+        download_timeout_seconds: int = 5 * 60
         split_timeout_seconds: int = 10 * 60
-        recognize_timeout_seconds: int = 10 * 60
+        split_timeout_seconds_per_audio_second: float = 0.5
+        split_heartbeat_timeout_seconds: int = 60
+        recognize_timeout_seconds: int = 30
+        recognize_timeout_seconds_per_audio_second: float = 2
         clean_up_timeout_seconds: int = 60
         callback_timeout_seconds: int = 10
+        recognize_max_in_flight: int = 10
+        recognize_batch_duration_seconds: float = 60
+        result_offload_threshold_bytes: int = 64 * 1024
+        result_save_timeout_seconds: int = 60
+        result_save_timeout_seconds_per_part: float = 1
+        session_enabled: bool = False
+        session_schedule_to_start_timeout_seconds: int = 10
+        # None routes activities to the workflow task queue
+        split_task_queue: str | None = None
+        recognize_task_queue: str | None = None
+        lane: str = "default"
+        callback_with_result: bool = False
+        # Cleanup and callback run as local activities on the workflow worker when enabled
+        local_activities_enabled: bool = False
+        local_activity_max_attempts: int = 10
+        local_activity_initial_interval_seconds: float = 1
+        local_activity_maximum_interval_seconds: float = 30
+        # Uploaded audio and chunks written on the shared task queue are stored under their content ids,
+        # they may be used by other jobs, so they are left to expire instead of being cleaned up
+        content_addressed: bool = False
+        # Splitter stores the decoded audio once and recognition reads chunks as its ranges
+        split_indexed: bool = False
+        # Shared storage expires audio and results on its own, so they are not cleaned up explicitly
+        storage_expiration_enabled: bool = False
+
+        @property
+        def source_content_addressed(self) -> bool:
+            # Downloaded audio is stored under the id assigned before its content was known
+            return self.content_addressed and self.remote_audio is None
 
         @property
         def split_timeout(self) -> datetime.timedelta:
-            return datetime.timedelta(seconds=self.split_timeout_seconds)
+            return datetime.timedelta(
+                seconds=self.split_timeout_seconds
+                + self.split_timeout_seconds_per_audio_second * self.audio_duration_seconds
+            )
+
+        @property
+        def download_timeout(self) -> datetime.timedelta:
+            return datetime.timedelta(seconds=self.download_timeout_seconds)
 
         @property
-        def recognize_timeout(self) -> datetime.timedelta:
-            return datetime.timedelta(seconds=self.recognize_timeout_seconds)
+        def split_heartbeat_timeout(self) -> datetime.timedelta:
+            return datetime.timedelta(seconds=self.split_heartbeat_timeout_seconds)
+
+        def get_recognize_timeout(self, audio_duration_seconds: float) -> datetime.timedelta:
+            return datetime.timedelta(
+                seconds=self.recognize_timeout_seconds
+                + self.recognize_timeout_seconds_per_audio_second * audio_duration_seconds
+            )
+
+        @property
+        def session_schedule_to_start_timeout(self) -> datetime.timedelta:
+            return datetime.timedelta(seconds=self.session_schedule_to_start_timeout_seconds)
+
+        def get_result_save_timeout(self, parts_count: int) -> datetime.timedelta:
+            return datetime.timedelta(
+                seconds=self.result_save_timeout_seconds + self.result_save_timeout_seconds_per_part * parts_count
+            )
 
         @property
         def clean_up_timeout(self) -> datetime.timedelta:
@@ -98,21 +416,253 @@ class Recognition:
         def callback_timeout(self) -> datetime.timedelta:
             return datetime.timedelta(seconds=self.callback_timeout_seconds)
 
+        @property
+        def local_activity_retry_policy(self) -> temporalio_common.RetryPolicy | None:
+            if not self.local_activities_enabled:
+                return None
+
+            return temporalio_common.RetryPolicy(
+                initial_interval=datetime.timedelta(seconds=self.local_activity_initial_interval_seconds),
+                maximum_interval=datetime.timedelta(seconds=self.local_activity_maximum_interval_seconds),
+                maximum_attempts=self.local_activity_max_attempts,
+            )
+
+    async def _process(
+        self,
+        params: Params,
+        session: Session,
+        offload_threshold_bytes: int | None,
+        created_audio_ids: list[uuid.UUID] | None = None,
+    ) -> tuple[list[temporal_activities.Splitter.Chunk], list[temporal_activities.RecognitionBatch.Output]]:
+        """
+        Ids of audio stored on the way are appended to created_audio_ids to clean them up if a later step fails.
+        """
+        created_audio_ids = created_audio_ids if created_audio_ids is not None else []
+        if params.remote_audio is not None:
+            # Downloaded next to the splitter, so in a session the audio never leaves the worker
+            await self._download(
+                audio_id=params.audio_id,
+                remote_audio=params.remote_audio,
+                timeout=params.download_timeout,
+                task_queue=params.split_task_queue,
+                session=session,
+            )
+            created_audio_ids.append(params.audio_id)
+        chunks = await self._split(
+            audio_id=params.audio_id,
+            # Session chunks are process-local and always cleaned up
+            content_addressed=params.content_addressed and session.task_queue is None,
+            indexed=params.split_indexed,
+            timeout=params.split_timeout,
+            heartbeat_timeout=params.split_heartbeat_timeout,
+            task_queue=params.split_task_queue,
+            session=session,
+        )
+        created_audio_ids.extend(dict.fromkeys(chunk.audio_id for chunk in chunks))
+        outputs = await self._recognize(
+            chunks=chunks,
+            get_timeout=params.get_recognize_timeout,
+            batch_duration_seconds=params.recognize_batch_duration_seconds,
+            max_in_flight=params.recognize_max_in_flight,
+            task_queue=params.recognize_task_queue,
+            session=session,
+            offload_threshold_bytes=offload_threshold_bytes,
+        )
+        return chunks, outputs
+
+    async def _process_in_session(
+        self,
+        params: Params,
+        offload_threshold_bytes: int | None,
+    ) -> tuple[list[temporal_activities.Splitter.Chunk], list[temporal_activities.RecognitionBatch.Output], Session]:
+        """
+        Pins split and recognition to a single worker, so chunks stay in its process-local storage.
+        If the session worker is gone, the whole job is processed again on the shared task queue,
+        while audio the session has stored so far is cleaned up in case the session worker is still there.
+        """
+        session_clean_up: asyncio.Task[None] | None = None
+        if params.session_enabled:
+            session = await self._get_session(
+                schedule_to_start_timeout=params.session_schedule_to_start_timeout,
+                task_queue=params.split_task_queue,
+            )
+            created_audio_ids: list[uuid.UUID] = []
+            try:
+                chunks, outputs = await self._process(
+                    params=params,
+                    session=session,
+                    offload_threshold_bytes=offload_threshold_bytes,
+                    created_audio_ids=created_audio_ids,
+                )
+                return chunks, outputs, session
+            except temporalio_exceptions.ActivityError:
+                temporalio_workflow.logger.warning(
+                    "Session on task queue %s has failed, falling back to shared task queue",
+                    session.task_queue,
+                )
+            if created_audio_ids and temporalio_workflow.patched("session-fallback-clean-up"):
+                session_clean_up = asyncio.create_task(
+                    self._clean_up_session(
+                        audio_ids=created_audio_ids,
+                        timeout=params.clean_up_timeout,
+                        session=session,
+                    )
+                )
+
+        session = self.Session()
+        chunks, outputs = await self._process(
+            params=params,
+            session=session,
+            offload_threshold_bytes=offload_threshold_bytes,
+        )
+        if session_clean_up is not None:
+            await session_clean_up
+        return chunks, outputs, session
+
+    async def _run_legacy(self, params: Params) -> Output:
+        """
+        Command sequence of workflows started before batched recognition, so they can still be replayed:
+        recognition and cleanup per chunk, the bot queries the result on callback.
+        """
+        audio_id = params.audio_id
+        # Splitters deployed since return chunks instead of ids
+        chunks = await temporalio_workflow.execute_activity(
+            temporal_activities.Splitter.name,
+            temporal_activities.Splitter.Params(audio_id),
+            start_to_close_timeout=datetime.timedelta(seconds=60),
+            result_type=list[typing.Any],
+        )
+        chunk_ids = [uuid.UUID(chunk["audio_id"] if isinstance(chunk, dict) else chunk) for chunk in chunks]
+        recognition_results = await asyncio.gather(
+            *[
+                temporalio_workflow.execute_activity(
+                    temporal_activities.Recognition.name,
+                    temporal_activities.Recognition.Params(id),
+                    start_to_close_timeout=datetime.timedelta(seconds=60),
+                    result_type=voice_models.RecognitionResult,
+                )
+                for id in chunk_ids
+            ]
+        )
+        self.output = self.Output(
+            result=voice_models.RecognitionTaskResult(
+                recognition_results=list(recognition_results),
+                metadata=params.metadata,
+            )
+        )
+
+        await temporalio_workflow.execute_activity(
+            temporal_activities.Callback.name,
+            temporal_activities.Callback.Params(audio_id),
+            start_to_close_timeout=params.callback_timeout,
+        )
+        await asyncio.gather(
+            *[
+                temporalio_workflow.execute_activity(
+                    temporal_activities.Cleaner.name,
+                    temporal_activities.Cleaner.Params(audio_id=id),
+                    start_to_close_timeout=params.clean_up_timeout,
+                )
+                for id in [audio_id, *chunk_ids]
+            ]
+        )
+
+        return self.output
+
     @temporalio_workflow.run
-    async def run(self, params: Params) -> voice_models.RecognitionTaskResult:
+    async def run(self, params: Params) -> Output:
+        if not temporalio_workflow.patched("batched-recognition"):
+            return await self._run_legacy(params)
+
         audio_id = params.audio_id
+        task_id = params.task_id or audio_id
+        # Options added since are gated as well, workflows replayed without their markers keep the former sequence
+        callback_with_result = params.callback_with_result and temporalio_workflow.patched("callback-with-result")
+        storage_expiration_enabled = params.storage_expiration_enabled and temporalio_workflow.patched(
+            "storage-expiration"
+        )
 
-        splitted_ids = await self._split(audio_id=audio_id, timeout=params.split_timeout)
-        recognition_results = await self._recognize(audio_ids=[*splitted_ids], timeout=params.recognize_timeout)
-        self.result = voice_models.RecognitionTaskResult(
-            recognition_results=recognition_results,
+        # Workflows started before keep receiving whole batch results and saving the joined result
+        batch_offload_enabled = temporalio_workflow.patched("recognition-batch-offload")
+        chunks, outputs, session = await self._process_in_session(
+            params,
+            offload_threshold_bytes=params.result_offload_threshold_bytes if batch_offload_enabled else None,
+        )
+        result = voice_models.RecognitionTaskResult(
+            recognition_results=[item for output in outputs for item in output.results or []],
             metadata=params.metadata,
         )
 
-        await self._callback(audio_id=audio_id, timeout=params.callback_timeout)
-        await self._clean_up(audio_ids=[audio_id, *splitted_ids], timeout=params.clean_up_timeout)
+        if any(output.result_id is not None for output in outputs):
+            await self._save_result(
+                result_id=task_id,
+                metadata=params.metadata,
+                parts=outputs,
+                timeout=params.get_result_save_timeout(parts_count=len(outputs)),
+            )
+            self.output = self.Output(result_id=task_id)
+        elif self._get_result_size_bytes(result) > params.result_offload_threshold_bytes:
+            await self._save_result(
+                result_id=task_id,
+                result=result,
+                timeout=params.get_result_save_timeout(parts_count=0),
+            )
+            self.output = self.Output(result_id=task_id)
+        else:
+            self.output = self.Output(result=result)
+
+        await self._callback(
+            audio_id=task_id,
+            output=self.output if callback_with_result else None,
+            timeout=params.callback_timeout,
+            local_retry_policy=params.local_activity_retry_policy,
+        )
+        self._record_latency(lane=params.lane)
+        # Indexed chunks and deduplicated chunks share their ids
+        chunk_ids = list(dict.fromkeys(chunk.audio_id for chunk in chunks))
+        if session.task_queue is None:
+            audio_ids = [
+                *([] if params.source_content_addressed or storage_expiration_enabled else [audio_id]),
+                *([] if params.content_addressed or storage_expiration_enabled else chunk_ids),
+            ]
+            if audio_ids:
+                await self._clean_up(
+                    audio_ids=audio_ids,
+                    timeout=params.clean_up_timeout,
+                    session=session,
+                    local_retry_policy=params.local_activity_retry_policy,
+                )
+        elif params.remote_audio is not None:
+            # Downloaded audio has never left the session worker
+            try:
+                await self._clean_up(
+                    audio_ids=[audio_id, *chunk_ids],
+                    timeout=params.clean_up_timeout,
+                    session=session,
+                )
+            except temporalio_exceptions.ActivityError:
+                temporalio_workflow.logger.warning("Failed to clean up audio on task queue %s", session.task_queue)
+        else:
+            try:
+                await self._clean_up(audio_ids=chunk_ids, timeout=params.clean_up_timeout, session=session)
+            except temporalio_exceptions.ActivityError:
+                # Session worker is gone along with its process-local chunks
+                temporalio_workflow.logger.warning("Failed to clean up chunks on task queue %s", session.task_queue)
+            if not params.source_content_addressed and not storage_expiration_enabled:
+                await self._clean_up(
+                    audio_ids=[audio_id],
+                    timeout=params.clean_up_timeout,
+                    session=self.Session(),
+                    local_retry_policy=params.local_activity_retry_policy,
+                )
+        if self.output.result_id is not None and not storage_expiration_enabled:
+            await self._clean_up_result(
+                result_id=self.output.result_id,
+                timeout=params.clean_up_timeout,
+                local_retry_policy=params.local_activity_retry_policy,
+            )
 
-        return self.result
+        return self.output
 
 
 __all__ = [
@@ -1,8 +1,13 @@
+import asyncio
 import contextlib
 import dataclasses
+import logging
 import typing
 
+import aiobotocore.config as aiobotocore_config
+import aiobotocore.response as aiobotocore_response
 import aiobotocore.session as aiobotocore_session
+import aiohttp
 
 if typing.TYPE_CHECKING:
     import types_aiobotocore_s3
@@ -13,6 +18,16 @@ else:
 
     AiobotocoreS3Client = aiobotocore_client.AioBaseClient
 
+logger = logging.getLogger(__name__)
+
+# Taken from the streaming body module that raises them, botocore is only a transitive dependency
+_STREAM_READ_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    aiobotocore_response.ResponseStreamingError,
+    aiobotocore_response.ReadTimeoutError,
+)
+
 
 @dataclasses.dataclass
 class S3Client:
@@ -20,23 +35,54 @@ class S3Client:
     endpoint_url: str
     access_key: str
     secret_key: str
+    max_pool_connections: int = 10  # concurrent requests, the rest wait for a free connection
+    connect_timeout_seconds: float = 60
+    read_timeout_seconds: float = 60
+    retry_mode: typing.Literal["legacy", "standard", "adaptive"] = "standard"
+    max_attempts: int = 3
 
     _exit_stack: contextlib.AsyncExitStack = dataclasses.field(default_factory=contextlib.AsyncExitStack, init=False)
     _client: AiobotocoreS3Client | None = dataclasses.field(default=None, init=False)
+    _client_lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock, init=False)
+
+    async def _get_client(self) -> AiobotocoreS3Client:
+        if self._client is not None:
+            return self._client
+
+        async with self._client_lock:
+            # Concurrent callers waiting for the lock reuse the client created by the first one
+            if self._client is None:
+                client_creator_context = self.session.create_client(
+                    service_name="s3",
+                    endpoint_url=self.endpoint_url,
+                    aws_access_key_id=self.access_key,
+                    aws_secret_access_key=self.secret_key,
+                    config=aiobotocore_config.AioConfig(
+                        max_pool_connections=self.max_pool_connections,
+                        connect_timeout=self.connect_timeout_seconds,
+                        read_timeout=self.read_timeout_seconds,
+                        retries={"mode": self.retry_mode, "max_attempts": self.max_attempts},
+                    ),
+                )
+                client = await self._exit_stack.enter_async_context(client_creator_context)
+                self._client = typing.cast(AiobotocoreS3Client, client)
+
+        return self._client
 
     @contextlib.asynccontextmanager
     async def client_context(self) -> typing.AsyncGenerator[AiobotocoreS3Client, None]:
-        if self._client is None:
-            client_creator_context = self.session.create_client(
-                service_name="s3",
-                endpoint_url=self.endpoint_url,
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-            )
-            client = await self._exit_stack.enter_async_context(client_creator_context)
-            self._client = typing.cast(AiobotocoreS3Client, client)
+        yield await self._get_client()
 
-        yield self._client
+    async def warm_up(self, bucket_name: str) -> None:
+        """
+        Creates the client and opens the first pooled connection (DNS lookup, TLS handshake),
+        an unavailable storage is only logged, it is reported by readiness checks.
+        """
+        client = await self._get_client()
+        try:
+            await client.head_bucket(Bucket=bucket_name)
+        except Exception:
+            logger.warning("Failed to warm up connection to bucket %s", bucket_name, exc_info=True)
 
     async def dispose(self) -> None:
         await self._exit_stack.aclose()
@@ -45,6 +91,14 @@ class S3Client:
 
     class NotFoundError(Exception): ...
 
+    class DeleteManyError(Exception):
+        def __init__(self, errors: dict[str, str]) -> None:
+            super().__init__(errors)
+            self.errors = errors
+
+    DELETE_MANY_PAGE_SIZE: typing.ClassVar[int] = 1000  # DeleteObjects limit
+    MULTIPART_MIN_PART_SIZE: typing.ClassVar[int] = 5 * 1024 * 1024  # UploadPart limit, except the last part
+
     async def is_ready(self) -> bool:
         try:
             async with self.client_context() as client:
@@ -58,21 +112,200 @@ class S3Client:
         bucket_name: str,
         key: str,
         data: bytes,
+        overwrite: bool = False,
+        metadata: dict[str, str] | None = None,
     ) -> None:
         async with self.client_context() as client:
             try:
-                await client.put_object(
-                    Bucket=bucket_name,
-                    Key=key,
-                    Body=data,
-                    IfNoneMatch="*",
-                )
+                if overwrite:
+                    await client.put_object(
+                        Bucket=bucket_name,
+                        Key=key,
+                        Body=data,
+                        Metadata=metadata or {},
+                    )
+                else:
+                    await client.put_object(
+                        Bucket=bucket_name,
+                        Key=key,
+                        Body=data,
+                        Metadata=metadata or {},
+                        IfNoneMatch="*",
+                    )
             except client.exceptions.ClientError as exc:
                 if exc.response["Error"]["Code"] == "PreconditionFailed":
                     raise self.AlreadyExistsError from exc
 
                 raise
 
+    async def create_stream(
+        self,
+        bucket_name: str,
+        key: str,
+        chunks: typing.AsyncIterable[bytes],
+        overwrite: bool = False,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        metadata: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Multipart upload, at most max_concurrency parts are kept in memory and uploaded at once.
+        Payloads smaller than part_size are sent with a single put_object.
+        """
+        part_size = max(part_size, self.MULTIPART_MIN_PART_SIZE)
+        iterator = aiter(chunks)
+        buffer = bytearray()
+        exhausted = False
+
+        async def read_part() -> bytes | None:
+            nonlocal exhausted
+            while not exhausted and len(buffer) < part_size:
+                try:
+                    buffer.extend(await anext(iterator))
+                except StopAsyncIteration:
+                    exhausted = True
+
+            if not buffer:
+                return None
+
+            part = bytes(buffer[:part_size])
+            del buffer[:part_size]
+            return part
+
+        part = await read_part()
+        if part is None or len(part) < part_size:
+            await self.create(
+                bucket_name=bucket_name,
+                key=key,
+                data=part or b"",
+                overwrite=overwrite,
+                metadata=metadata,
+            )
+            return
+
+        async with self.client_context() as client:
+            upload = await client.create_multipart_upload(Bucket=bucket_name, Key=key, Metadata=metadata or {})
+            upload_id = upload["UploadId"]
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def upload_part(part_number: int, data: bytes) -> dict[str, typing.Any]:
+                try:
+                    response = await client.upload_part(
+                        Bucket=bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=data,
+                    )
+                finally:
+                    semaphore.release()
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+            tasks: list[asyncio.Task[dict[str, typing.Any]]] = []
+            try:
+                part_number = 1
+                while part is not None:
+                    # Acquired before reading the next part, so the buffered parts are bounded too
+                    await semaphore.acquire()
+                    tasks.append(asyncio.create_task(upload_part(part_number, part)))
+                    part_number += 1
+                    part = await read_part()
+
+                parts = await asyncio.gather(*tasks)
+
+                if overwrite:
+                    await client.complete_multipart_upload(
+                        Bucket=bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                        MultipartUpload={"Parts": parts},  # type: ignore[typeddict-item]
+                    )
+                else:
+                    await client.complete_multipart_upload(
+                        Bucket=bucket_name,
+                        Key=key,
+                        UploadId=upload_id,
+                        MultipartUpload={"Parts": parts},  # type: ignore[typeddict-item]
+                        IfNoneMatch="*",
+                    )
+            except BaseException as exc:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+                try:
+                    await client.abort_multipart_upload(Bucket=bucket_name, Key=key, UploadId=upload_id)
+                except Exception:
+                    logger.exception("Failed to abort multipart upload %s of %s", upload_id, key)
+
+                if (
+                    isinstance(exc, client.exceptions.ClientError)
+                    and exc.response["Error"]["Code"] == "PreconditionFailed"
+                ):
+                    raise self.AlreadyExistsError from exc
+
+                raise
+
+    async def read_stream(
+        self,
+        bucket_name: str,
+        key: str,
+        chunk_size: int = 1024 * 1024,
+        start: int = 0,
+        end: int | None = None,
+        max_resumes: int = 3,
+        metadata: dict[str, str] | None = None,
+    ) -> typing.AsyncGenerator[bytes, None]:
+        """
+        Yields the object (or the inclusive byte range start..end) in chunks,
+        a broken connection is resumed with a ranged request from the last received byte.
+        :param metadata: filled with the object user metadata once the first response is received
+        """
+        offset = start
+        resumes = 0
+
+        async with self.client_context() as client:
+            while end is None or offset <= end:
+                try:
+                    if offset == 0 and end is None:
+                        # Plain request, a range is not satisfiable for an empty object
+                        response = await client.get_object(
+                            Bucket=bucket_name,
+                            Key=key,
+                        )
+                    else:
+                        response = await client.get_object(
+                            Bucket=bucket_name,
+                            Key=key,
+                            Range=f"bytes={offset}-" if end is None else f"bytes={offset}-{end}",
+                        )
+                except client.exceptions.NoSuchKey as exc:
+                    raise self.NotFoundError from exc
+                except client.exceptions.ClientError as exc:
+                    if exc.response["Error"]["Code"] == "InvalidRange":
+                        # Offset at the end of the object
+                        return
+                    raise
+
+                if metadata is not None:
+                    metadata.update(response["Metadata"])
+
+                body = response["Body"]
+                try:
+                    async for chunk in body.iter_chunks(chunk_size):
+                        offset += len(chunk)
+                        yield chunk
+                except _STREAM_READ_ERRORS:
+                    resumes += 1
+                    if resumes > max_resumes:
+                        raise
+                    logger.warning("Resuming read of %s from byte %d", key, offset)
+                    continue
+                finally:
+                    body.close()
+
+                return
+
     async def read(
         self,
         bucket_name: str,
@@ -88,6 +321,94 @@ class S3Client:
                 raise self.NotFoundError from exc
             return typing.cast(bytes, await response["Body"].read())
 
+    async def exists(
+        self,
+        bucket_name: str,
+        key: str,
+    ) -> bool:
+        async with self.client_context() as client:
+            try:
+                await client.head_object(
+                    Bucket=bucket_name,
+                    Key=key,
+                )
+            except client.exceptions.ClientError as exc:
+                if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                    return False
+
+                raise
+        return True
+
+    async def touch(
+        self,
+        bucket_name: str,
+        key: str,
+    ) -> bool:
+        """
+        Copies the object onto itself, so its last modified date and expiration count from now.
+        :returns: False if the object does not exist
+        """
+        async with self.client_context() as client:
+            try:
+                response = await client.head_object(
+                    Bucket=bucket_name,
+                    Key=key,
+                )
+            except client.exceptions.ClientError as exc:
+                if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                    return False
+
+                raise
+
+            # Copying an object onto itself is only allowed along with replacing its metadata
+            await client.copy_object(
+                Bucket=bucket_name,
+                Key=key,
+                CopySource={"Bucket": bucket_name, "Key": key},
+                Metadata=response["Metadata"],
+                MetadataDirective="REPLACE",
+                ContentType=response.get("ContentType", "binary/octet-stream"),
+            )
+        return True
+
+    async def put_expiration_rule(
+        self,
+        bucket_name: str,
+        prefix: str,
+        days: int,
+    ) -> None:
+        """
+        Adds or replaces the lifecycle rule expiring objects under the prefix, rules of other prefixes are kept.
+        Incomplete multipart uploads under the prefix are aborted after a day.
+        """
+        rule_id = f"expire-{prefix}"
+
+        async with self.client_context() as client:
+            rules: list[typing.Any]
+            try:
+                response = await client.get_bucket_lifecycle_configuration(Bucket=bucket_name)
+                rules = [rule for rule in response["Rules"] if rule.get("ID") != rule_id]
+            except client.exceptions.ClientError as exc:
+                if exc.response["Error"]["Code"] != "NoSuchLifecycleConfiguration":
+                    raise
+
+                rules = []
+
+            rules.append(
+                {
+                    "ID": rule_id,
+                    "Filter": {"Prefix": prefix},
+                    "Status": "Enabled",
+                    "Expiration": {"Days": days},
+                    "AbortIncompleteMultipartUpload": {"DaysAfterInitiation": 1},
+                }
+            )
+            # Replaces the whole configuration, hence the rules read above
+            await client.put_bucket_lifecycle_configuration(
+                Bucket=bucket_name,
+                LifecycleConfiguration={"Rules": rules},
+            )
+
     async def delete(
         self,
         bucket_name: str,
@@ -99,6 +420,46 @@ class S3Client:
                 Key=key,
             )
 
+    async def list_keys(
+        self,
+        bucket_name: str,
+        prefix: str,
+    ) -> list[str]:
+        keys: list[str] = []
+
+        async with self.client_context() as client:
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+                keys.extend(item["Key"] for item in page.get("Contents", []))
+
+        return keys
+
+    async def delete_many(
+        self,
+        bucket_name: str,
+        keys: typing.Sequence[str],
+    ) -> None:
+        """
+        :raises DeleteManyError: with an error message per key that failed to be deleted
+        """
+        errors: dict[str, str] = {}
+
+        async with self.client_context() as client:
+            for page_start in range(0, len(keys), self.DELETE_MANY_PAGE_SIZE):
+                page = keys[page_start : page_start + self.DELETE_MANY_PAGE_SIZE]
+                response = await client.delete_objects(
+                    Bucket=bucket_name,
+                    Delete={
+                        "Objects": [{"Key": key} for key in page],
+                        "Quiet": True,
+                    },
+                )
+                for error in response.get("Errors", []):
+                    errors[error.get("Key", "")] = f"{error.get('Code')}: {error.get('Message')}"
+
+        if errors:
+            raise self.DeleteManyError(errors)
+
 
 __all__ = [
     "S3Client",
@@ -0,0 +1,82 @@
+import asyncio
+import collections
+import contextlib
+import typing
+
+
+class WeightedSemaphore:
+    """
+    Semaphore where every holder takes a weight out of a shared capacity.
+    Waiters are admitted in FIFO order, so a heavy waiter is not starved by lighter ones.
+    A weight larger than the capacity is clamped to it, so the holder runs alone instead of waiting forever.
+    """
+
+    def __init__(self, capacity: float) -> None:
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+
+        self._capacity = capacity
+        self._in_use = 0.0
+        self._waiters: collections.deque[tuple[float, asyncio.Future[None]]] = collections.deque()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    @property
+    def in_use(self) -> float:
+        return self._in_use
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _clamp(self, weight: float) -> float:
+        return min(max(weight, 0.0), self._capacity)
+
+    def _wake_up(self) -> None:
+        while self._waiters:
+            weight, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._in_use + weight > self._capacity:
+                return
+
+            self._waiters.popleft()
+            self._in_use += weight
+            future.set_result(None)
+
+    async def acquire(self, weight: float) -> None:
+        weight = self._clamp(weight)
+        if not self._waiters and self._in_use + weight <= self._capacity:
+            self._in_use += weight
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((weight, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(weight)
+            else:
+                self._wake_up()
+            raise
+
+    def release(self, weight: float) -> None:
+        self._in_use = max(self._in_use - self._clamp(weight), 0.0)
+        self._wake_up()
+
+    @contextlib.asynccontextmanager
+    async def hold(self, weight: float) -> typing.AsyncIterator[None]:
+        await self.acquire(weight)
+        try:
+            yield
+        finally:
+            self.release(weight)
+
+
+__all__ = [
+    "WeightedSemaphore",
+]
@@ -0,0 +1,254 @@
+import asyncio
+import concurrent.futures as concurrent_futures
+import dataclasses
+import logging
+import mmap
+import os
+import pathlib
+import tempfile
+import time
+import typing
+
+T = typing.TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_TEMP_PREFIX = ".tmp-"
+
+
+@dataclasses.dataclass(frozen=True)
+class FileClient:
+    """
+    Key-value files on the local disk with the same semantics as S3Client.
+    Key "prefix/name" is stored as root_path/prefix/na/me/name, so a single directory does not grow too large.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    thread_pool_executor: concurrent_futures.ThreadPoolExecutor
+    root_path: pathlib.Path
+    shard_depth: int = 2
+
+    class AlreadyExistsError(Exception): ...
+
+    class NotFoundError(Exception): ...
+
+    class DeleteManyError(Exception):
+        def __init__(self, errors: dict[str, str]) -> None:
+            super().__init__(errors)
+            self.errors = errors
+
+    def _get_path(self, key: str) -> pathlib.Path:
+        prefix, _, name = key.rpartition("/")
+        shards = [name[index * 2 : index * 2 + 2] for index in range(self.shard_depth)]
+        return self.root_path.joinpath(prefix, *shards, name)
+
+    async def is_ready(self) -> bool:
+        return await self.loop.run_in_executor(
+            self.thread_pool_executor,
+            os.access,
+            self.root_path,
+            os.W_OK,
+        )
+
+    async def create(
+        self,
+        key: str,
+        data: bytes | typing.Sequence[bytes],
+        overwrite: bool = False,
+    ) -> None:
+        await self.loop.run_in_executor(
+            self.thread_pool_executor,
+            self._create,
+            key,
+            [data] if isinstance(data, bytes) else data,
+            overwrite,
+        )
+
+    async def create_stream(
+        self,
+        key: str,
+        chunks: typing.AsyncIterable[bytes],
+        overwrite: bool = False,
+    ) -> None:
+        """
+        Writes chunks to a temporary file as they arrive, the file appears under the key once complete.
+        """
+        path = self._get_path(key)
+        file, temp_name = await self.loop.run_in_executor(self.thread_pool_executor, self._open_temp, path)
+        try:
+            with file:
+                async for chunk in chunks:
+                    await self.loop.run_in_executor(self.thread_pool_executor, file.write, chunk)
+
+            await self.loop.run_in_executor(self.thread_pool_executor, self._commit, temp_name, path, overwrite)
+        finally:
+            await self.loop.run_in_executor(self.thread_pool_executor, self._discard, temp_name)
+
+    def _open_temp(self, path: pathlib.Path) -> tuple[typing.BinaryIO, str]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Written next to the target, so the link/rename in _commit stays on the same filesystem and is atomic
+        fd, temp_name = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=path.parent)
+        return os.fdopen(fd, "wb"), temp_name
+
+    def _commit(self, temp_name: str, path: pathlib.Path, overwrite: bool) -> None:
+        if overwrite:
+            os.replace(temp_name, path)
+            return
+
+        try:
+            os.link(temp_name, path)
+        except FileExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+    def _discard(self, temp_name: str) -> None:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+
+    def _create(self, key: str, chunks: typing.Sequence[bytes], overwrite: bool) -> None:
+        path = self._get_path(key)
+        file, temp_name = self._open_temp(path)
+        try:
+            with file:
+                file.writelines(chunks)
+
+            self._commit(temp_name, path, overwrite)
+        finally:
+            self._discard(temp_name)
+
+    async def read(self, key: str) -> bytes:
+        return await self.read_mapped(key, bytes)
+
+    async def read_mapped(self, key: str, parse: typing.Callable[[memoryview], T]) -> T:
+        """
+        Maps the file into memory and calls parse with a view of it in the thread pool,
+        parse has to copy what it keeps, the view is released right after.
+        """
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._read_mapped, key, parse)
+
+    def _read_mapped(self, key: str, parse: typing.Callable[[memoryview], T]) -> T:
+        try:
+            file = open(self._get_path(key), "rb")
+        except FileNotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        with file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # Empty files can not be mapped
+                return parse(memoryview(b""))
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return parse(view)
+
+    async def exists(self, key: str) -> bool:
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._get_path(key).is_file)
+
+    async def touch(self, key: str) -> bool:
+        """
+        Sets the modification time to now, so the file expiration counts from now.
+        :returns: False if the file does not exist
+        """
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._touch, key)
+
+    def _touch(self, key: str) -> bool:
+        try:
+            os.utime(self._get_path(key))
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    async def delete(self, key: str) -> None:
+        await self.loop.run_in_executor(self.thread_pool_executor, self._delete, key)
+
+    def _delete(self, key: str) -> None:
+        self._get_path(key).unlink(missing_ok=True)
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._list_keys, prefix)
+
+    def _list_keys(self, prefix: str) -> list[str]:
+        keys: list[str] = []
+
+        for _, _, names in os.walk(self.root_path / prefix):
+            keys.extend(f"{prefix}{name}" for name in names if not name.startswith(_TEMP_PREFIX))
+
+        return keys
+
+    async def delete_many(self, keys: typing.Sequence[str]) -> None:
+        """
+        :raises DeleteManyError: with an error message per key that failed to be deleted
+        """
+        errors: dict[str, str] = await self.loop.run_in_executor(self.thread_pool_executor, self._delete_many, keys)
+        if errors:
+            raise self.DeleteManyError(errors)
+
+    def _delete_many(self, keys: typing.Sequence[str]) -> dict[str, str]:
+        errors: dict[str, str] = {}
+
+        for key in keys:
+            try:
+                self._delete(key)
+            except OSError as exc:
+                errors[key] = str(exc)
+
+        return errors
+
+    async def delete_expired(self, prefix: str, max_age_seconds: float) -> int:
+        """
+        Deletes files under the prefix modified more than max_age_seconds ago, leftover temporary files included.
+        :returns: number of deleted files
+        """
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._delete_expired, prefix, max_age_seconds)
+
+    def _delete_expired(self, prefix: str, max_age_seconds: float) -> int:
+        expired_at = time.time() - max_age_seconds
+        deleted_count = 0
+
+        for dir_path, _, names in os.walk(self.root_path / prefix):
+            for name in names:
+                path = pathlib.Path(dir_path, name)
+                try:
+                    if path.stat().st_mtime < expired_at:
+                        path.unlink()
+                        deleted_count += 1
+                except FileNotFoundError:
+                    # Deleted concurrently, e.g. by a workflow cleanup
+                    pass
+
+        return deleted_count
+
+
+@dataclasses.dataclass(frozen=True)
+class Sweeper:
+    """
+    Periodically deletes expired files, the local disk counterpart of S3 lifecycle expiration rules.
+    """
+
+    file_client: FileClient
+    prefixes: typing.Sequence[str]
+    max_age_seconds: float
+    interval_seconds: float = 60 * 60
+
+    async def sweep(self) -> None:
+        for prefix in self.prefixes:
+            try:
+                deleted_count = await self.file_client.delete_expired(prefix, self.max_age_seconds)
+            except OSError:
+                logger.exception("Failed to delete expired files under %s", prefix)
+                continue
+
+            if deleted_count:
+                logger.info("Deleted %d expired files under %s", deleted_count, prefix)
+
+    async def run(self) -> None:
+        while True:
+            await self.sweep()
+            await asyncio.sleep(self.interval_seconds)
+
+
+__all__ = [
+    "FileClient",
+    "Sweeper",
+]
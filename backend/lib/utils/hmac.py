@@ -0,0 +1,42 @@
+import hashlib
+import hmac
+import time
+
+
+def sign(secret: str, data: bytes) -> str:
+    return hmac.new(secret.encode("utf-8"), data, hashlib.sha256).hexdigest()
+
+
+def verify(secret: str, data: bytes, signature: str) -> bool:
+    return hmac.compare_digest(sign(secret, data), signature)
+
+
+def _timestamped(data: bytes, timestamp: int) -> bytes:
+    return f"{timestamp}.".encode("utf-8") + data
+
+
+def sign_timestamped(secret: str, data: bytes, timestamp: int) -> str:
+    return sign(secret, _timestamped(data, timestamp))
+
+
+def verify_timestamped(secret: str, data: bytes, signature: str, timestamp: str, tolerance_seconds: float) -> bool:
+    """
+    Signed data includes the timestamp, so a captured request can't be replayed outside the tolerance window.
+    """
+    try:
+        parsed_timestamp = int(timestamp)
+    except ValueError:
+        return False
+
+    if abs(time.time() - parsed_timestamp) > tolerance_seconds:
+        return False
+
+    return verify(secret, _timestamped(data, parsed_timestamp), signature)
+
+
+__all__ = [
+    "sign",
+    "sign_timestamped",
+    "verify",
+    "verify_timestamped",
+]
@@ -21,6 +21,14 @@ class Callback:
             success_message=f"{name} has been disposed",
         )
 
+    @classmethod
+    def from_warm_up(cls, name: str, awaitable: Awaitable) -> typing.Self:
+        return cls(
+            awaitable=awaitable,
+            error_message=f"Failed to warm up {name}",
+            success_message=f"{name} has been warmed up",
+        )
+
 
 @dataclasses.dataclass(frozen=True)
 class Lifecycle:
@@ -1,6 +1,7 @@
 import dataclasses
 import enum
 import typing
+import uuid
 
 import msgpack
 
@@ -11,6 +12,8 @@ import lib.utils.pydantic.base as base
 def default(data: typing.Any) -> typing.Any:
     if isinstance(data, enum.Enum):
         return data.value
+    if isinstance(data, uuid.UUID):
+        return str(data)
 
     return data
 
@@ -51,14 +54,38 @@ class BaseDataclassSchema(BaseSchema, typing.Generic[DATACLASS_T]):
     class Meta:
         DATACLASS: type = NotImplemented
 
+    # Fields holding nested dataclass schemas, whether each of them is a list of schemas
+    nested_fields: typing.ClassVar[dict[str, bool]] = {}
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+
+        cls.nested_fields = {}
+        for name, field in cls.model_fields.items():
+            annotation = field.annotation
+            is_list = typing.get_origin(annotation) is list
+            if is_list:
+                (annotation,) = typing.get_args(annotation)
+            if isinstance(annotation, type) and issubclass(annotation, BaseDataclassSchema):
+                cls.nested_fields[name] = is_list
+
     @classmethod
     def from_dataclass(cls, data: DATACLASS_T) -> typing.Self:
+        # Validated straight from the attributes, nested dataclasses included, without deep copying them by asdict
         assert dataclasses.is_dataclass(data) and not isinstance(data, type)
-        raw_data = dataclasses.asdict(data)
-        return cls(**raw_data)
+        return cls.model_validate(data, from_attributes=True)
 
     def to_dataclass(self) -> DATACLASS_T:
-        raw_data = self.model_dump()
+        # The schema is already valid, so its attributes are passed as is instead of being dumped first
+        raw_data = {name: getattr(self, name) for name in type(self).model_fields}
+        for name, is_list in self.nested_fields.items():
+            value = raw_data[name]
+            if is_list:
+                raw_data[name] = [item.to_dataclass() for item in value]
+            else:
+                raw_data[name] = value.to_dataclass()
+
         return self.Meta.DATACLASS(**raw_data)
 
 
@@ -0,0 +1,29 @@
+import struct
+
+# RIFF header of PCM WAV, the data chunk follows it right away
+_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+HEADER_SIZE = _HEADER.size
+
+
+def pack_header(data_length: int, frame_rate: int, sample_width: int, channels: int) -> bytes:
+    return _HEADER.pack(
+        b"RIFF",
+        HEADER_SIZE - 8 + data_length,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        channels,
+        frame_rate,
+        frame_rate * sample_width * channels,
+        sample_width * channels,
+        sample_width * 8,
+        b"data",
+        data_length,
+    )
+
+
+__all__ = [
+    "HEADER_SIZE",
+    "pack_header",
+]
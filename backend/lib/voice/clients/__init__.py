@@ -1,4 +1,6 @@
 from .conversion import *
+from .delivery_storage import *
 from .recognition import *
+from .result_storage import *
 from .splitter import *
 from .storage import *
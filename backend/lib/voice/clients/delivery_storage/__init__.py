@@ -0,0 +1,4 @@
+from .local import *
+from .memory import *
+from .protocol import *
+from .s3 import *
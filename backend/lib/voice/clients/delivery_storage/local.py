@@ -0,0 +1,82 @@
+import dataclasses
+import uuid
+
+import lib.utils.files as files_utils
+import lib.voice.clients.delivery_storage.protocol as protocol
+
+
+@dataclasses.dataclass
+class LocalDeliveryStorage(protocol.DeliveryStorageProtocol):
+    file_client: files_utils.FileClient
+    key_prefix: str = "delivery"
+
+    @property
+    def _pending_key_prefix(self) -> str:
+        return f"{self.key_prefix}/pending/"
+
+    def _prepare_pending_key(self, id: uuid.UUID) -> str:
+        return f"{self._pending_key_prefix}{id}"
+
+    @property
+    def delivered_key_prefix(self) -> str:
+        return f"{self.key_prefix}/delivered/"
+
+    def _prepare_delivered_key(self, id: uuid.UUID) -> str:
+        return f"{self.delivered_key_prefix}{id}"
+
+    async def create_pending(
+        self,
+        id: uuid.UUID,
+        data: bytes,
+    ) -> None:
+        await self.file_client.create(
+            key=self._prepare_pending_key(id),
+            data=data,
+            overwrite=True,
+        )
+
+    async def read_pending(
+        self,
+        id: uuid.UUID,
+    ) -> bytes:
+        try:
+            return await self.file_client.read(self._prepare_pending_key(id))
+        except self.file_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def delete_pending(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        await self.file_client.delete(self._prepare_pending_key(id))
+
+    async def list_pending(self) -> list[uuid.UUID]:
+        keys = await self.file_client.list_keys(prefix=self._pending_key_prefix)
+        return [uuid.UUID(key.removeprefix(self._pending_key_prefix)) for key in keys]
+
+    async def mark_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        try:
+            await self.file_client.create(
+                key=self._prepare_delivered_key(id),
+                data=b"",
+            )
+        except self.file_client.AlreadyExistsError:
+            pass
+
+    async def is_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        try:
+            await self.file_client.read(self._prepare_delivered_key(id))
+        except self.file_client.NotFoundError:
+            return False
+        return True
+
+
+__all__ = [
+    "LocalDeliveryStorage",
+]
@@ -0,0 +1,56 @@
+import dataclasses
+import uuid
+
+import lib.voice.clients.delivery_storage.protocol as protocol
+
+
+@dataclasses.dataclass
+class MemoryDeliveryStorage(protocol.DeliveryStorageProtocol):
+    """
+    Process-local, pending jobs are lost on restart.
+    """
+
+    _pending: dict[uuid.UUID, bytes] = dataclasses.field(default_factory=dict, init=False)
+    _delivered: set[uuid.UUID] = dataclasses.field(default_factory=set, init=False)
+
+    async def create_pending(
+        self,
+        id: uuid.UUID,
+        data: bytes,
+    ) -> None:
+        self._pending[id] = data
+
+    async def read_pending(
+        self,
+        id: uuid.UUID,
+    ) -> bytes:
+        if id not in self._pending:
+            raise self.NotFoundError
+
+        return self._pending[id]
+
+    async def delete_pending(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        self._pending.pop(id, None)
+
+    async def list_pending(self) -> list[uuid.UUID]:
+        return list(self._pending)
+
+    async def mark_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        self._delivered.add(id)
+
+    async def is_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return id in self._delivered
+
+
+__all__ = [
+    "MemoryDeliveryStorage",
+]
@@ -0,0 +1,54 @@
+import typing
+import uuid
+
+
+class DeliveryStorageProtocol(typing.Protocol):
+    """
+    Keeps pending delivery jobs until they are delivered and remembers delivered ids,
+    so jobs survive restarts and redelivered jobs are not delivered twice.
+    """
+
+    class BaseError(Exception): ...
+
+    class NotFoundError(BaseError): ...
+
+    async def create_pending(
+        self,
+        id: uuid.UUID,
+        data: bytes,
+    ) -> None:
+        """
+        Overwrites pending job with the same id
+        """
+        ...
+
+    async def read_pending(
+        self,
+        id: uuid.UUID,
+    ) -> bytes:
+        """
+        :raises NotFoundError: if pending job with the given id does not exist
+        """
+        ...
+
+    async def delete_pending(
+        self,
+        id: uuid.UUID,
+    ) -> None: ...
+
+    async def list_pending(self) -> list[uuid.UUID]: ...
+
+    async def mark_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> None: ...
+
+    async def is_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> bool: ...
+
+
+__all__ = [
+    "DeliveryStorageProtocol",
+]
@@ -0,0 +1,107 @@
+import dataclasses
+import uuid
+
+import lib.utils.aiobotocore as aiobotocore_utils
+import lib.voice.clients.delivery_storage.protocol as protocol
+
+
+@dataclasses.dataclass
+class S3DeliveryStorage(protocol.DeliveryStorageProtocol):
+    s3_client: aiobotocore_utils.S3Client
+    bucket_name: str
+    key_prefix: str = "delivery"
+
+    @property
+    def _pending_key_prefix(self) -> str:
+        return f"{self.key_prefix}/pending/"
+
+    def _prepare_pending_key(self, id: uuid.UUID) -> str:
+        return f"{self._pending_key_prefix}{id}"
+
+    @property
+    def delivered_key_prefix(self) -> str:
+        return f"{self.key_prefix}/delivered/"
+
+    def _prepare_delivered_key(self, id: uuid.UUID) -> str:
+        return f"{self.delivered_key_prefix}{id}"
+
+    async def create_pending(
+        self,
+        id: uuid.UUID,
+        data: bytes,
+    ) -> None:
+        await self.s3_client.create(
+            bucket_name=self.bucket_name,
+            key=self._prepare_pending_key(id),
+            data=data,
+            overwrite=True,
+        )
+
+    async def read_pending(
+        self,
+        id: uuid.UUID,
+    ) -> bytes:
+        try:
+            return await self.s3_client.read(
+                bucket_name=self.bucket_name,
+                key=self._prepare_pending_key(id),
+            )
+        except self.s3_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def delete_pending(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        await self.s3_client.delete(
+            bucket_name=self.bucket_name,
+            key=self._prepare_pending_key(id),
+        )
+
+    async def list_pending(self) -> list[uuid.UUID]:
+        keys = await self.s3_client.list_keys(bucket_name=self.bucket_name, prefix=self._pending_key_prefix)
+        return [uuid.UUID(key.removeprefix(self._pending_key_prefix)) for key in keys]
+
+    async def mark_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        try:
+            await self.s3_client.create(
+                bucket_name=self.bucket_name,
+                key=self._prepare_delivered_key(id),
+                data=b"",
+            )
+        except self.s3_client.AlreadyExistsError:
+            pass
+
+    async def is_delivered(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        try:
+            await self.s3_client.read(
+                bucket_name=self.bucket_name,
+                key=self._prepare_delivered_key(id),
+            )
+        except self.s3_client.NotFoundError:
+            return False
+        return True
+
+    async def put_expiration_rule(
+        self,
+        days: int,
+    ) -> None:
+        """
+        Delivered markers are only needed while a callback may be redelivered, so they expire after the given days.
+        """
+        await self.s3_client.put_expiration_rule(
+            bucket_name=self.bucket_name,
+            prefix=self.delivered_key_prefix,
+            days=days,
+        )
+
+
+__all__ = [
+    "S3DeliveryStorage",
+]
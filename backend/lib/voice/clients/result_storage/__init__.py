@@ -0,0 +1,3 @@
+from .local import *
+from .protocol import *
+from .s3 import *
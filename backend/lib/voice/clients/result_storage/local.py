@@ -0,0 +1,63 @@
+import dataclasses
+import typing
+import uuid
+
+import lib.utils.files as files_utils
+import lib.voice.clients.result_storage.protocol as protocol
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+
+
+@dataclasses.dataclass
+class LocalResultStorage(protocol.ResultStorageProtocol):
+    file_client: files_utils.FileClient
+    key_prefix: str = "result"
+
+    def _prepare_key(self, id: uuid.UUID) -> str:
+        return f"{self.key_prefix}/{id}"
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult,
+    ) -> None:
+        data = voice_schemas.RecognitionTaskResult.from_dataclass(result).to_bytes()
+
+        await self.file_client.create(
+            key=self._prepare_key(id),
+            data=data,
+            overwrite=True,
+        )
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.RecognitionTaskResult:
+        try:
+            data = await self.file_client.read(self._prepare_key(id))
+        except self.file_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        return voice_schemas.RecognitionTaskResult.from_bytes(data).to_dataclass()
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        await self.file_client.delete(self._prepare_key(id))
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        keys = {self._prepare_key(id): id for id in ids}
+
+        try:
+            await self.file_client.delete_many(list(keys))
+        except self.file_client.DeleteManyError as exc:
+            raise self.DeleteManyError({keys[key]: error for key, error in exc.errors.items()}) from exc
+
+
+__all__ = [
+    "LocalResultStorage",
+]
@@ -0,0 +1,53 @@
+import typing
+import uuid
+
+import lib.voice.models as voice_models
+
+
+class ResultStorageProtocol(typing.Protocol):
+    class BaseError(Exception): ...
+
+    class NotFoundError(BaseError): ...
+
+    class DeleteManyError(BaseError):
+        def __init__(self, errors: dict[uuid.UUID, str]) -> None:
+            super().__init__(errors)
+            self.errors = errors
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult,
+    ) -> None:
+        """
+        Overwrites result with the same id, so retried writes are idempotent
+        """
+        ...
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.RecognitionTaskResult:
+        """
+        :raises NotFoundError: if result with the given id does not exist
+        """
+        ...
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None: ...
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        """
+        :raises DeleteManyError: with an error message per id that failed to be deleted
+        """
+        ...
+
+
+__all__ = [
+    "ResultStorageProtocol",
+]
@@ -0,0 +1,84 @@
+import dataclasses
+import typing
+import uuid
+
+import lib.utils.aiobotocore as aiobotocore_utils
+import lib.voice.clients.result_storage.protocol as protocol
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+
+
+@dataclasses.dataclass
+class S3ResultStorage(protocol.ResultStorageProtocol):
+    s3_client: aiobotocore_utils.S3Client
+    bucket_name: str
+    key_prefix: str = "result"
+
+    def _prepare_key(self, id: uuid.UUID) -> str:
+        return f"{self.key_prefix}/{id}"
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        result: voice_models.RecognitionTaskResult,
+    ) -> None:
+        data = voice_schemas.RecognitionTaskResult.from_dataclass(result).to_bytes()
+
+        await self.s3_client.create(
+            bucket_name=self.bucket_name,
+            key=self._prepare_key(id),
+            data=data,
+            overwrite=True,
+        )
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.RecognitionTaskResult:
+        try:
+            data = await self.s3_client.read(
+                bucket_name=self.bucket_name,
+                key=self._prepare_key(id),
+            )
+        except self.s3_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        return voice_schemas.RecognitionTaskResult.from_bytes(data).to_dataclass()
+
+    async def put_expiration_rule(
+        self,
+        days: int,
+    ) -> None:
+        await self.s3_client.put_expiration_rule(
+            bucket_name=self.bucket_name,
+            prefix=f"{self.key_prefix}/",
+            days=days,
+        )
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        await self.s3_client.delete(
+            bucket_name=self.bucket_name,
+            key=self._prepare_key(id),
+        )
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        keys = {self._prepare_key(id): id for id in ids}
+
+        try:
+            await self.s3_client.delete_many(
+                bucket_name=self.bucket_name,
+                keys=list(keys),
+            )
+        except self.s3_client.DeleteManyError as exc:
+            raise self.DeleteManyError({keys[key]: error for key, error in exc.errors.items()}) from exc
+
+
+__all__ = [
+    "S3ResultStorage",
+]
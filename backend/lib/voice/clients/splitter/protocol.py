@@ -4,7 +4,18 @@ import lib.voice.models as voice_models
 
 
 class SplitterProtocol(typing.Protocol):
-    def split(self, audio: voice_models.Audio) -> typing.AsyncIterator[voice_models.Audio]: ...
+    def split(self, audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
+        """
+        :param offset: number of leading chunks to skip, used to resume an interrupted split
+        """
+        ...
+
+    async def index(self, audio: voice_models.Audio) -> tuple[voice_models.Audio, list[voice_models.AudioSlice]]:
+        """
+        Decodes the audio once into WAV with INDEX_PCM_FORMAT instead of exporting every chunk,
+        chunks are returned as slices of the decoded audio data.
+        """
+        ...
 
 
 __all__ = [
@@ -1,6 +1,7 @@
 import asyncio
 import concurrent.futures as concurrent_futures
 import dataclasses
+import itertools
 import logging
 import typing
 
@@ -8,6 +9,7 @@ import pydub
 import pydub.silence as pydub_silence
 
 import lib.utils.pydub as pydub_utils
+import lib.utils.wave as wave_utils
 import lib.voice.clients.conversion as voice_conversion_clients
 import lib.voice.models as voice_models
 
@@ -26,14 +28,37 @@ class PydubOnSilenceSplitter:
     silence_difference_db: int = 20
     chunk_beginning_silence_ms: int = 2000
 
-    async def split(self, audio: voice_models.Audio) -> typing.AsyncIterator[voice_models.Audio]:
+    async def split(self, audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
         audio = await self.conversion_client.convert(audio, voice_models.AudioFormat.WAV)
-        splitted = await self.loop.run_in_executor(self.thread_pool_executor, self._split, audio)
+        chunks = await self.loop.run_in_executor(self.thread_pool_executor, self._split, audio)
 
-        for item in splitted:
-            yield item
+        for chunk in chunks[offset:]:
+            yield await self.loop.run_in_executor(self.thread_pool_executor, self._export, chunk, audio.format)
 
-    def _split(self, audio: voice_models.Audio) -> list[voice_models.Audio]:
+    async def index(self, audio: voice_models.Audio) -> tuple[voice_models.Audio, list[voice_models.AudioSlice]]:
+        audio = await self.conversion_client.convert(audio, voice_models.AudioFormat.WAV)
+        return await self.loop.run_in_executor(self.thread_pool_executor, self._index, audio)
+
+    def _get_ranges(self, audio_segment: pydub.AudioSegment) -> list[tuple[int, int]]:
+        """
+        Same ranges (in milliseconds) as pydub split_on_silence produces for its chunks.
+        """
+        ranges = [
+            [start - self.chunk_beginning_silence_ms, end + self.chunk_beginning_silence_ms]
+            for start, end in pydub_silence.detect_nonsilent(
+                audio_segment,
+                min_silence_len=self.min_silence_length_ms,
+                silence_thresh=int(audio_segment.dBFS - self.silence_difference_db),
+            )
+        ]
+        for previous_range, next_range in itertools.pairwise(ranges):
+            # Silence shorter than the kept silence is split evenly between the neighbouring chunks
+            if next_range[0] < previous_range[1]:
+                previous_range[1] = next_range[0] = (previous_range[1] + next_range[0]) // 2
+
+        return [(max(start, 0), min(end, len(audio_segment))) for start, end in ranges]
+
+    def _split(self, audio: voice_models.Audio) -> typing.Sequence[pydub.AudioSegment]:
         assert audio.format == voice_models.AudioFormat.WAV
 
         logger.debug(
@@ -47,27 +72,62 @@ class PydubOnSilenceSplitter:
             format=audio.format.to_pydub_format(),
         )
 
-        chunks = typing.cast(
-            typing.Sequence[pydub.AudioSegment],
-            pydub_silence.split_on_silence(
-                source_audio_segment,
-                min_silence_len=self.min_silence_length_ms,
-                silence_thresh=int(source_audio_segment.dBFS - self.silence_difference_db),
-                keep_silence=self.chunk_beginning_silence_ms,
-            ),
+        return [source_audio_segment[start:end] for start, end in self._get_ranges(source_audio_segment)]
+
+    def _index(self, audio: voice_models.Audio) -> tuple[voice_models.Audio, list[voice_models.AudioSlice]]:
+        assert audio.format == voice_models.AudioFormat.WAV
+
+        logger.debug(
+            "Indexing audio, length(bytes)=%s, duration=%s",
+            len(audio.data),
+            audio.duration_seconds,
+        )
+
+        pcm_format = voice_models.INDEX_PCM_FORMAT
+        audio_segment = typing.cast(
+            pydub.AudioSegment,
+            pydub_utils.get_audio_segment_from_data(data=audio.data, format=audio.format.to_pydub_format())
+            .set_frame_rate(pcm_format.frame_rate)
+            .set_sample_width(pcm_format.sample_width)
+            .set_channels(pcm_format.channels),
         )
+        frame_width = typing.cast(int, audio_segment.frame_width)
+
+        def get_offset_bytes(position_ms: int) -> int:
+            return wave_utils.HEADER_SIZE + int(audio_segment.frame_count(ms=position_ms)) * frame_width
 
-        return [
-            voice_models.Audio(
-                data=pydub_utils.get_data_from_audio_segment(
-                    audio_segment=chunk,
-                    format=audio.format.to_pydub_format(),
-                ),
-                format=audio.format,
-                duration_seconds=typing.cast(float, chunk.duration_seconds),
+        slices = [
+            voice_models.AudioSlice(
+                offset_bytes=get_offset_bytes(start),
+                length_bytes=get_offset_bytes(end) - get_offset_bytes(start),
+                duration_seconds=(end - start) / MILLISECONDS_IN_SECOND,
             )
-            for chunk in chunks
+            for start, end in self._get_ranges(audio_segment)
         ]
+        data = typing.cast(bytes, audio_segment.raw_data)
+        header = wave_utils.pack_header(
+            data_length=len(data),
+            frame_rate=pcm_format.frame_rate,
+            sample_width=pcm_format.sample_width,
+            channels=pcm_format.channels,
+        )
+
+        indexed_audio = voice_models.Audio(
+            data=header + data,
+            duration_seconds=typing.cast(float, audio_segment.duration_seconds),
+            format=voice_models.AudioFormat.WAV,
+        )
+        return indexed_audio, slices
+
+    def _export(self, chunk: pydub.AudioSegment, format: voice_models.AudioFormat) -> voice_models.Audio:
+        return voice_models.Audio(
+            data=pydub_utils.get_data_from_audio_segment(
+                audio_segment=chunk,
+                format=format.to_pydub_format(),
+            ),
+            format=format,
+            duration_seconds=typing.cast(float, chunk.duration_seconds),
+        )
 
 
 __all__ = [
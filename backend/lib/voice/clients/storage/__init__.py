@@ -1,2 +1,7 @@
+from .cached import *
+from .content import *
+from .local import *
+from .memory import *
 from .protocol import *
 from .s3 import *
+from .slices import *
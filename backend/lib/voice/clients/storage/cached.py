@@ -0,0 +1,178 @@
+import collections
+import dataclasses
+import typing
+import uuid
+
+import temporalio.common as temporalio_common
+
+import lib.voice.clients.storage.protocol as protocol
+import lib.voice.models as voice_models
+
+
+@dataclasses.dataclass
+class CachedStorage(protocol.StorageProtocol):
+    """
+    Write-through storage with a process-local LRU cache bounded by the total audio size.
+    Only deletes made through this instance invalidate the cache, which is enough since audio is never rewritten.
+    """
+
+    storage_client: protocol.StorageProtocol
+    max_size_bytes: int
+    metric_meter: temporalio_common.MetricMeter = temporalio_common.MetricMeter.noop
+
+    _items: collections.OrderedDict[uuid.UUID, voice_models.Audio] = dataclasses.field(
+        default_factory=collections.OrderedDict,
+        init=False,
+    )
+    _resident_bytes: int = dataclasses.field(default=0, init=False)
+    _hits: int = dataclasses.field(default=0, init=False)
+    _misses: int = dataclasses.field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self._hits_counter = self.metric_meter.create_counter("storage_cache_hits", "Audio reads served from memory")
+        self._misses_counter = self.metric_meter.create_counter(
+            "storage_cache_misses",
+            "Audio reads served from the underlying storage",
+        )
+        self._resident_bytes_gauge = self.metric_meter.create_gauge(
+            "storage_cache_resident_bytes",
+            "Size of audio kept in memory",
+            "By",
+        )
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    @property
+    def hit_ratio(self) -> float:
+        reads_count = self._hits + self._misses
+        return self._hits / reads_count if reads_count else 0.0
+
+    def _put(self, id: uuid.UUID, audio: voice_models.Audio) -> None:
+        size_bytes = len(audio.data)
+        if size_bytes > self.max_size_bytes:
+            return
+
+        self._pop(id)
+        while self._items and self._resident_bytes + size_bytes > self.max_size_bytes:
+            _, evicted_audio = self._items.popitem(last=False)
+            self._resident_bytes -= len(evicted_audio.data)
+
+        self._items[id] = audio
+        self._resident_bytes += size_bytes
+        self._resident_bytes_gauge.set(self._resident_bytes)
+
+    def _pop(self, id: uuid.UUID) -> None:
+        audio = self._items.pop(id, None)
+        if audio is None:
+            return
+
+        self._resident_bytes -= len(audio.data)
+        self._resident_bytes_gauge.set(self._resident_bytes)
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        audio: voice_models.Audio,
+    ) -> None:
+        try:
+            await self.storage_client.create(id, audio)
+        except self.storage_client.AlreadyExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+        self._put(id, audio)
+
+    async def create_stream(
+        self,
+        id: uuid.UUID,
+        chunks: typing.AsyncIterable[bytes],
+        duration_seconds: float,
+        format: voice_models.AudioFormat,
+    ) -> None:
+        # Not cached, the audio is cached on its first read instead of being collected here
+        try:
+            await self.storage_client.create_stream(id, chunks, duration_seconds=duration_seconds, format=format)
+        except self.storage_client.AlreadyExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.Audio:
+        audio = self._items.get(id)
+        if audio is not None:
+            self._items.move_to_end(id)
+            self._hits += 1
+            self._hits_counter.add(1)
+            return audio
+
+        try:
+            audio = await self.storage_client.read(id)
+        except self.storage_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        self._misses += 1
+        self._misses_counter.add(1)
+        self._put(id, audio)
+        return audio
+
+    async def read_range(
+        self,
+        id: uuid.UUID,
+        offset_bytes: int,
+        length_bytes: int,
+    ) -> bytes:
+        audio = self._items.get(id)
+        if audio is not None:
+            self._items.move_to_end(id)
+            self._hits += 1
+            self._hits_counter.add(1)
+            return audio.data[offset_bytes : offset_bytes + length_bytes]
+
+        # Ranges are not cached, the whole audio would have to be read to cache it
+        try:
+            data = await self.storage_client.read_range(id, offset_bytes, length_bytes)
+        except self.storage_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        self._misses += 1
+        self._misses_counter.add(1)
+        return data
+
+    async def exists(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        # Cached audio may have expired in the underlying storage since
+        return await self.storage_client.exists(id)
+
+    async def touch(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return await self.storage_client.touch(id)
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        self._pop(id)
+        await self.storage_client.delete(id)
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        for id in ids:
+            self._pop(id)
+
+        try:
+            await self.storage_client.delete_many(ids)
+        except self.storage_client.DeleteManyError as exc:
+            raise self.DeleteManyError(exc.errors) from exc
+
+
+__all__ = [
+    "CachedStorage",
+]
@@ -0,0 +1,43 @@
+import hashlib
+import uuid
+
+import lib.voice.clients.storage.protocol as protocol
+import lib.voice.models as voice_models
+
+
+def get_content_id(audio: voice_models.Audio) -> uuid.UUID:
+    """
+    Same audio always gets the same id, so it is stored once however many times it is uploaded.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{audio.format.value}:{audio.duration_seconds!r}:".encode())
+    digest.update(audio.data)
+    return uuid.UUID(bytes=digest.digest())
+
+
+async def create_content_addressed(
+    storage_client: protocol.StorageProtocol,
+    audio: voice_models.Audio,
+) -> uuid.UUID:
+    """
+    Stores the audio under its content id, audio that is already stored is only refreshed.
+    Content addressed audio may be used by several jobs, so it has to expire instead of being deleted by them;
+    refreshing keeps it from expiring under the job that has just reused it.
+    """
+    id = get_content_id(audio)
+    if await storage_client.touch(id):
+        return id
+
+    try:
+        await storage_client.create(id, audio)
+    except storage_client.AlreadyExistsError:
+        # Uploaded concurrently by another job
+        pass
+
+    return id
+
+
+__all__ = [
+    "create_content_addressed",
+    "get_content_id",
+]
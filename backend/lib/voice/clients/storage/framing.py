@@ -0,0 +1,63 @@
+"""
+Storage framing of audio: duration and format are kept apart from the data,
+so the data is written and read as is, without msgpack encoding and pydantic validation.
+"""
+
+import struct
+
+import lib.voice.models as voice_models
+
+# Magic, format, duration seconds; audio data follows the header as is
+HEADER = struct.Struct("<4s8sd")
+_MAGIC = b"STTA"
+
+_FORMAT_METADATA_KEY = "audio-format"
+_DURATION_SECONDS_METADATA_KEY = "audio-duration-seconds"
+
+
+def pack_header(audio: voice_models.Audio) -> bytes:
+    return HEADER.pack(_MAGIC, audio.format.value.encode(), audio.duration_seconds)
+
+
+def unpack(data: memoryview) -> voice_models.Audio:
+    """
+    Copies the audio data out of the view, so it can be a view of a memory mapped file.
+    """
+    magic, format, duration_seconds = HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Unknown audio header")
+
+    return voice_models.Audio(
+        data=bytes(data[HEADER.size :]),
+        duration_seconds=duration_seconds,
+        format=voice_models.AudioFormat(format.rstrip(b"\0").decode()),
+    )
+
+
+def to_metadata(audio: voice_models.Audio) -> dict[str, str]:
+    return {
+        _FORMAT_METADATA_KEY: audio.format.value,
+        _DURATION_SECONDS_METADATA_KEY: repr(audio.duration_seconds),
+    }
+
+
+def has_metadata(metadata: dict[str, str]) -> bool:
+    return _FORMAT_METADATA_KEY in metadata
+
+
+def from_metadata(metadata: dict[str, str], data: bytes) -> voice_models.Audio:
+    return voice_models.Audio(
+        data=data,
+        duration_seconds=float(metadata[_DURATION_SECONDS_METADATA_KEY]),
+        format=voice_models.AudioFormat(metadata[_FORMAT_METADATA_KEY]),
+    )
+
+
+__all__ = [
+    "HEADER",
+    "from_metadata",
+    "has_metadata",
+    "pack_header",
+    "to_metadata",
+    "unpack",
+]
@@ -0,0 +1,112 @@
+import dataclasses
+import typing
+import uuid
+
+import lib.utils.files as files_utils
+import lib.voice.clients.storage.framing as framing
+import lib.voice.clients.storage.protocol as protocol
+import lib.voice.models as voice_models
+
+
+@dataclasses.dataclass
+class LocalStorage(protocol.StorageProtocol):
+    """
+    Single node storage, audio is written raw after a fixed size header and read back through mmap.
+    """
+
+    file_client: files_utils.FileClient
+    key_prefix: str = "audio"
+
+    def _prepare_key(self, id: uuid.UUID) -> str:
+        return f"{self.key_prefix}/{id}"
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        audio: voice_models.Audio,
+    ) -> None:
+        try:
+            await self.file_client.create(
+                key=self._prepare_key(id),
+                data=[framing.pack_header(audio), audio.data],
+            )
+        except self.file_client.AlreadyExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+    async def create_stream(
+        self,
+        id: uuid.UUID,
+        chunks: typing.AsyncIterable[bytes],
+        duration_seconds: float,
+        format: voice_models.AudioFormat,
+    ) -> None:
+        header = voice_models.Audio(data=b"", duration_seconds=duration_seconds, format=format)
+
+        async def iter_framed() -> typing.AsyncIterator[bytes]:
+            yield framing.pack_header(header)
+            async for chunk in chunks:
+                yield chunk
+
+        try:
+            await self.file_client.create_stream(key=self._prepare_key(id), chunks=iter_framed())
+        except self.file_client.AlreadyExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.Audio:
+        try:
+            return await self.file_client.read_mapped(self._prepare_key(id), framing.unpack)
+        except self.file_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def read_range(
+        self,
+        id: uuid.UUID,
+        offset_bytes: int,
+        length_bytes: int,
+    ) -> bytes:
+        start = framing.HEADER.size + offset_bytes
+
+        try:
+            return await self.file_client.read_mapped(
+                self._prepare_key(id),
+                lambda data: bytes(data[start : start + length_bytes]),
+            )
+        except self.file_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def exists(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return await self.file_client.exists(self._prepare_key(id))
+
+    async def touch(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return await self.file_client.touch(self._prepare_key(id))
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        await self.file_client.delete(self._prepare_key(id))
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        keys = {self._prepare_key(id): id for id in ids}
+
+        try:
+            await self.file_client.delete_many(list(keys))
+        except self.file_client.DeleteManyError as exc:
+            raise self.DeleteManyError({keys[key]: error for key, error in exc.errors.items()}) from exc
+
+
+__all__ = [
+    "LocalStorage",
+]
@@ -0,0 +1,160 @@
+import collections
+import dataclasses
+import time
+import typing
+import uuid
+
+import lib.voice.clients.storage.protocol as protocol
+import lib.voice.models as voice_models
+
+
+@dataclasses.dataclass
+class MemoryStorage(protocol.StorageProtocol):
+    """
+    Process-local storage, audio missing in memory is read from (and deleted in) the fallback storage.
+    Audio that is never deleted, e.g. left behind by a failed job, is evicted on create once it is older than
+    ttl_seconds or the oldest audio exceeds max_size_bytes in total.
+    """
+
+    fallback_storage_client: protocol.StorageProtocol | None = None
+    max_size_bytes: int | None = None
+    ttl_seconds: float | None = None
+
+    _items: collections.OrderedDict[uuid.UUID, voice_models.Audio] = dataclasses.field(
+        default_factory=collections.OrderedDict,
+        init=False,
+    )
+    _created_at: dict[uuid.UUID, float] = dataclasses.field(default_factory=dict, init=False)
+    _resident_bytes: int = dataclasses.field(default=0, init=False)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    def _pop(self, id: uuid.UUID) -> voice_models.Audio | None:
+        audio = self._items.pop(id, None)
+        if audio is None:
+            return None
+
+        del self._created_at[id]
+        self._resident_bytes -= len(audio.data)
+        return audio
+
+    def _evict(self, size_bytes: int) -> None:
+        """
+        Items are ordered by creation time, so both expired and oldest items are at the front.
+        """
+        expired_at = time.monotonic() - self.ttl_seconds if self.ttl_seconds is not None else None
+
+        while self._items:
+            id = next(iter(self._items))
+            expired = expired_at is not None and self._created_at[id] < expired_at
+            oversized = self.max_size_bytes is not None and self._resident_bytes + size_bytes > self.max_size_bytes
+            if not expired and not oversized:
+                break
+
+            self._pop(id)
+
+    async def create(
+        self,
+        id: uuid.UUID,
+        audio: voice_models.Audio,
+    ) -> None:
+        if id in self._items:
+            raise self.AlreadyExistsError
+
+        self._evict(len(audio.data))
+        self._items[id] = audio
+        self._created_at[id] = time.monotonic()
+        self._resident_bytes += len(audio.data)
+
+    async def create_stream(
+        self,
+        id: uuid.UUID,
+        chunks: typing.AsyncIterable[bytes],
+        duration_seconds: float,
+        format: voice_models.AudioFormat,
+    ) -> None:
+        # Kept in memory as a whole anyway
+        data = b"".join([chunk async for chunk in chunks])
+        await self.create(id, voice_models.Audio(data=data, duration_seconds=duration_seconds, format=format))
+
+    async def read(
+        self,
+        id: uuid.UUID,
+    ) -> voice_models.Audio:
+        if id in self._items:
+            return self._items[id]
+
+        if self.fallback_storage_client is None:
+            raise self.NotFoundError
+
+        try:
+            return await self.fallback_storage_client.read(id)
+        except self.fallback_storage_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def read_range(
+        self,
+        id: uuid.UUID,
+        offset_bytes: int,
+        length_bytes: int,
+    ) -> bytes:
+        if id in self._items:
+            return self._items[id].data[offset_bytes : offset_bytes + length_bytes]
+
+        if self.fallback_storage_client is None:
+            raise self.NotFoundError
+
+        try:
+            return await self.fallback_storage_client.read_range(id, offset_bytes, length_bytes)
+        except self.fallback_storage_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+    async def exists(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        if id in self._items:
+            return True
+
+        if self.fallback_storage_client is None:
+            return False
+
+        return await self.fallback_storage_client.exists(id)
+
+    async def touch(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        if id in self._items:
+            return True
+
+        if self.fallback_storage_client is None:
+            return False
+
+        return await self.fallback_storage_client.touch(id)
+
+    async def delete(
+        self,
+        id: uuid.UUID,
+    ) -> None:
+        if self._pop(id) is not None:
+            return
+
+        if self.fallback_storage_client is not None:
+            await self.fallback_storage_client.delete(id)
+
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        fallback_ids = [id for id in ids if self._pop(id) is None]
+
+        if fallback_ids and self.fallback_storage_client is not None:
+            await self.fallback_storage_client.delete_many(fallback_ids)
+
+
+__all__ = [
+    "MemoryStorage",
+]
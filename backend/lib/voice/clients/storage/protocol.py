@@ -11,6 +11,11 @@ class StorageProtocol(typing.Protocol):
 
     class AlreadyExistsError(BaseError): ...
 
+    class DeleteManyError(BaseError):
+        def __init__(self, errors: dict[uuid.UUID, str]) -> None:
+            super().__init__(errors)
+            self.errors = errors
+
     async def create(
         self,
         id: uuid.UUID,
@@ -21,6 +26,19 @@ class StorageProtocol(typing.Protocol):
         """
         ...
 
+    async def create_stream(
+        self,
+        id: uuid.UUID,
+        chunks: typing.AsyncIterable[bytes],
+        duration_seconds: float,
+        format: voice_models.AudioFormat,
+    ) -> None:
+        """
+        Stores audio data as it is read from chunks, without holding the whole audio in memory
+        :raises AlreadyExistsError: if audio with the same id already exists
+        """
+        ...
+
     async def read(
         self,
         id: uuid.UUID,
@@ -30,11 +48,47 @@ class StorageProtocol(typing.Protocol):
         """
         ...
 
+    async def read_range(
+        self,
+        id: uuid.UUID,
+        offset_bytes: int,
+        length_bytes: int,
+    ) -> bytes:
+        """
+        Reads a range of the audio data without reading the whole audio
+        :raises NotFoundError: if audio with the given id does not exist
+        """
+        ...
+
+    async def exists(
+        self,
+        id: uuid.UUID,
+    ) -> bool: ...
+
+    async def touch(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        """
+        Refreshes the stored audio, so its expiration counts from now
+        :returns: False if audio with the given id does not exist
+        """
+        ...
+
     async def delete(
         self,
         id: uuid.UUID,
     ) -> None: ...
 
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        """
+        :raises DeleteManyError: with an error message per id that failed to be deleted
+        """
+        ...
+
 
 __all__ = [
     "StorageProtocol",
@@ -1,7 +1,9 @@
 import dataclasses
+import typing
 import uuid
 
 import lib.utils.aiobotocore as aiobotocore_utils
+import lib.voice.clients.storage.framing as framing
 import lib.voice.clients.storage.protocol as protocol
 import lib.voice.models as voice_models
 import lib.voice.schemas as voice_schemas
@@ -12,22 +14,63 @@ class S3Storage(protocol.StorageProtocol):
     s3_client: aiobotocore_utils.S3Client
     bucket_name: str
     key_prefix: str = "audio"
+    stream_threshold_bytes: int = 16 * 1024 * 1024  # larger payloads are uploaded as multipart
+    part_size: int = 8 * 1024 * 1024
+    max_concurrency: int = 4
 
     def _prepare_key(self, id: uuid.UUID) -> str:
         return f"{self.key_prefix}/{id}"
 
+    async def _iter_parts(self, data: bytes) -> typing.AsyncIterator[bytes]:
+        for start in range(0, len(data), self.part_size):
+            yield data[start : start + self.part_size]
+
     async def create(
         self,
         id: uuid.UUID,
         audio: voice_models.Audio,
     ) -> None:
-        data = voice_schemas.Audio.from_dataclass(audio).to_bytes()
+        # Audio data is the object body as is, the rest goes to the object metadata
+        metadata = framing.to_metadata(audio)
+
+        try:
+            if len(audio.data) > self.stream_threshold_bytes:
+                await self.s3_client.create_stream(
+                    bucket_name=self.bucket_name,
+                    key=self._prepare_key(id),
+                    chunks=self._iter_parts(audio.data),
+                    part_size=self.part_size,
+                    max_concurrency=self.max_concurrency,
+                    metadata=metadata,
+                )
+            else:
+                await self.s3_client.create(
+                    bucket_name=self.bucket_name,
+                    key=self._prepare_key(id),
+                    data=audio.data,
+                    metadata=metadata,
+                )
+        except self.s3_client.AlreadyExistsError as exc:
+            raise self.AlreadyExistsError from exc
+
+    async def create_stream(
+        self,
+        id: uuid.UUID,
+        chunks: typing.AsyncIterable[bytes],
+        duration_seconds: float,
+        format: voice_models.AudioFormat,
+    ) -> None:
+        # Framing only needs the duration and the format, the data goes to the object body
+        header = voice_models.Audio(data=b"", duration_seconds=duration_seconds, format=format)
 
         try:
-            await self.s3_client.create(
+            await self.s3_client.create_stream(
                 bucket_name=self.bucket_name,
                 key=self._prepare_key(id),
-                data=data,
+                chunks=chunks,
+                part_size=self.part_size,
+                max_concurrency=self.max_concurrency,
+                metadata=framing.to_metadata(header),
             )
         except self.s3_client.AlreadyExistsError as exc:
             raise self.AlreadyExistsError from exc
@@ -36,15 +79,83 @@ class S3Storage(protocol.StorageProtocol):
         self,
         id: uuid.UUID,
     ) -> voice_models.Audio:
+        metadata: dict[str, str] = {}
         try:
-            data = await self.s3_client.read(
-                bucket_name=self.bucket_name,
-                key=self._prepare_key(id),
-            )
+            chunks = [
+                chunk
+                async for chunk in self.s3_client.read_stream(
+                    bucket_name=self.bucket_name,
+                    key=self._prepare_key(id),
+                    metadata=metadata,
+                )
+            ]
         except self.s3_client.NotFoundError as exc:
             raise self.NotFoundError from exc
 
-        return voice_schemas.Audio.from_bytes(data).to_dataclass()
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        if not framing.has_metadata(metadata):
+            # Written before audio metadata was introduced
+            return voice_schemas.Audio.from_bytes(data).to_dataclass()
+
+        return framing.from_metadata(metadata, data)
+
+    async def read_range(
+        self,
+        id: uuid.UUID,
+        offset_bytes: int,
+        length_bytes: int,
+    ) -> bytes:
+        """
+        Ranged GET of the object body, which is the audio data as is for audio written with metadata framing.
+        """
+        if length_bytes <= 0:
+            return b""
+
+        try:
+            chunks = [
+                chunk
+                async for chunk in self.s3_client.read_stream(
+                    bucket_name=self.bucket_name,
+                    key=self._prepare_key(id),
+                    start=offset_bytes,
+                    end=offset_bytes + length_bytes - 1,
+                )
+            ]
+        except self.s3_client.NotFoundError as exc:
+            raise self.NotFoundError from exc
+
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    async def exists(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return await self.s3_client.exists(
+            bucket_name=self.bucket_name,
+            key=self._prepare_key(id),
+        )
+
+    async def touch(
+        self,
+        id: uuid.UUID,
+    ) -> bool:
+        return await self.s3_client.touch(
+            bucket_name=self.bucket_name,
+            key=self._prepare_key(id),
+        )
+
+    async def put_expiration_rule(
+        self,
+        days: int,
+    ) -> None:
+        """
+        Stored audio expire after the given number of days, even if the workflow never gets to clean them up.
+        """
+        await self.s3_client.put_expiration_rule(
+            bucket_name=self.bucket_name,
+            prefix=f"{self.key_prefix}/",
+            days=days,
+        )
 
     async def delete(
         self,
@@ -55,6 +166,20 @@ class S3Storage(protocol.StorageProtocol):
             key=self._prepare_key(id),
         )
 
+    async def delete_many(
+        self,
+        ids: typing.Sequence[uuid.UUID],
+    ) -> None:
+        keys = {self._prepare_key(id): id for id in ids}
+
+        try:
+            await self.s3_client.delete_many(
+                bucket_name=self.bucket_name,
+                keys=list(keys),
+            )
+        except self.s3_client.DeleteManyError as exc:
+            raise self.DeleteManyError({keys[key]: error for key, error in exc.errors.items()}) from exc
+
 
 __all__ = [
     "S3Storage",
@@ -0,0 +1,33 @@
+import uuid
+
+import lib.utils.wave as wave_utils
+import lib.voice.clients.storage.protocol as protocol
+import lib.voice.models as voice_models
+
+
+async def read_slice(
+    storage_client: protocol.StorageProtocol,
+    id: uuid.UUID,
+    audio_slice: voice_models.AudioSlice,
+) -> voice_models.Audio:
+    """
+    Reads a chunk of indexed audio with a single ranged read and wraps its PCM data into WAV.
+    """
+    data = await storage_client.read_range(id, audio_slice.offset_bytes, audio_slice.length_bytes)
+    header = wave_utils.pack_header(
+        data_length=len(data),
+        frame_rate=voice_models.INDEX_PCM_FORMAT.frame_rate,
+        sample_width=voice_models.INDEX_PCM_FORMAT.sample_width,
+        channels=voice_models.INDEX_PCM_FORMAT.channels,
+    )
+
+    return voice_models.Audio(
+        data=header + data,
+        duration_seconds=audio_slice.duration_seconds,
+        format=voice_models.AudioFormat.WAV,
+    )
+
+
+__all__ = [
+    "read_slice",
+]
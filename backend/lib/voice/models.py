@@ -29,6 +29,40 @@ class Audio:
     format: AudioFormat
 
 
+@dataclasses.dataclass(frozen=True)
+class PcmFormat:
+    frame_rate: int
+    sample_width: int
+    channels: int
+
+
+# Indexed audio is WAV with a fixed PCM format, so any of its slices can be wrapped into WAV on its own
+INDEX_PCM_FORMAT = PcmFormat(frame_rate=16000, sample_width=2, channels=1)
+
+
+@dataclasses.dataclass
+class AudioSlice:
+    """
+    Entry of the splitter index, byte range of a chunk inside the data of the indexed audio.
+    """
+
+    offset_bytes: int
+    length_bytes: int
+    duration_seconds: float
+
+
+@dataclasses.dataclass
+class RemoteAudio:
+    """
+    Audio still stored in Telegram, referenced by its Bot API file id.
+    """
+
+    file_id: str
+    duration_seconds: float
+    format: AudioFormat
+    file_size_bytes: int | None = None
+
+
 @dataclasses.dataclass
 class RecognitionResult:
     text: str
@@ -42,8 +76,12 @@ class RecognitionTaskResult:
 
 
 __all__ = [
+    "INDEX_PCM_FORMAT",
     "Audio",
     "AudioFormat",
+    "AudioSlice",
+    "PcmFormat",
     "RecognitionResult",
     "RecognitionTaskResult",
+    "RemoteAudio",
 ]
@@ -13,6 +13,24 @@ class Audio(pydantic_utils.BaseDataclassSchema[voice_models.Audio]):
     format: voice_models.AudioFormat
 
 
+class RecognitionResult(pydantic_utils.BaseDataclassSchema[voice_models.RecognitionResult]):
+    class Meta(pydantic_utils.BaseDataclassSchema.Meta):
+        DATACLASS = voice_models.RecognitionResult
+
+    text: str
+    duration_seconds: float
+
+
+class RecognitionTaskResult(pydantic_utils.BaseDataclassSchema[voice_models.RecognitionTaskResult]):
+    class Meta(pydantic_utils.BaseDataclassSchema.Meta):
+        DATACLASS = voice_models.RecognitionTaskResult
+
+    recognition_results: list[RecognitionResult]
+    metadata: str
+
+
 __all__ = [
     "Audio",
+    "RecognitionResult",
+    "RecognitionTaskResult",
 ]
@@ -7,7 +7,17 @@ import lib.voice.models as voice_models
 class RecognitionTaskProtocol(typing.Protocol):
     async def add_task(self, audio: voice_models.Audio, task_metadata: str) -> None: ...
 
-    async def get_result(self, audio_id: uuid.UUID) -> voice_models.RecognitionTaskResult: ...
+    async def add_remote_task(self, remote_audio: voice_models.RemoteAudio, task_metadata: str) -> None:
+        """
+        Same as add_task, but the audio is downloaded by the task itself.
+        """
+        ...
+
+    async def get_result(
+        self,
+        audio_id: uuid.UUID,
+        result_id: uuid.UUID | None = None,
+    ) -> voice_models.RecognitionTaskResult: ...
 
 
 class RecognitionProtocol(typing.Protocol):
@@ -1,4 +1,5 @@
 import dataclasses
+import typing
 import uuid
 
 import temporalio.client as temporalio_client
@@ -9,51 +10,159 @@ import lib.voice.models as voice_models
 import lib.voice.services.protocols as protocols
 
 
+@dataclasses.dataclass(frozen=True)
+class RecognitionLane:
+    name: str
+    max_audio_duration_seconds: float
+    task_queue: str
+    split_task_queue: str | None = None
+    recognition_task_queue: str | None = None
+
+
 @dataclasses.dataclass(frozen=True)
 class TemporalRecognitionTask(protocols.RecognitionTaskProtocol):
     audio_storage_client: voice_clients.StorageProtocol
+    result_storage_client: voice_clients.ResultStorageProtocol
     temporal_client: temporalio_client.Client
     temporal_task_queue: str
     split_timeout_seconds: int
+    split_timeout_seconds_per_audio_second: float
+    split_heartbeat_timeout_seconds: int
     recognition_timeout_seconds: int
+    recognition_timeout_seconds_per_audio_second: float
     clean_up_timeout_seconds: int
+    recognition_max_in_flight: int
+    recognition_batch_duration_seconds: float
+    result_offload_threshold_bytes: int
+    session_enabled: bool
+    session_schedule_to_start_timeout_seconds: int
+    split_task_queue: str | None = None
+    recognition_task_queue: str | None = None
+    lanes: typing.Sequence[RecognitionLane] = ()
+    callback_with_result_enabled: bool = False
+    download_timeout_seconds: int = 5 * 60
+    local_activities_enabled: bool = False
+    local_activity_max_attempts: int = 10
+    content_addressed: bool = False
+    split_indexed: bool = False
+    storage_expiration_enabled: bool = False
 
-    async def add_task(
+    def _get_lane(self, audio_duration_seconds: float) -> RecognitionLane:
+        """
+        Picks the shortest lane the audio fits into, so short audio is not queued behind long ones.
+        Audio longer than any lane or of unknown duration (0, e.g. documents) goes to the default task queues.
+        """
+        for lane in sorted(self.lanes, key=lambda lane: lane.max_audio_duration_seconds):
+            if 0 < audio_duration_seconds <= lane.max_audio_duration_seconds:
+                return lane
+
+        return RecognitionLane(
+            name="default",
+            max_audio_duration_seconds=float("inf"),
+            task_queue=self.temporal_task_queue,
+            split_task_queue=self.split_task_queue,
+            recognition_task_queue=self.recognition_task_queue,
+        )
+
+    async def _start_workflow(
         self,
-        audio: voice_models.Audio,
+        audio_id: uuid.UUID,
+        audio_duration_seconds: float,
         task_metadata: str,
+        remote_audio: voice_models.RemoteAudio | None = None,
     ) -> None:
-        audio_id = uuid.uuid4()
-        await self.audio_storage_client.create(audio_id, audio)
+        lane = self._get_lane(audio_duration_seconds)
+        # Content addressed audio id is shared by jobs with the same audio, so the workflow gets its own id
+        task_id = uuid.uuid4()
 
         await self.temporal_client.start_workflow(
             temporal_workflows.Recognition.run,
             temporal_workflows.Recognition.Params(
                 audio_id=audio_id,
+                task_id=task_id,
+                audio_duration_seconds=audio_duration_seconds,
+                remote_audio=remote_audio,
+                download_timeout_seconds=self.download_timeout_seconds,
                 split_timeout_seconds=self.split_timeout_seconds,
+                split_timeout_seconds_per_audio_second=self.split_timeout_seconds_per_audio_second,
+                split_heartbeat_timeout_seconds=self.split_heartbeat_timeout_seconds,
                 recognize_timeout_seconds=self.recognition_timeout_seconds,
+                recognize_timeout_seconds_per_audio_second=self.recognition_timeout_seconds_per_audio_second,
                 clean_up_timeout_seconds=self.clean_up_timeout_seconds,
+                recognize_max_in_flight=self.recognition_max_in_flight,
+                recognize_batch_duration_seconds=self.recognition_batch_duration_seconds,
+                result_offload_threshold_bytes=self.result_offload_threshold_bytes,
+                session_enabled=self.session_enabled,
+                session_schedule_to_start_timeout_seconds=self.session_schedule_to_start_timeout_seconds,
+                split_task_queue=lane.split_task_queue,
+                recognize_task_queue=lane.recognition_task_queue,
+                lane=lane.name,
+                callback_with_result=self.callback_with_result_enabled,
+                local_activities_enabled=self.local_activities_enabled,
+                local_activity_max_attempts=self.local_activity_max_attempts,
+                content_addressed=self.content_addressed,
+                split_indexed=self.split_indexed,
+                storage_expiration_enabled=self.storage_expiration_enabled,
                 metadata=task_metadata,
             ),
-            id=str(audio_id),
-            task_queue=self.temporal_task_queue,
+            id=str(task_id),
+            task_queue=lane.task_queue,
+        )
+
+    async def add_task(
+        self,
+        audio: voice_models.Audio,
+        task_metadata: str,
+    ) -> None:
+        if self.content_addressed:
+            audio_id = await voice_clients.create_content_addressed(self.audio_storage_client, audio)
+        else:
+            audio_id = uuid.uuid4()
+            await self.audio_storage_client.create(audio_id, audio)
+
+        await self._start_workflow(
+            audio_id=audio_id,
+            audio_duration_seconds=audio.duration_seconds,
+            task_metadata=task_metadata,
+        )
+
+    async def add_remote_task(
+        self,
+        remote_audio: voice_models.RemoteAudio,
+        task_metadata: str,
+    ) -> None:
+        await self._start_workflow(
+            audio_id=uuid.uuid4(),
+            audio_duration_seconds=remote_audio.duration_seconds,
+            task_metadata=task_metadata,
+            remote_audio=remote_audio,
         )
 
     async def get_result(
         self,
         audio_id: uuid.UUID,
+        result_id: uuid.UUID | None = None,
     ) -> voice_models.RecognitionTaskResult:
+        if result_id is not None:
+            return await self.result_storage_client.read(result_id)
+
         workflow_handle = self.temporal_client.get_workflow_handle(
             workflow_id=str(audio_id),
-            result_type=voice_models.RecognitionTaskResult,
+            result_type=temporal_workflows.Recognition.Output,
         )
-        result = await workflow_handle.query(
+        output = await workflow_handle.query(
             temporal_workflows.Recognition.get_result,
         )
-        assert result is not None
-        return result
+        assert output is not None
+
+        if output.result_id is not None:
+            return await self.result_storage_client.read(output.result_id)
+
+        assert output.result is not None
+        return output.result
 
 
 __all__ = [
+    "RecognitionLane",
     "TemporalRecognitionTask",
 ]
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+
+import lib.utils.aiobotocore as aiobotocore_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+import tests.settings as test_settings
+
+
+@pytest.fixture(name="s3_result_storage_client")
+def fixture_s3_result_storage_client(
+    s3_client: aiobotocore_utils.S3Client,
+    settings: test_settings.Settings,
+):
+    return voice_clients.S3ResultStorage(
+        s3_client=s3_client,
+        bucket_name=settings.s3.bucket_name,
+    )
+
+
+@pytest.fixture(name="result")
+def fixture_result():
+    return voice_models.RecognitionTaskResult(
+        recognition_results=[voice_models.RecognitionResult(text="текст", duration_seconds=1)],
+        metadata="{}",
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_read_delete(
+    s3_result_storage_client: voice_clients.S3ResultStorage,
+    result: voice_models.RecognitionTaskResult,
+):
+    result_id = uuid.uuid4()
+
+    await s3_result_storage_client.create(result_id, result)
+    stored_result = await s3_result_storage_client.read(result_id)
+    await s3_result_storage_client.delete(result_id)
+
+    assert result == stored_result
+
+
+@pytest.mark.asyncio
+async def test_create_twice_overwrites(
+    s3_result_storage_client: voice_clients.S3ResultStorage,
+    result: voice_models.RecognitionTaskResult,
+):
+    result_id = uuid.uuid4()
+
+    await s3_result_storage_client.create(result_id, result)
+    await s3_result_storage_client.create(result_id, result)
+    await s3_result_storage_client.delete(result_id)
+
+
+@pytest.mark.asyncio
+async def test_read_not_found_raises(
+    s3_result_storage_client: voice_clients.S3ResultStorage,
+):
+    with pytest.raises(voice_clients.ResultStorageProtocol.NotFoundError):
+        await s3_result_storage_client.read(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_delete_many(
+    s3_result_storage_client: voice_clients.S3ResultStorage,
+    result: voice_models.RecognitionTaskResult,
+):
+    result_ids = [uuid.uuid4() for _ in range(3)]
+    for result_id in result_ids:
+        await s3_result_storage_client.create(result_id, result)
+
+    await s3_result_storage_client.delete_many(result_ids)
+
+    for result_id in result_ids:
+        with pytest.raises(voice_clients.ResultStorageProtocol.NotFoundError):
+            await s3_result_storage_client.read(result_id)
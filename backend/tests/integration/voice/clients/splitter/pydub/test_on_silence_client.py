@@ -1,9 +1,11 @@
 import asyncio
 import concurrent.futures as concurrent_futures
+import uuid
 
 import pytest
 import pytest_mock
 
+import lib.utils.pydub as pydub_utils
 import lib.voice.clients as voice_clients
 import lib.voice.models as voice_models
 import tests.utils as test_utils
@@ -32,3 +34,33 @@ async def test_split_on_silence_default(
         count += 1
 
     assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_index_matches_split(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    source_audio = test_utils.read_voice_sample(voice_models.AudioFormat.WAV)
+
+    conversion_client = mocker.MagicMock(spec=voice_clients.ConversionProtocol)
+    conversion_client.convert.return_value = source_audio
+
+    client = voice_clients.PydubOnSilenceSplitter(
+        loop=asyncio.get_running_loop(),
+        thread_pool_executor=concurrent_futures.ThreadPoolExecutor(max_workers=1),
+        conversion_client=conversion_client,
+        silence_difference_db=0,
+    )
+    storage_client = voice_clients.MemoryStorage()
+
+    indexed_audio, slices = await client.index(source_audio)
+    await storage_client.create(audio_id := uuid.uuid4(), indexed_audio)
+    chunks = [chunk async for chunk in client.split(source_audio)]
+
+    assert len(slices) == len(chunks) == 3
+    for audio_slice, chunk in zip(slices, chunks):
+        assert audio_slice.duration_seconds == pytest.approx(chunk.duration_seconds, abs=0.01)
+
+        chunk_audio = await voice_clients.read_slice(storage_client, audio_id, audio_slice)
+        audio_segment = pydub_utils.get_audio_segment_from_data(chunk_audio.data, pydub_utils.AudioSegmentFormat.WAV)
+        assert audio_segment.duration_seconds == pytest.approx(chunk.duration_seconds, abs=0.01)
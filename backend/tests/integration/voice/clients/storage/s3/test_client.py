@@ -1,3 +1,6 @@
+import asyncio
+import os
+import typing
 import uuid
 
 import pytest
@@ -5,6 +8,7 @@ import pytest
 import lib.utils.aiobotocore as aiobotocore_utils
 import lib.voice.clients as voice_clients
 import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
 import tests.settings as test_settings
 import tests.utils as test_utils
 
@@ -69,3 +73,178 @@ async def test_create_already_exists_raises(
 
     with pytest.raises(voice_clients.StorageProtocol.AlreadyExistsError):
         await s3_storage_client.create(audio_id, audio)
+
+
+@pytest.mark.asyncio
+async def test_delete_many(
+    s3_storage_client: voice_clients.S3Storage,
+    audio: voice_models.Audio,
+):
+    audio_ids = [uuid.uuid4() for _ in range(3)]
+    for audio_id in audio_ids:
+        await s3_storage_client.create(audio_id, audio)
+
+    await s3_storage_client.delete_many([*audio_ids, uuid.uuid4()])
+
+    for audio_id in audio_ids:
+        with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+            await s3_storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_create_read_multipart(
+    s3_client: aiobotocore_utils.S3Client,
+    settings: test_settings.Settings,
+):
+    s3_storage_client = voice_clients.S3Storage(
+        s3_client=s3_client,
+        bucket_name=settings.s3.bucket_name,
+        stream_threshold_bytes=0,
+        part_size=aiobotocore_utils.S3Client.MULTIPART_MIN_PART_SIZE,
+    )
+    audio = voice_models.Audio(
+        data=os.urandom(2 * aiobotocore_utils.S3Client.MULTIPART_MIN_PART_SIZE + 1),
+        duration_seconds=1,
+        format=voice_models.AudioFormat.WAV,
+    )
+    audio_id = uuid.uuid4()
+
+    await s3_storage_client.create(audio_id, audio)
+    stored_audio = await s3_storage_client.read(audio_id)
+
+    with pytest.raises(voice_clients.StorageProtocol.AlreadyExistsError):
+        await s3_storage_client.create(audio_id, audio)
+
+    await s3_storage_client.delete(audio_id)
+
+    assert audio == stored_audio
+
+
+@pytest.mark.asyncio
+async def test_create_stream_multipart(
+    s3_client: aiobotocore_utils.S3Client,
+    settings: test_settings.Settings,
+):
+    s3_storage_client = voice_clients.S3Storage(
+        s3_client=s3_client,
+        bucket_name=settings.s3.bucket_name,
+        part_size=aiobotocore_utils.S3Client.MULTIPART_MIN_PART_SIZE,
+    )
+    audio = voice_models.Audio(
+        data=os.urandom(2 * aiobotocore_utils.S3Client.MULTIPART_MIN_PART_SIZE + 1),
+        duration_seconds=1,
+        format=voice_models.AudioFormat.OGG,
+    )
+    audio_id = uuid.uuid4()
+
+    async def iter_chunks() -> typing.AsyncIterator[bytes]:
+        for index in range(0, len(audio.data), 64 * 1024):
+            yield audio.data[index : index + 64 * 1024]
+
+    await s3_storage_client.create_stream(
+        audio_id,
+        iter_chunks(),
+        duration_seconds=audio.duration_seconds,
+        format=audio.format,
+    )
+    stored_audio = await s3_storage_client.read(audio_id)
+    await s3_storage_client.delete(audio_id)
+
+    assert audio == stored_audio
+
+
+@pytest.mark.asyncio
+async def test_read_legacy_schema_format(
+    s3_client: aiobotocore_utils.S3Client,
+    s3_storage_client: voice_clients.S3Storage,
+    settings: test_settings.Settings,
+    audio: voice_models.Audio,
+):
+    audio_id = uuid.uuid4()
+    await s3_client.create(
+        bucket_name=settings.s3.bucket_name,
+        key=f"{s3_storage_client.key_prefix}/{audio_id}",
+        data=voice_schemas.Audio.from_dataclass(audio).to_bytes(),
+    )
+
+    stored_audio = await s3_storage_client.read(audio_id)
+    await s3_storage_client.delete(audio_id)
+
+    assert audio == stored_audio
+
+
+@pytest.mark.asyncio
+async def test_exists(
+    s3_storage_client: voice_clients.S3Storage,
+    audio: voice_models.Audio,
+):
+    audio_id = uuid.uuid4()
+
+    assert not await s3_storage_client.exists(audio_id)
+    await s3_storage_client.create(audio_id, audio)
+    assert await s3_storage_client.exists(audio_id)
+    await s3_storage_client.delete(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_touch_refreshes_last_modified(
+    s3_client: aiobotocore_utils.S3Client,
+    s3_storage_client: voice_clients.S3Storage,
+    settings: test_settings.Settings,
+    audio: voice_models.Audio,
+):
+    audio_id = uuid.uuid4()
+    key = f"{s3_storage_client.key_prefix}/{audio_id}"
+
+    assert not await s3_storage_client.touch(audio_id)
+    await s3_storage_client.create(audio_id, audio)
+    async with s3_client.client_context() as client:
+        created = await client.head_object(Bucket=settings.s3.bucket_name, Key=key)
+    await asyncio.sleep(1)
+    assert await s3_storage_client.touch(audio_id)
+    async with s3_client.client_context() as client:
+        touched = await client.head_object(Bucket=settings.s3.bucket_name, Key=key)
+    stored_audio = await s3_storage_client.read(audio_id)
+    await s3_storage_client.delete(audio_id)
+
+    assert touched["LastModified"] > created["LastModified"]
+    assert stored_audio == audio
+
+
+@pytest.mark.asyncio
+async def test_put_expiration_rule_keeps_other_rules(
+    s3_client: aiobotocore_utils.S3Client,
+    s3_storage_client: voice_clients.S3Storage,
+    settings: test_settings.Settings,
+):
+    bucket_name = settings.s3.bucket_name
+    async with s3_client.client_context() as client:
+        try:
+            original_rules = (await client.get_bucket_lifecycle_configuration(Bucket=bucket_name))["Rules"]
+        except client.exceptions.ClientError as exc:
+            if exc.response["Error"]["Code"] != "NoSuchLifecycleConfiguration":
+                raise
+            original_rules = []
+
+    try:
+        await s3_client.put_expiration_rule(bucket_name=bucket_name, prefix="other/", days=7)
+        await s3_storage_client.put_expiration_rule(days=1)
+        await s3_storage_client.put_expiration_rule(days=2)
+
+        async with s3_client.client_context() as client:
+            response = await client.get_bucket_lifecycle_configuration(Bucket=bucket_name)
+    finally:
+        # The bucket is shared, so the expiration rules must not outlive the test
+        async with s3_client.client_context() as client:
+            if original_rules:
+                await client.put_bucket_lifecycle_configuration(
+                    Bucket=bucket_name,
+                    LifecycleConfiguration={"Rules": original_rules},
+                )
+            else:
+                await client.delete_bucket_lifecycle(Bucket=bucket_name)
+
+    rules = {rule["Filter"]["Prefix"]: rule["Expiration"]["Days"] for rule in response["Rules"]}
+
+    assert rules["other/"] == 7
+    assert rules["audio/"] == 2
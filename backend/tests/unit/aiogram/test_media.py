@@ -0,0 +1,39 @@
+import pytest
+import pytest_mock
+
+import lib.aiogram.handlers as aiogram_handlers
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("duration", "file_size", "inline"),
+    [
+        (3, 10 * 1024, True),
+        (30, 1024 * 1024, True),
+        (31, 10 * 1024, False),
+        (3, 1024 * 1024 + 1, False),
+        (3, None, False),
+    ],
+)
+async def test_hybrid_routes_by_threshold(
+    mocker: pytest_mock.MockerFixture,
+    duration: int,
+    file_size: int | None,
+    inline: bool,
+):
+    synchronous_handler = mocker.AsyncMock()
+    task_handler = mocker.AsyncMock()
+    handler = aiogram_handlers.HybridMediaMessageHandler(
+        bot=mocker.Mock(),
+        synchronous_handler=synchronous_handler,
+        task_handler=task_handler,
+        inline_max_audio_duration_seconds=30,
+        inline_max_file_size_bytes=1024 * 1024,
+    )
+    message = mocker.Mock(audio=None, document=None, video_note=None, video=None)
+    message.voice = mocker.Mock(file_id="file_id", duration=duration, file_size=file_size)
+
+    await handler.process(message)
+
+    assert synchronous_handler.process.await_count == int(inline)
+    assert task_handler.process.await_count == int(not inline)
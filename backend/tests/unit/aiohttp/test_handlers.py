@@ -0,0 +1,191 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+import pytest_mock
+
+import lib.aiohttp.handlers as aiohttp_handlers
+import lib.utils.hmac as hmac_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+import lib.voice.services.protocols as voice_service_protocols
+
+SECRET = "secret"
+
+
+@pytest.fixture(name="result")
+def fixture_result():
+    return voice_models.RecognitionTaskResult(
+        recognition_results=[voice_models.RecognitionResult(text="Привет", duration_seconds=1)],
+        metadata="{}",
+    )
+
+
+def create_request(
+    mocker: pytest_mock.MockerFixture,
+    data: bytes,
+    signature: str | None,
+    content_type: str,
+    timestamp: int | None = None,
+):
+    request = mocker.Mock()
+    request.read = mocker.AsyncMock(return_value=data)
+    request.headers = {}
+    if signature is not None:
+        request.headers[aiohttp_handlers.MediaCallbackHandler.signature_header] = signature
+    if timestamp is not None:
+        request.headers[aiohttp_handlers.MediaCallbackHandler.signature_timestamp_header] = str(timestamp)
+    request.content_type = content_type
+    return request
+
+
+@pytest.mark.asyncio
+async def test_media_callback_with_result(mocker: pytest_mock.MockerFixture, result: voice_models.RecognitionTaskResult):
+    callback_processor = mocker.AsyncMock()
+    handler = aiohttp_handlers.MediaCallbackHandler(
+        recognition_task_service=mocker.Mock(),
+        callback_processor=callback_processor,
+        signing_secret=SECRET,
+    )
+    audio_id = uuid.uuid4()
+    data = aiohttp_handlers.MediaCallbackHandler.RequestSchema(
+        audio_id=audio_id,
+        result=voice_schemas.RecognitionTaskResult.from_dataclass(result),
+    ).to_bytes()
+
+    timestamp = int(time.time())
+
+    response = await handler.process(
+        create_request(
+            mocker,
+            data,
+            hmac_utils.sign_timestamped(SECRET, data, timestamp),
+            handler.content_type,
+            timestamp=timestamp,
+        ),
+    )
+
+    assert response.status == 200
+    callback_processor.assert_awaited_once_with(audio_id=audio_id, result=result, result_id=None)
+
+
+@pytest.mark.asyncio
+async def test_media_callback_invalid_signature(mocker: pytest_mock.MockerFixture):
+    callback_processor = mocker.AsyncMock()
+    handler = aiohttp_handlers.MediaCallbackHandler(
+        recognition_task_service=mocker.Mock(),
+        callback_processor=callback_processor,
+        signing_secret=SECRET,
+    )
+    data = aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=uuid.uuid4()).to_bytes()
+
+    response = await handler.process(create_request(mocker, data, "invalid", handler.content_type))
+
+    assert response.status == 401
+    callback_processor.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_media_callback_replayed_signature(mocker: pytest_mock.MockerFixture):
+    callback_processor = mocker.AsyncMock()
+    handler = aiohttp_handlers.MediaCallbackHandler(
+        recognition_task_service=mocker.Mock(),
+        callback_processor=callback_processor,
+        signing_secret=SECRET,
+    )
+    data = aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=uuid.uuid4()).to_bytes()
+    timestamp = int(time.time() - handler.signature_tolerance_seconds - 1)
+    signature = hmac_utils.sign_timestamped(SECRET, data, timestamp)
+
+    replayed_response = await handler.process(
+        create_request(mocker, data, signature, handler.content_type, timestamp=timestamp),
+    )
+    # The timestamp is signed as well, so it can't be refreshed without the secret
+    retimestamped_response = await handler.process(
+        create_request(mocker, data, signature, handler.content_type, timestamp=int(time.time())),
+    )
+
+    assert replayed_response.status == 401
+    assert retimestamped_response.status == 401
+    callback_processor.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_media_callback_json(mocker: pytest_mock.MockerFixture):
+    callback_processor = mocker.AsyncMock()
+    handler = aiohttp_handlers.MediaCallbackHandler(
+        recognition_task_service=mocker.Mock(),
+        callback_processor=callback_processor,
+    )
+    audio_id = uuid.uuid4()
+    data = aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=audio_id).to_json_bytes()
+
+    response = await handler.process(create_request(mocker, data, None, "application/json"))
+
+    assert response.status == 200
+    callback_processor.assert_awaited_once_with(audio_id=audio_id, result=None, result_id=None)
+
+
+async def run_delivery_queue(delivery_queue: aiohttp_handlers.MediaCallbackDeliveryQueue) -> None:
+    task = asyncio.create_task(delivery_queue.run())
+    await delivery_queue._queue.join()  # pyright: ignore[reportPrivateUsage]
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_media_callback_accepted_and_delivered_once(
+    mocker: pytest_mock.MockerFixture,
+    result: voice_models.RecognitionTaskResult,
+):
+    callback_processor = mocker.AsyncMock()
+    recognition_task_service = mocker.AsyncMock(spec=voice_service_protocols.RecognitionTaskProtocol)
+    recognition_task_service.get_result.return_value = result
+    delivery_queue = aiohttp_handlers.MediaCallbackDeliveryQueue(
+        delivery_storage_client=voice_clients.MemoryDeliveryStorage(),
+        recognition_task_service=recognition_task_service,
+        callback_processor=callback_processor,
+    )
+    handler = aiohttp_handlers.MediaCallbackHandler(
+        recognition_task_service=mocker.Mock(),
+        callback_processor=callback_processor,
+        delivery_queue=delivery_queue,
+    )
+    audio_id = uuid.uuid4()
+    data = aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=audio_id).to_bytes()
+
+    response = await handler.process(create_request(mocker, data, None, handler.content_type))
+    await run_delivery_queue(delivery_queue)
+    redelivered_response = await handler.process(create_request(mocker, data, None, handler.content_type))
+    await run_delivery_queue(delivery_queue)
+
+    assert response.status == 202
+    assert redelivered_response.status == 202
+    # Resolved before the callback is accepted, the workflow may clean up the result right after
+    recognition_task_service.get_result.assert_awaited_once_with(audio_id, None)
+    callback_processor.assert_awaited_once_with(audio_id=audio_id, result=result, result_id=None)
+    assert await delivery_queue.delivery_storage_client.list_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_media_callback_delivery_retries(mocker: pytest_mock.MockerFixture):
+    callback_processor = mocker.AsyncMock(side_effect=[RuntimeError, None])
+    delivery_storage_client = voice_clients.MemoryDeliveryStorage()
+    delivery_queue = aiohttp_handlers.MediaCallbackDeliveryQueue(
+        delivery_storage_client=delivery_storage_client,
+        recognition_task_service=mocker.AsyncMock(spec=voice_service_protocols.RecognitionTaskProtocol),
+        callback_processor=callback_processor,
+        retry_delay_seconds=0,
+    )
+    audio_id = uuid.uuid4()
+    await delivery_storage_client.create_pending(
+        audio_id,
+        aiohttp_handlers.MediaCallbackHandler.RequestSchema(audio_id=audio_id).to_bytes(),
+    )
+
+    await delivery_queue.restore()
+    await run_delivery_queue(delivery_queue)
+
+    assert callback_processor.await_count == 2
+    assert await delivery_storage_client.is_delivered(audio_id)
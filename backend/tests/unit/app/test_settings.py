@@ -0,0 +1,27 @@
+import pydantic
+import pytest
+
+import lib.app.settings as app_settings
+
+
+def test_content_addressed_storage_requires_expiration():
+    with pytest.raises(pydantic.ValidationError, match="requires audio_storage.expiration_days"):
+        app_settings.TemporalioMediaHandlerSettings.model_validate(
+            {
+                "type": "temporalio",
+                "audio_storage": {"type": "local", "path": "/tmp"},
+                "content_addressed_storage_enabled": True,
+            }
+        )
+
+
+def test_content_addressed_storage_with_expiration():
+    settings = app_settings.TemporalioMediaHandlerSettings.model_validate(
+        {
+            "type": "temporalio",
+            "audio_storage": {"type": "local", "path": "/tmp", "expiration_days": 1},
+            "content_addressed_storage_enabled": True,
+        }
+    )
+
+    assert settings.content_addressed_storage_enabled
@@ -0,0 +1,373 @@
+import asyncio
+import concurrent.futures as concurrent_futures
+import dataclasses
+import pathlib
+import typing
+import uuid
+
+import pytest
+import pytest_mock
+import temporalio.testing as temporalio_testing
+
+import lib.temporal.activities as temporal_activities
+import lib.utils.files as files_utils
+import lib.utils.wave as wave_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+
+def _make_audio(duration_seconds: float) -> voice_models.Audio:
+    return voice_models.Audio(
+        data=b"data",
+        duration_seconds=duration_seconds,
+        format=voice_models.AudioFormat.WAV,
+    )
+
+
+@pytest.mark.asyncio
+async def test_splitter_resumes_from_heartbeat_offset(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    storage_client = mocker.AsyncMock(spec=voice_clients.StorageProtocol)
+    storage_client.read.return_value = _make_audio(3)
+
+    splitter_client = mocker.MagicMock(spec=voice_clients.SplitterProtocol)
+
+    async def split(audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
+        for duration_seconds in [1, 2, 3][offset:]:
+            yield _make_audio(duration_seconds)
+
+    splitter_client.split.side_effect = split
+
+    activity = temporal_activities.Splitter(
+        splitter_client=splitter_client,
+        storage_client=storage_client,
+    )
+    uploaded_chunk = temporal_activities.Splitter.Chunk(audio_id=uuid.uuid4(), duration_seconds=1)
+
+    environment = temporalio_testing.ActivityEnvironment()
+    environment.info = dataclasses.replace(
+        environment.info,
+        heartbeat_details=[
+            {"offset": 1, "chunks": [{"audio_id": str(uploaded_chunk.audio_id), "duration_seconds": 1}]},
+        ],
+    )
+    heartbeats: list[typing.Any] = []
+    environment.on_heartbeat = lambda *details: heartbeats.append(details[0])
+
+    result = await environment.run(activity.run, temporal_activities.Splitter.Params(audio_id=uuid.uuid4()))
+
+    assert [chunk.duration_seconds for chunk in result] == [1, 2, 3]
+    assert result[0] == uploaded_chunk
+    assert storage_client.create.await_count == 2
+    assert heartbeats[-1].offset == 3
+
+
+@pytest.mark.asyncio
+async def test_splitter_uploads_concurrently_in_order(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_id = uuid.uuid4()
+    storage_client = voice_clients.MemoryStorage()
+    await storage_client.create(audio_id, _make_audio(15))
+    uploads_in_flight = 0
+    max_uploads_in_flight = 0
+    create = storage_client.create
+
+    async def slow_create(id: uuid.UUID, audio: voice_models.Audio) -> None:
+        nonlocal uploads_in_flight, max_uploads_in_flight
+        uploads_in_flight += 1
+        max_uploads_in_flight = max(max_uploads_in_flight, uploads_in_flight)
+        # Later chunks finish first
+        await asyncio.sleep(0.01 * (6 - audio.duration_seconds))
+        await create(id, audio)
+        uploads_in_flight -= 1
+
+    mocker.patch.object(storage_client, "create", side_effect=slow_create)
+
+    splitter_client = mocker.MagicMock(spec=voice_clients.SplitterProtocol)
+
+    async def split(audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
+        for duration_seconds in [1, 2, 3, 4, 5][offset:]:
+            yield _make_audio(duration_seconds)
+
+    splitter_client.split.side_effect = split
+
+    activity = temporal_activities.Splitter(
+        splitter_client=splitter_client,
+        storage_client=storage_client,
+        upload_max_concurrency=3,
+    )
+
+    environment = temporalio_testing.ActivityEnvironment()
+    heartbeats: list[typing.Any] = []
+    environment.on_heartbeat = lambda *details: heartbeats.append(details[0])
+    result = await environment.run(activity.run, temporal_activities.Splitter.Params(audio_id=audio_id))
+
+    assert [chunk.duration_seconds for chunk in result] == [1, 2, 3, 4, 5]
+    for chunk in result:
+        assert (await storage_client.read(chunk.audio_id)).duration_seconds == chunk.duration_seconds
+    assert max_uploads_in_flight == 3
+    # Progress only ever covers the uploaded prefix of chunks
+    assert [heartbeat.chunks for heartbeat in heartbeats] == [result[:heartbeat.offset] for heartbeat in heartbeats]
+    assert heartbeats[-1].offset == 5
+
+
+@pytest.mark.asyncio
+async def test_splitter_deletes_uploaded_chunks_on_failure(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_id = uuid.uuid4()
+    storage_client = voice_clients.MemoryStorage()
+    await storage_client.create(audio_id, _make_audio(6))
+    create = storage_client.create
+
+    async def failing_create(id: uuid.UUID, audio: voice_models.Audio) -> None:
+        if audio.duration_seconds == 2:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Upload failed")
+        await create(id, audio)
+
+    mocker.patch.object(storage_client, "create", side_effect=failing_create)
+
+    splitter_client = mocker.MagicMock(spec=voice_clients.SplitterProtocol)
+
+    async def split(audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
+        for duration_seconds in [1, 2, 3][offset:]:
+            yield _make_audio(duration_seconds)
+
+    splitter_client.split.side_effect = split
+
+    activity = temporal_activities.Splitter(
+        splitter_client=splitter_client,
+        storage_client=storage_client,
+    )
+
+    environment = temporalio_testing.ActivityEnvironment()
+    heartbeats: list[typing.Any] = []
+    environment.on_heartbeat = lambda *details: heartbeats.append(details[0])
+    with pytest.raises(RuntimeError):
+        await environment.run(activity.run, temporal_activities.Splitter.Params(audio_id=audio_id))
+
+    # The first chunk is kept for a retry to resume from, the chunk after the failed one is deleted
+    assert heartbeats[-1].offset == 1
+    stored_ids = set(storage_client._items)  # pyright: ignore[reportPrivateUsage]
+    assert stored_ids == {audio_id, heartbeats[-1].chunks[0].audio_id}
+
+
+@pytest.mark.asyncio
+async def test_splitter_deduplicates_content_addressed_chunks(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_id = uuid.uuid4()
+    storage_client = voice_clients.MemoryStorage()
+    await storage_client.create(audio_id, _make_audio(3))
+
+    splitter_client = mocker.MagicMock(spec=voice_clients.SplitterProtocol)
+
+    async def split(audio: voice_models.Audio, offset: int = 0) -> typing.AsyncIterator[voice_models.Audio]:
+        for duration_seconds in [1, 1, 2][offset:]:
+            yield _make_audio(duration_seconds)
+
+    splitter_client.split.side_effect = split
+
+    activity = temporal_activities.Splitter(
+        splitter_client=splitter_client,
+        storage_client=storage_client,
+    )
+
+    environment = temporalio_testing.ActivityEnvironment()
+    result = await environment.run(
+        activity.run,
+        temporal_activities.Splitter.Params(audio_id=audio_id, content_addressed=True),
+    )
+
+    assert result[0] == result[1]
+    assert result[0].audio_id == voice_clients.get_content_id(_make_audio(1))
+    assert await storage_client.read(result[2].audio_id) == _make_audio(2)
+
+
+@pytest.mark.asyncio
+async def test_indexed_chunks_are_recognized_from_slices(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_id = uuid.uuid4()
+    storage_client = voice_clients.MemoryStorage()
+    await storage_client.create(audio_id, _make_audio(3))
+
+    splitter_client = mocker.AsyncMock(spec=voice_clients.SplitterProtocol)
+    splitter_client.index.return_value = (
+        voice_models.Audio(data=b"0123456789", duration_seconds=3, format=voice_models.AudioFormat.WAV),
+        [
+            voice_models.AudioSlice(offset_bytes=0, length_bytes=4, duration_seconds=1),
+            voice_models.AudioSlice(offset_bytes=4, length_bytes=6, duration_seconds=2),
+        ],
+    )
+    recognition_client = mocker.AsyncMock(spec=voice_clients.RecognitionProtocol)
+    recognition_client.recognize.side_effect = lambda audio: voice_models.RecognitionResult(
+        text=audio.data[wave_utils.HEADER_SIZE :].decode(),
+        duration_seconds=audio.duration_seconds,
+    )
+
+    environment = temporalio_testing.ActivityEnvironment()
+    chunks = await environment.run(
+        temporal_activities.Splitter(splitter_client=splitter_client, storage_client=storage_client).run,
+        temporal_activities.Splitter.Params(audio_id=audio_id, indexed=True),
+    )
+    result = await environment.run(
+        temporal_activities.RecognitionBatch(
+            recognition_client=recognition_client,
+            storage_client=storage_client,
+            result_storage_client=mocker.AsyncMock(spec=voice_clients.ResultStorageProtocol),
+        ).run,
+        temporal_activities.RecognitionBatch.Params(
+            audio_ids=[chunk.audio_id for chunk in chunks],
+            slices=[chunk.slice for chunk in chunks if chunk.slice is not None],
+        ),
+    )
+
+    assert len({chunk.audio_id for chunk in chunks}) == 1
+    assert [item.text for item in result] == ["0123", "456789"]
+    assert [item.duration_seconds for item in result] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_indexed_audio_is_reused_by_retry(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_id = uuid.uuid4()
+    storage_client = voice_clients.MemoryStorage()
+    await storage_client.create(audio_id, _make_audio(3))
+
+    splitter_client = mocker.AsyncMock(spec=voice_clients.SplitterProtocol)
+    splitter_client.index.return_value = (
+        voice_models.Audio(data=b"0123456789", duration_seconds=3, format=voice_models.AudioFormat.WAV),
+        [voice_models.AudioSlice(offset_bytes=0, length_bytes=10, duration_seconds=3)],
+    )
+    activity = temporal_activities.Splitter(splitter_client=splitter_client, storage_client=storage_client)
+    params = temporal_activities.Splitter.Params(audio_id=audio_id, indexed=True)
+
+    environment = temporalio_testing.ActivityEnvironment()
+    chunks = await environment.run(activity.run, params)
+    environment.info = dataclasses.replace(environment.info, attempt=2)
+    retried_chunks = await environment.run(activity.run, params)
+
+    assert retried_chunks == chunks
+    assert storage_client.resident_bytes == len(_make_audio(3).data) + len(b"0123456789")
+
+
+@pytest.mark.asyncio
+async def test_recognition_batch_keeps_order(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    audio_ids = [uuid.uuid4() for _ in range(5)]
+    durations = {audio_id: float(index) for index, audio_id in enumerate(audio_ids)}
+
+    storage_client = mocker.AsyncMock(spec=voice_clients.StorageProtocol)
+    storage_client.read.side_effect = lambda id: _make_audio(durations[id])
+
+    recognition_client = mocker.AsyncMock(spec=voice_clients.RecognitionProtocol)
+
+    async def recognize(audio: voice_models.Audio) -> voice_models.RecognitionResult:
+        await asyncio.sleep(0.01 * (5 - audio.duration_seconds))
+        return voice_models.RecognitionResult(text=str(audio.duration_seconds), duration_seconds=audio.duration_seconds)
+
+    recognition_client.recognize.side_effect = recognize
+
+    activity = temporal_activities.RecognitionBatch(
+        recognition_client=recognition_client,
+        storage_client=storage_client,
+        result_storage_client=mocker.AsyncMock(spec=voice_clients.ResultStorageProtocol),
+        max_concurrency=2,
+    )
+
+    environment = temporalio_testing.ActivityEnvironment()
+    result = await environment.run(activity.run, temporal_activities.RecognitionBatch.Params(audio_ids=audio_ids))
+
+    assert [item.duration_seconds for item in result] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_offloaded_batch_results_are_assembled(
+    mocker: pytest_mock.MockFixture,
+    tmp_path: pathlib.Path,
+) -> None:
+    storage_client = mocker.AsyncMock(spec=voice_clients.StorageProtocol)
+    storage_client.read.side_effect = lambda id: _make_audio(1)
+    recognition_client = mocker.AsyncMock(spec=voice_clients.RecognitionProtocol)
+    recognition_client.recognize.return_value = voice_models.RecognitionResult(text="text", duration_seconds=1)
+    file_client = files_utils.FileClient(
+        loop=asyncio.get_running_loop(),
+        thread_pool_executor=concurrent_futures.ThreadPoolExecutor(max_workers=1),
+        root_path=tmp_path,
+    )
+    result_storage_client = voice_clients.LocalResultStorage(file_client=file_client)
+
+    activity = temporal_activities.RecognitionBatch(
+        recognition_client=recognition_client,
+        storage_client=storage_client,
+        result_storage_client=result_storage_client,
+    )
+    environment = temporalio_testing.ActivityEnvironment()
+    small_output = await environment.run(
+        activity.run,
+        temporal_activities.RecognitionBatch.Params(audio_ids=[uuid.uuid4()], offload_threshold_bytes=4),
+    )
+    large_output = await environment.run(
+        activity.run,
+        temporal_activities.RecognitionBatch.Params(audio_ids=[uuid.uuid4(), uuid.uuid4()], offload_threshold_bytes=4),
+    )
+
+    assert isinstance(small_output, temporal_activities.RecognitionBatch.Output)
+    assert isinstance(large_output, temporal_activities.RecognitionBatch.Output)
+    assert small_output.results is not None
+    assert large_output.result_id is not None
+
+    result_id = uuid.uuid4()
+    saver = temporal_activities.ResultSaver(result_storage_client=result_storage_client)
+    params = temporal_activities.ResultSaver.Params(
+        result_id=result_id,
+        metadata="metadata",
+        parts=[large_output, small_output],
+    )
+    await environment.run(saver.run, params)
+    # A retry after the parts are gone finds the saved result
+    await environment.run(saver.run, params)
+
+    result = await result_storage_client.read(result_id)
+    assert [item.text for item in result.recognition_results] == ["text", "text", "text"]
+    assert result.metadata == "metadata"
+    with pytest.raises(result_storage_client.NotFoundError):
+        await result_storage_client.read(large_output.result_id)
+
+
+@pytest.mark.asyncio
+async def test_downloader_stores_telegram_file(
+    mocker: pytest_mock.MockFixture,
+) -> None:
+    bot = mocker.AsyncMock()
+    bot.get_file.return_value = mocker.Mock(file_path="voice/file.oga")
+    bot.session.api.file_url = mocker.Mock(return_value="https://api.telegram.org/file/voice/file.oga")
+
+    async def stream_content(**kwargs: typing.Any) -> typing.AsyncGenerator[bytes, None]:
+        for chunk in [b"da", b"ta"]:
+            yield chunk
+
+    bot.session.stream_content = mocker.Mock(side_effect=stream_content)
+    storage_client = voice_clients.MemoryStorage()
+
+    activity = temporal_activities.Downloader(bot=bot, storage_client=storage_client)
+    audio_id = uuid.uuid4()
+    remote_audio = voice_models.RemoteAudio(file_id="file_id", duration_seconds=3, format=voice_models.AudioFormat.OGG)
+
+    env = temporalio_testing.ActivityEnvironment()
+    await env.run(activity.run, temporal_activities.Downloader.Params(audio_id=audio_id, remote_audio=remote_audio))
+    await env.run(activity.run, temporal_activities.Downloader.Params(audio_id=audio_id, remote_audio=remote_audio))
+
+    bot.get_file.assert_awaited_with("file_id")
+    assert bot.session.stream_content.call_args.kwargs["url"] == "https://api.telegram.org/file/voice/file.oga"
+    assert await storage_client.read(audio_id) == voice_models.Audio(
+        data=b"data",
+        duration_seconds=3,
+        format=voice_models.AudioFormat.OGG,
+    )
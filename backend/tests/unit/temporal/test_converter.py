@@ -0,0 +1,50 @@
+import uuid
+
+import pytest
+import temporalio.converter as temporalio_converter
+
+import lib.temporal.activities as temporal_activities
+import lib.temporal.converter as temporal_converter
+import lib.voice.models as voice_models
+
+
+@pytest.fixture(name="result")
+def fixture_result():
+    return voice_models.RecognitionTaskResult(
+        recognition_results=[voice_models.RecognitionResult(text="Привет, мир! " * 100, duration_seconds=10) for _ in range(10)],
+        metadata='{"chat_id": 1}',
+    )
+
+
+@pytest.mark.asyncio
+async def test_round_trip(result: voice_models.RecognitionTaskResult):
+    data_converter = temporal_converter.create_data_converter(compression_threshold_bytes=1024)
+    chunks = [temporal_activities.Splitter.Chunk(audio_id=uuid.uuid4(), duration_seconds=1.5)]
+
+    payloads = await data_converter.encode([result, chunks, None])
+    decoded = await data_converter.decode(
+        payloads,
+        [voice_models.RecognitionTaskResult, list[temporal_activities.Splitter.Chunk], type(None)],
+    )
+
+    assert payloads[0].metadata["encoding"] == temporal_converter.ZlibPayloadCodec.ENCODING
+    assert payloads[1].metadata["encoding"] == b"binary/msgpack"
+    assert decoded == [result, chunks, None]
+
+
+@pytest.mark.asyncio
+async def test_compression_disabled(result: voice_models.RecognitionTaskResult):
+    data_converter = temporal_converter.create_data_converter(compression_threshold_bytes=None)
+
+    payloads = await data_converter.encode([result])
+
+    assert payloads[0].metadata["encoding"] == b"binary/msgpack"
+
+
+@pytest.mark.asyncio
+async def test_decodes_json_payloads(result: voice_models.RecognitionTaskResult):
+    payloads = await temporalio_converter.DataConverter.default.encode([result])
+
+    decoded = await temporal_converter.create_data_converter().decode(payloads, [voice_models.RecognitionTaskResult])
+
+    assert decoded == [result]
@@ -0,0 +1,257 @@
+import asyncio
+import typing
+import uuid
+
+import pytest
+import temporalio.api.common.v1 as temporalio_common_api
+import temporalio.api.enums.v1 as temporalio_enums_api
+import temporalio.api.history.v1 as temporalio_history_api
+import temporalio.api.taskqueue.v1 as temporalio_taskqueue_api
+import temporalio.client as temporalio_client
+import temporalio.converter as temporalio_converter
+import temporalio.worker as temporalio_worker
+
+import lib.temporal.activities as temporal_activities
+import lib.temporal.converter as temporal_converter
+import lib.temporal.workflows as temporal_workflows
+
+EventType = temporalio_enums_api.EventType
+ActivityTaskScheduledEventAttributes = temporalio_history_api.ActivityTaskScheduledEventAttributes
+MarkerRecordedEventAttributes = temporalio_history_api.MarkerRecordedEventAttributes
+WorkflowExecutionCompletedEventAttributes = temporalio_history_api.WorkflowExecutionCompletedEventAttributes
+TASK_QUEUE = temporalio_taskqueue_api.TaskQueue(name="media_handler")
+
+
+class HistoryBuilder:
+    """
+    Builds the history of a workflow started before the data converter change, so its payloads are JSON.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[temporalio_history_api.HistoryEvent] = []
+        self._activities_count = 0
+
+    def _add(self, event_type: "EventType.ValueType", **attributes: typing.Any) -> int:
+        event = temporalio_history_api.HistoryEvent(event_id=len(self.events) + 1, event_type=event_type, **attributes)
+        event.event_time.GetCurrentTime()
+        self.events.append(event)
+        return event.event_id
+
+    def _payloads(self, value: typing.Any) -> temporalio_common_api.Payloads:
+        payload_converter = temporalio_converter.default().payload_converter
+        return temporalio_common_api.Payloads(payloads=payload_converter.to_payloads([value]))
+
+    def start(self, input: typing.Any) -> None:
+        self._add(
+            EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED,
+            workflow_execution_started_event_attributes=temporalio_history_api.WorkflowExecutionStartedEventAttributes(
+                workflow_type=temporalio_common_api.WorkflowType(name="Recognition"),
+                task_queue=TASK_QUEUE,
+                input=self._payloads(input),
+            ),
+        )
+
+    def complete_workflow_task(self) -> int:
+        scheduled_event_id = self._add(
+            EventType.EVENT_TYPE_WORKFLOW_TASK_SCHEDULED,
+            workflow_task_scheduled_event_attributes=temporalio_history_api.WorkflowTaskScheduledEventAttributes(
+                task_queue=TASK_QUEUE,
+            ),
+        )
+        started_event_id = self._add(
+            EventType.EVENT_TYPE_WORKFLOW_TASK_STARTED,
+            workflow_task_started_event_attributes=temporalio_history_api.WorkflowTaskStartedEventAttributes(
+                scheduled_event_id=scheduled_event_id,
+            ),
+        )
+        return self._add(
+            EventType.EVENT_TYPE_WORKFLOW_TASK_COMPLETED,
+            workflow_task_completed_event_attributes=temporalio_history_api.WorkflowTaskCompletedEventAttributes(
+                scheduled_event_id=scheduled_event_id,
+                started_event_id=started_event_id,
+            ),
+        )
+
+    def run_activities(
+        self,
+        name: str,
+        inputs: list[typing.Any],
+        results: list[typing.Any],
+        patches: list[str] | None = None,
+    ) -> None:
+        """
+        Schedules the activities in a single workflow task and completes them in order,
+        patches are marked in the same workflow task before the activities are scheduled.
+        """
+        workflow_task_completed_event_id = self.complete_workflow_task()
+        for patch_id in patches or []:
+            self._add(
+                EventType.EVENT_TYPE_MARKER_RECORDED,
+                marker_recorded_event_attributes=MarkerRecordedEventAttributes(
+                    marker_name="core_patch",
+                    details={"patch-data": self._payloads({"id": patch_id, "deprecated": False})},
+                    workflow_task_completed_event_id=workflow_task_completed_event_id,
+                ),
+            )
+        scheduled_event_ids: list[int] = []
+        for input in inputs:
+            self._activities_count += 1
+            scheduled_event_ids.append(
+                self._add(
+                    EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED,
+                    activity_task_scheduled_event_attributes=ActivityTaskScheduledEventAttributes(
+                        activity_id=str(self._activities_count),
+                        activity_type=temporalio_common_api.ActivityType(name=name),
+                        task_queue=TASK_QUEUE,
+                        input=self._payloads(input),
+                        workflow_task_completed_event_id=workflow_task_completed_event_id,
+                    ),
+                )
+            )
+
+        for scheduled_event_id, result in zip(scheduled_event_ids, results):
+            started_event_id = self._add(
+                EventType.EVENT_TYPE_ACTIVITY_TASK_STARTED,
+                activity_task_started_event_attributes=temporalio_history_api.ActivityTaskStartedEventAttributes(
+                    scheduled_event_id=scheduled_event_id,
+                ),
+            )
+            self._add(
+                EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED,
+                activity_task_completed_event_attributes=temporalio_history_api.ActivityTaskCompletedEventAttributes(
+                    scheduled_event_id=scheduled_event_id,
+                    started_event_id=started_event_id,
+                    result=self._payloads(result),
+                ),
+            )
+
+    def complete(self, result: typing.Any) -> None:
+        workflow_task_completed_event_id = self.complete_workflow_task()
+        self._add(
+            EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED,
+            workflow_execution_completed_event_attributes=WorkflowExecutionCompletedEventAttributes(
+                result=self._payloads(result),
+                workflow_task_completed_event_id=workflow_task_completed_event_id,
+            ),
+        )
+
+
+async def replay(workflow_id: str, builder: HistoryBuilder) -> temporalio_worker.WorkflowReplayResult:
+    replayer = temporalio_worker.Replayer(
+        workflows=[temporal_workflows.Recognition],
+        data_converter=temporal_converter.create_data_converter(),
+    )
+    return await replayer.replay_workflow(
+        temporalio_client.WorkflowHistory(workflow_id=workflow_id, events=builder.events),
+        raise_on_replay_failure=False,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_as_dict", [False, True])
+async def test_replays_workflow_started_before_batched_recognition(chunk_as_dict: bool):
+    audio_id = str(uuid.uuid4())
+    chunk_ids = [str(uuid.uuid4()) for _ in range(2)]
+    result = {"recognition_results": [{"text": "text", "duration_seconds": 1} for _ in chunk_ids], "metadata": "{}"}
+
+    builder = HistoryBuilder()
+    builder.start({"metadata": "{}", "audio_id": audio_id})
+    builder.run_activities(
+        "splitter",
+        inputs=[{"audio_id": audio_id}],
+        # Split by a splitter deployed since
+        results=[[{"audio_id": id, "duration_seconds": 1} if chunk_as_dict else id for id in chunk_ids]],
+    )
+    builder.run_activities(
+        "recognition",
+        inputs=[{"audio_id": id} for id in chunk_ids],
+        results=result["recognition_results"],
+    )
+    builder.run_activities("callback", inputs=[{"audio_id": audio_id}], results=[None])
+    builder.run_activities(
+        "cleaner",
+        inputs=[{"audio_id": id} for id in [audio_id, *chunk_ids]],
+        results=[None] * (len(chunk_ids) + 1),
+    )
+    builder.complete(result)
+
+    replay_result = await replay(audio_id, builder)
+
+    assert replay_result.replay_failure is None
+
+
+@pytest.mark.asyncio
+async def test_replays_batched_recognition():
+    audio_id = str(uuid.uuid4())
+    chunks = [{"audio_id": str(uuid.uuid4()), "duration_seconds": 30} for _ in range(3)]
+    batches = [chunks[:2], chunks[2:]]
+    results = [{"text": "text", "duration_seconds": 30} for _ in chunks]
+
+    builder = HistoryBuilder()
+    builder.start({"metadata": "{}", "audio_id": audio_id})
+    builder.run_activities(
+        "splitter",
+        inputs=[{"audio_id": audio_id}],
+        results=[chunks],
+        patches=["batched-recognition", "recognition-batch-offload"],
+    )
+    # Batches of the default 60 seconds, all of them in flight at once
+    builder.run_activities(
+        "recognition_batch",
+        inputs=[{"audio_ids": [chunk["audio_id"] for chunk in batch]} for batch in batches],
+        results=[{"results": results[:2]}, {"results": results[2:]}],
+    )
+    builder.run_activities("callback", inputs=[{"audio_id": audio_id}], results=[None])
+    builder.run_activities(
+        "cleaner",
+        inputs=[{"audio_ids": [audio_id, *[chunk["audio_id"] for chunk in chunks]]}],
+        results=[None],
+    )
+    builder.complete({"result": {"recognition_results": results, "metadata": "{}"}})
+
+    replay_result = await replay(audio_id, builder)
+
+    assert replay_result.replay_failure is None
+
+
+@pytest.mark.asyncio
+async def test_gather_windowed_bounds_in_flight():
+    in_flight = 0
+    max_in_flight = 0
+    started: list[int] = []
+
+    def factory(index: int) -> typing.Callable[[], typing.Awaitable[int]]:
+        async def run() -> int:
+            nonlocal in_flight, max_in_flight
+            started.append(index)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01 * (index % 3))
+            in_flight -= 1
+            return index
+
+        return run
+
+    result = await temporal_workflows.Recognition()._gather_windowed(  # pyright: ignore[reportPrivateUsage]
+        factories=[factory(index) for index in range(10)],
+        window_size=3,
+    )
+
+    assert result == list(range(10))
+    assert max_in_flight == 3
+    assert started == list(range(10))
+
+
+def test_get_batches():
+    chunks = [
+        temporal_activities.Splitter.Chunk(audio_id=uuid.uuid4(), duration_seconds=duration_seconds)
+        for duration_seconds in [20, 30, 20, 90, 10]
+    ]
+
+    batches = temporal_workflows.Recognition()._get_batches(  # pyright: ignore[reportPrivateUsage]
+        chunks,
+        max_duration_seconds=60,
+    )
+
+    # Consecutive chunks are grouped while they fit, a chunk longer than the limit forms its own batch
+    assert batches == [chunks[:2], chunks[2:3], chunks[3:4], chunks[4:]]
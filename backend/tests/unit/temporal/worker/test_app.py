@@ -0,0 +1,55 @@
+import typing
+
+import pytest_mock
+
+import lib.app.client as app_client
+import lib.temporal.activities as temporal_activities
+import lib.temporal.worker.app as temporal_worker_app
+import lib.temporal.worker.settings as temporal_worker_settings
+import lib.utils.asyncio as asyncio_utils
+import lib.voice.clients as voice_clients
+
+
+def test_pools_get_own_activities(mocker: pytest_mock.MockFixture):
+    pools = [
+        (
+            temporal_worker_settings.WorkerSettings(
+                task_queue="split",
+                workflows_enabled=False,
+                activities=[temporal_activities.Splitter.name],
+            ),
+            asyncio_utils.WeightedSemaphore(capacity=60),
+        ),
+        (
+            temporal_worker_settings.WorkerSettings(
+                task_queue="recognize",
+                activities=[temporal_activities.RecognitionBatch.name],
+            ),
+            asyncio_utils.WeightedSemaphore(capacity=120),
+        ),
+    ]
+
+    pool_activities: list[list[typing.Any]] = []
+    for worker_settings, cost_limiter in pools:
+        activities = temporal_worker_app.create_activities(
+            storage_client=mocker.Mock(spec=voice_clients.StorageProtocol),
+            result_storage_client=mocker.Mock(spec=voice_clients.ResultStorageProtocol),
+            recognition_client=mocker.Mock(spec=voice_clients.RecognitionProtocol),
+            splitter_client=mocker.Mock(spec=voice_clients.SplitterProtocol),
+            main_app_client=mocker.Mock(spec=app_client.AppClient),
+            telegram_bot=None,
+            cost_limiter=cost_limiter,
+            recognition_batch_max_concurrency=4,
+            split_upload_max_concurrency=4,
+        )
+        activity_names = temporal_worker_app.get_activity_names(worker_settings=worker_settings, activities=activities)
+        pool_activities.append([activities[activity_name] for activity_name in activity_names])
+
+    split_activities, recognize_activities = pool_activities
+    assert [activity.__self__.name for activity in split_activities] == [temporal_activities.Splitter.name]
+    assert [activity.__self__.name for activity in recognize_activities] == [
+        temporal_activities.RecognitionBatch.name,
+        *temporal_worker_app.LOCAL_ACTIVITY_NAMES,
+    ]
+    assert split_activities[0].__self__.cost_limiter is pools[0][1]
+    assert recognize_activities[0].__self__.cost_limiter is pools[1][1]
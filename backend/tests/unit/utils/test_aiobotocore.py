@@ -0,0 +1,29 @@
+import asyncio
+
+import aiobotocore.session as aiobotocore_session
+import pytest
+
+import lib.utils.aiobotocore as aiobotocore_utils
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_client():
+    s3_client = aiobotocore_utils.S3Client(
+        session=aiobotocore_session.AioSession(),
+        endpoint_url="http://localhost:9000",
+        access_key="access_key",
+        secret_key="secret_key",
+        max_pool_connections=32,
+    )
+
+    async def get_client():
+        async with s3_client.client_context() as client:
+            return client
+
+    try:
+        clients = await asyncio.gather(*[get_client() for _ in range(10)])
+    finally:
+        await s3_client.dispose()
+
+    assert all(client is clients[0] for client in clients)
+    assert clients[0].meta.config.max_pool_connections == 32
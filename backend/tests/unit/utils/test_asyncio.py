@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import lib.utils.asyncio as asyncio_utils
+
+
+@pytest.mark.asyncio
+async def test_weighted_semaphore_admits_within_capacity():
+    semaphore = asyncio_utils.WeightedSemaphore(capacity=10)
+
+    await semaphore.acquire(4)
+    await semaphore.acquire(6)
+    waiter = asyncio.create_task(semaphore.acquire(1))
+    await asyncio.sleep(0)
+
+    assert semaphore.in_use == 10
+    assert not waiter.done()
+
+    semaphore.release(4)
+    await waiter
+
+    assert semaphore.in_use == 7
+
+
+@pytest.mark.asyncio
+async def test_weighted_semaphore_is_fifo():
+    semaphore = asyncio_utils.WeightedSemaphore(capacity=10)
+    order: list[str] = []
+
+    async def hold(name: str, weight: float) -> None:
+        async with semaphore.hold(weight):
+            order.append(name)
+
+    await semaphore.acquire(5)
+    heavy = asyncio.create_task(hold("heavy", 10))
+    await asyncio.sleep(0)
+    light = asyncio.create_task(hold("light", 1))
+    await asyncio.sleep(0)
+
+    assert order == []
+
+    semaphore.release(5)
+    await asyncio.gather(heavy, light)
+
+    assert order == ["heavy", "light"]
+    assert semaphore.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_weighted_semaphore_clamps_weight_to_capacity():
+    semaphore = asyncio_utils.WeightedSemaphore(capacity=10)
+
+    async with semaphore.hold(100):
+        assert semaphore.in_use == 10
+
+    assert semaphore.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_weighted_semaphore_cancelled_waiter_does_not_block():
+    semaphore = asyncio_utils.WeightedSemaphore(capacity=10)
+
+    await semaphore.acquire(10)
+    cancelled = asyncio.create_task(semaphore.acquire(10))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(semaphore.acquire(1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    semaphore.release(10)
+    await waiter
+
+    assert semaphore.in_use == 1
@@ -0,0 +1,96 @@
+import uuid
+
+import pytest
+
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+
+def create_audio(size_bytes: int) -> voice_models.Audio:
+    return voice_models.Audio(data=b"0" * size_bytes, duration_seconds=1, format=voice_models.AudioFormat.WAV)
+
+
+@pytest.mark.asyncio
+async def test_read_after_create_hits():
+    underlying_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.CachedStorage(storage_client=underlying_storage_client, max_size_bytes=10)
+    audio_id = uuid.uuid4()
+    audio = create_audio(4)
+
+    await storage_client.create(audio_id, audio)
+
+    assert await underlying_storage_client.read(audio_id) == audio
+    assert await storage_client.read(audio_id) == audio
+    assert storage_client.hit_ratio == 1
+    assert storage_client.resident_bytes == 4
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used():
+    underlying_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.CachedStorage(storage_client=underlying_storage_client, max_size_bytes=10)
+    audio_ids = [uuid.uuid4() for _ in range(3)]
+    for audio_id in audio_ids[:2]:
+        await storage_client.create(audio_id, create_audio(4))
+    await storage_client.read(audio_ids[0])
+
+    await storage_client.create(audio_ids[2], create_audio(4))
+    await storage_client.read(audio_ids[1])
+
+    # Only the second audio was evicted and had to be read from the underlying storage
+    assert storage_client.hit_ratio == 0.5
+    assert storage_client.resident_bytes == 8
+
+
+@pytest.mark.asyncio
+async def test_skips_audio_larger_than_cache():
+    storage_client = voice_clients.CachedStorage(storage_client=voice_clients.MemoryStorage(), max_size_bytes=10)
+
+    await storage_client.create(uuid.uuid4(), create_audio(11))
+
+    assert storage_client.resident_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates():
+    storage_client = voice_clients.CachedStorage(storage_client=voice_clients.MemoryStorage(), max_size_bytes=10)
+    audio_ids = [uuid.uuid4() for _ in range(2)]
+    for audio_id in audio_ids:
+        await storage_client.create(audio_id, create_audio(4))
+
+    await storage_client.delete(audio_ids[0])
+    await storage_client.delete_many(audio_ids[1:])
+
+    assert storage_client.resident_bytes == 0
+    for audio_id in audio_ids:
+        with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+            await storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_content_addressed_audio_expired_underneath_is_created_again():
+    underlying_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.CachedStorage(storage_client=underlying_storage_client, max_size_bytes=10)
+    audio = create_audio(4)
+
+    audio_id = await voice_clients.create_content_addressed(storage_client, audio)
+    # Expired in the underlying storage while still cached
+    await underlying_storage_client.delete(audio_id)
+    await voice_clients.create_content_addressed(storage_client, audio)
+
+    assert await underlying_storage_client.read(audio_id) == audio
+
+
+@pytest.mark.asyncio
+async def test_read_range_miss_is_counted():
+    underlying_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.CachedStorage(storage_client=underlying_storage_client, max_size_bytes=10)
+    cached_audio_id = uuid.uuid4()
+    audio_id = uuid.uuid4()
+    await storage_client.create(cached_audio_id, create_audio(4))
+    await underlying_storage_client.create(audio_id, create_audio(4))
+
+    await storage_client.read_range(cached_audio_id, 0, 2)
+    assert await storage_client.read_range(audio_id, 0, 2) == b"00"
+
+    assert storage_client.hit_ratio == 0.5
@@ -0,0 +1,51 @@
+import asyncio
+import concurrent.futures as concurrent_futures
+import os
+import pathlib
+
+import pytest
+import pytest_mock
+
+import lib.utils.files as files_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+
+def create_audio(data: bytes) -> voice_models.Audio:
+    return voice_models.Audio(data=data, duration_seconds=1, format=voice_models.AudioFormat.WAV)
+
+
+def test_content_id_depends_on_content():
+    assert voice_clients.get_content_id(create_audio(b"data")) == voice_clients.get_content_id(create_audio(b"data"))
+    assert voice_clients.get_content_id(create_audio(b"data")) != voice_clients.get_content_id(create_audio(b"other"))
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_is_checked_only(mocker: pytest_mock.MockerFixture):
+    storage_client = voice_clients.MemoryStorage()
+    create_spy = mocker.spy(storage_client, "create")
+
+    first_id = await voice_clients.create_content_addressed(storage_client, create_audio(b"data"))
+    second_id = await voice_clients.create_content_addressed(storage_client, create_audio(b"data"))
+
+    assert first_id == second_id
+    assert create_spy.call_count == 1
+    assert await storage_client.read(first_id) == create_audio(b"data")
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_refreshes_expiration(tmp_path: pathlib.Path):
+    file_client = files_utils.FileClient(
+        loop=asyncio.get_running_loop(),
+        thread_pool_executor=concurrent_futures.ThreadPoolExecutor(max_workers=1),
+        root_path=tmp_path,
+    )
+    storage_client = voice_clients.LocalStorage(file_client=file_client)
+
+    audio_id = await voice_clients.create_content_addressed(storage_client, create_audio(b"data"))
+    for path in tmp_path.rglob(str(audio_id)):
+        os.utime(path, (0, 0))
+    await voice_clients.create_content_addressed(storage_client, create_audio(b"data"))
+
+    assert await file_client.delete_expired("audio/", max_age_seconds=60) == 0
+    assert await storage_client.read(audio_id) == create_audio(b"data")
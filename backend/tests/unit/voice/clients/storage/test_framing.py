@@ -0,0 +1,18 @@
+import lib.voice.clients.storage.framing as storage_framing
+import lib.voice.models as voice_models
+
+AUDIO = voice_models.Audio(data=b"data", duration_seconds=1.25, format=voice_models.AudioFormat.MP3)
+
+
+def test_header_round_trip():
+    data = storage_framing.pack_header(AUDIO) + AUDIO.data
+
+    assert storage_framing.unpack(memoryview(data)) == AUDIO
+
+
+def test_metadata_round_trip():
+    metadata = storage_framing.to_metadata(AUDIO)
+
+    assert storage_framing.has_metadata(metadata)
+    assert not storage_framing.has_metadata({})
+    assert storage_framing.from_metadata(metadata, AUDIO.data) == AUDIO
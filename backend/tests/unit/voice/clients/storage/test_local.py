@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures as concurrent_futures
+import os
+import pathlib
+import time
+import typing
+import uuid
+
+import pytest
+
+import lib.utils.files as files_utils
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+
+@pytest.fixture(name="audio")
+def fixture_audio():
+    return voice_models.Audio(data=b"data", duration_seconds=1.5, format=voice_models.AudioFormat.OGG)
+
+
+def create_file_client(root_path: pathlib.Path) -> files_utils.FileClient:
+    return files_utils.FileClient(
+        loop=asyncio.get_running_loop(),
+        thread_pool_executor=concurrent_futures.ThreadPoolExecutor(max_workers=1),
+        root_path=root_path,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_read_delete(tmp_path: pathlib.Path, audio: voice_models.Audio):
+    storage_client = voice_clients.LocalStorage(file_client=create_file_client(tmp_path))
+    audio_id = uuid.uuid4()
+
+    await storage_client.create(audio_id, audio)
+    stored_audio = await storage_client.read(audio_id)
+    await storage_client.delete(audio_id)
+
+    assert audio == stored_audio
+    with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+        await storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_create_already_exists_raises(tmp_path: pathlib.Path, audio: voice_models.Audio):
+    storage_client = voice_clients.LocalStorage(file_client=create_file_client(tmp_path))
+    audio_id = uuid.uuid4()
+
+    await storage_client.create(audio_id, audio)
+
+    with pytest.raises(voice_clients.StorageProtocol.AlreadyExistsError):
+        await storage_client.create(audio_id, audio)
+
+    # Temporary files are cleaned up and the sharded layout is kept
+    assert [path.name for path in tmp_path.rglob("*") if path.is_file()] == [str(audio_id)]
+    assert (tmp_path / "audio" / str(audio_id)[:2] / str(audio_id)[2:4] / str(audio_id)).is_file()
+
+
+@pytest.mark.asyncio
+async def test_create_stream(tmp_path: pathlib.Path, audio: voice_models.Audio):
+    storage_client = voice_clients.LocalStorage(file_client=create_file_client(tmp_path))
+    audio_id = uuid.uuid4()
+
+    async def iter_chunks() -> typing.AsyncIterator[bytes]:
+        for index in range(0, len(audio.data), 2):
+            yield audio.data[index : index + 2]
+
+    await storage_client.create_stream(
+        audio_id,
+        iter_chunks(),
+        duration_seconds=audio.duration_seconds,
+        format=audio.format,
+    )
+
+    assert await storage_client.read(audio_id) == audio
+    with pytest.raises(voice_clients.StorageProtocol.AlreadyExistsError):
+        await storage_client.create_stream(
+            audio_id,
+            iter_chunks(),
+            duration_seconds=audio.duration_seconds,
+            format=audio.format,
+        )
+    # Temporary file of the failed attempt is removed
+    assert [path.name for path in tmp_path.rglob("*") if path.is_file()] == [str(audio_id)]
+
+
+@pytest.mark.asyncio
+async def test_delete_many(tmp_path: pathlib.Path, audio: voice_models.Audio):
+    storage_client = voice_clients.LocalStorage(file_client=create_file_client(tmp_path))
+    audio_ids = [uuid.uuid4() for _ in range(3)]
+    for audio_id in audio_ids:
+        await storage_client.create(audio_id, audio)
+
+    await storage_client.delete_many([*audio_ids, uuid.uuid4()])
+
+    for audio_id in audio_ids:
+        with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+            await storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_delivery_list_pending(tmp_path: pathlib.Path):
+    delivery_storage_client = voice_clients.LocalDeliveryStorage(file_client=create_file_client(tmp_path))
+    ids = [uuid.uuid4() for _ in range(3)]
+    for id in ids:
+        await delivery_storage_client.create_pending(id, b"")
+    await delivery_storage_client.delete_pending(ids[0])
+    await delivery_storage_client.mark_delivered(ids[0])
+    await delivery_storage_client.mark_delivered(ids[0])
+
+    assert sorted(await delivery_storage_client.list_pending()) == sorted(ids[1:])
+    assert await delivery_storage_client.read_pending(ids[1]) == b""
+    assert await delivery_storage_client.is_delivered(ids[0])
+    assert not await delivery_storage_client.is_delivered(ids[1])
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_expired(tmp_path: pathlib.Path, audio: voice_models.Audio):
+    file_client = create_file_client(tmp_path)
+    storage_client = voice_clients.LocalStorage(file_client=file_client)
+    expired_audio_id, audio_id = uuid.uuid4(), uuid.uuid4()
+    await storage_client.create(expired_audio_id, audio)
+    await storage_client.create(audio_id, audio)
+    expired_path = tmp_path / "audio" / str(expired_audio_id)[:2] / str(expired_audio_id)[2:4] / str(expired_audio_id)
+    os.utime(expired_path, (time.time() - 120, time.time() - 120))
+
+    await files_utils.Sweeper(file_client=file_client, prefixes=["audio/"], max_age_seconds=60).sweep()
+
+    assert not await storage_client.exists(expired_audio_id)
+    assert await storage_client.exists(audio_id)
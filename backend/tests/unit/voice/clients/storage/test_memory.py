@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+import pytest_mock
+
+import lib.voice.clients as voice_clients
+import lib.voice.models as voice_models
+
+
+@pytest.fixture(name="audio")
+def fixture_audio():
+    return voice_models.Audio(data=b"data", duration_seconds=1, format=voice_models.AudioFormat.WAV)
+
+
+@pytest.mark.asyncio
+async def test_create_read_delete(audio: voice_models.Audio):
+    storage_client = voice_clients.MemoryStorage()
+    audio_id = uuid.uuid4()
+
+    await storage_client.create(audio_id, audio)
+    stored_audio = await storage_client.read(audio_id)
+    await storage_client.delete(audio_id)
+
+    assert audio == stored_audio
+    with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+        await storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_create_already_exists_raises(audio: voice_models.Audio):
+    storage_client = voice_clients.MemoryStorage()
+    audio_id = uuid.uuid4()
+
+    await storage_client.create(audio_id, audio)
+
+    with pytest.raises(voice_clients.StorageProtocol.AlreadyExistsError):
+        await storage_client.create(audio_id, audio)
+
+
+@pytest.mark.asyncio
+async def test_read_falls_back(audio: voice_models.Audio):
+    fallback_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.MemoryStorage(fallback_storage_client=fallback_storage_client)
+    audio_id = uuid.uuid4()
+
+    await fallback_storage_client.create(audio_id, audio)
+
+    assert await storage_client.read(audio_id) == audio
+
+
+@pytest.mark.asyncio
+async def test_delete_many_falls_back(audio: voice_models.Audio):
+    fallback_storage_client = voice_clients.MemoryStorage()
+    storage_client = voice_clients.MemoryStorage(fallback_storage_client=fallback_storage_client)
+    local_audio_id = uuid.uuid4()
+    fallback_audio_id = uuid.uuid4()
+
+    await storage_client.create(local_audio_id, audio)
+    await fallback_storage_client.create(fallback_audio_id, audio)
+    await storage_client.delete_many([local_audio_id, fallback_audio_id])
+
+    for audio_id in [local_audio_id, fallback_audio_id]:
+        with pytest.raises(voice_clients.StorageProtocol.NotFoundError):
+            await storage_client.read(audio_id)
+
+
+@pytest.mark.asyncio
+async def test_create_evicts_oldest_beyond_max_size(audio: voice_models.Audio):
+    storage_client = voice_clients.MemoryStorage(max_size_bytes=2 * len(audio.data))
+    audio_ids = [uuid.uuid4() for _ in range(3)]
+
+    for audio_id in audio_ids:
+        await storage_client.create(audio_id, audio)
+
+    assert storage_client.resident_bytes == 2 * len(audio.data)
+    assert not await storage_client.exists(audio_ids[0])
+    for audio_id in audio_ids[1:]:
+        assert await storage_client.read(audio_id) == audio
+
+
+@pytest.mark.asyncio
+async def test_create_evicts_expired(audio: voice_models.Audio, mocker: pytest_mock.MockFixture):
+    monotonic = mocker.patch("time.monotonic", return_value=0)
+    storage_client = voice_clients.MemoryStorage(ttl_seconds=10)
+    expired_audio_id = uuid.uuid4()
+    audio_id = uuid.uuid4()
+
+    await storage_client.create(expired_audio_id, audio)
+    monotonic.return_value = 11
+    await storage_client.create(audio_id, audio)
+
+    assert not await storage_client.exists(expired_audio_id)
+    assert await storage_client.read(audio_id) == audio
@@ -0,0 +1,38 @@
+import pydantic
+import pytest
+
+import lib.voice.models as voice_models
+import lib.voice.schemas as voice_schemas
+
+
+@pytest.fixture(name="result")
+def fixture_result():
+    return voice_models.RecognitionTaskResult(
+        recognition_results=[
+            voice_models.RecognitionResult(text="первый", duration_seconds=1.5),
+            voice_models.RecognitionResult(text="второй", duration_seconds=2),
+        ],
+        metadata='{"message_id": 1}',
+    )
+
+
+def test_serialize_deserialize(result: voice_models.RecognitionTaskResult):
+    before_result_schema = voice_schemas.RecognitionTaskResult.from_dataclass(result)
+    raw_result = before_result_schema.to_bytes()
+    after_result_schema = voice_schemas.RecognitionTaskResult.from_bytes(raw_result)
+    after_result = after_result_schema.to_dataclass()
+
+    assert isinstance(before_result_schema.recognition_results[0], voice_schemas.RecognitionResult)
+    assert result == after_result
+
+
+def test_from_dataclass_validates():
+    result = voice_models.RecognitionTaskResult(
+        recognition_results=[
+            voice_models.RecognitionResult(text="text", duration_seconds="long"),  # pyright: ignore[reportArgumentType]
+        ],
+        metadata="{}",
+    )
+
+    with pytest.raises(pydantic.ValidationError):
+        voice_schemas.RecognitionTaskResult.from_dataclass(result)
@@ -0,0 +1,51 @@
+import pytest
+import pytest_mock
+
+import lib.voice.services as voice_services
+
+
+@pytest.fixture(name="recognition_task")
+def fixture_recognition_task(mocker: pytest_mock.MockerFixture):
+    return voice_services.TemporalRecognitionTask(
+        audio_storage_client=mocker.Mock(),
+        result_storage_client=mocker.Mock(),
+        temporal_client=mocker.Mock(),
+        temporal_task_queue="media_handler",
+        split_timeout_seconds=600,
+        split_timeout_seconds_per_audio_second=0.5,
+        split_heartbeat_timeout_seconds=60,
+        recognition_timeout_seconds=30,
+        recognition_timeout_seconds_per_audio_second=2,
+        clean_up_timeout_seconds=60,
+        recognition_max_in_flight=10,
+        recognition_batch_duration_seconds=60,
+        result_offload_threshold_bytes=64 * 1024,
+        session_enabled=False,
+        session_schedule_to_start_timeout_seconds=10,
+        lanes=[
+            voice_services.RecognitionLane(name="medium", max_audio_duration_seconds=600, task_queue="medium"),
+            voice_services.RecognitionLane(name="fast", max_audio_duration_seconds=30, task_queue="fast"),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ("audio_duration_seconds", "lane_name", "task_queue"),
+    [
+        (5, "fast", "fast"),
+        (30, "fast", "fast"),
+        (31, "medium", "medium"),
+        (3600, "default", "media_handler"),
+        (0, "default", "media_handler"),
+    ],
+)
+def test_get_lane(
+    recognition_task: voice_services.TemporalRecognitionTask,
+    audio_duration_seconds: float,
+    lane_name: str,
+    task_queue: str,
+):
+    lane = recognition_task._get_lane(audio_duration_seconds)  # pyright: ignore[reportPrivateUsage]
+
+    assert lane.name == lane_name
+    assert lane.task_queue == task_queue